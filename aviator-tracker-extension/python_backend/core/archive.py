@@ -0,0 +1,284 @@
+"""
+Historial frío de rondas.
+La tabla `rounds` solo conserva las últimas `hot_rows` rondas (dashboard y
+filtros); las más viejas se mueven a segmentos columnares comprimidos (.npz,
+uno o más por día UTC) que nunca se modifican. El manifiesto de segmentos vive
+en la tabla `archive_segments`: un segmento existe si y solo si está en el
+manifiesto, así un corte a mitad de un archivado no duplica ni pierde filas.
+Todos los ids archivados son menores que los de la tabla.
+"""
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+
+# Columnas de rounds que se archivan (orden del SELECT) y su tipo en el segmento
+COLUMNS = ('id', 'session_id', 'multiplier', 'timestamp', 'click_type', 'result', 'target_used', 'source')
+NUMERIC_DTYPES = {
+    'id': np.int64,
+    'session_id': np.int64,     # NULL -> -1
+    'multiplier': np.float64,   # NULL -> NaN
+    'timestamp': np.int64,      # epoch ms
+    'target_used': np.float64,  # NULL -> NaN
+}
+TEXT_COLUMNS = ('click_type', 'result', 'source')  # NULL -> ''
+
+MANIFEST_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS archive_segments (
+        file TEXT PRIMARY KEY,
+        day TEXT NOT NULL,          -- YYYYMMDD (UTC)
+        first_id INTEGER NOT NULL,
+        last_id INTEGER NOT NULL,
+        rows INTEGER NOT NULL,
+        first_ts INTEGER NOT NULL,  -- epoch ms
+        last_ts INTEGER NOT NULL,
+        created_ms INTEGER NOT NULL
+    )
+'''
+
+
+def _day(ts_ms: int) -> str:
+    return datetime.fromtimestamp(ts_ms / 1000, tz=timezone.utc).strftime('%Y%m%d')
+
+
+def _to_columns(rows: Sequence) -> Dict[str, np.ndarray]:
+    columns = {}
+    for i, name in enumerate(COLUMNS):
+        values = [row[i] for row in rows]
+        if name in TEXT_COLUMNS:
+            columns[name] = np.array(['' if v is None else str(v) for v in values])
+        elif NUMERIC_DTYPES[name] is np.float64:
+            columns[name] = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+        else:
+            columns[name] = np.array([-1 if v is None else v for v in values], dtype=NUMERIC_DTYPES[name])
+    return columns
+
+
+class RoundArchive:
+    """Segmentos .npz de rondas archivadas + manifiesto en SQLite"""
+
+    def __init__(self, path: str, connect: Callable, hot_rows: int = 500):
+        """
+        Args:
+            path: Carpeta de los segmentos
+            connect: Función que devuelve una conexión SQLite (get_db_connection)
+            hot_rows: Rondas que se quedan en la tabla `rounds`
+        """
+        self.path = path
+        self._connect = connect
+        self.hot_rows = max(1, int(hot_rows))
+        self._lock = threading.Lock()  # Un archivado a la vez (escritor o /api/import)
+        self.rollovers = 0
+        self.rows_archived = 0
+        self.last_rollover_ms = 0.0
+
+    def create_schema(self, cursor):
+        """Tabla del manifiesto (la llama init_db dentro de su transacción)"""
+        cursor.execute(MANIFEST_SCHEMA)
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_archive_last ON archive_segments(last_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_archive_day ON archive_segments(day)')
+
+    def cleanup_orphans(self, conn) -> int:
+        """Borrar segmentos escritos por un archivado que no llegó al commit"""
+        if not os.path.isdir(self.path):
+            return 0
+        known = {row[0] for row in conn.execute('SELECT file FROM archive_segments')}
+        removed = 0
+        for name in os.listdir(self.path):
+            if (name.endswith('.npz') and name not in known) or name.endswith('.tmp'):
+                os.remove(os.path.join(self.path, name))
+                removed += 1
+        return removed
+
+    # ------------------------------------------------------------------
+    # Archivado
+    # ------------------------------------------------------------------
+
+    def roll_over(self) -> int:
+        """
+        Mover a segmentos las rondas que quedan fuera de las últimas `hot_rows`,
+        y siempre las importadas (ids <= 0, ver core.importer).
+
+        Returns:
+            Filas archivadas
+        """
+        with self._lock:
+            return self._roll_over()
+
+    def _roll_over(self) -> int:
+        start = time.perf_counter()
+        conn = self._connect()
+        try:
+            cutoff = conn.execute(
+                'SELECT id FROM rounds ORDER BY id DESC LIMIT 1 OFFSET ?', (self.hot_rows,)
+            ).fetchone()
+            imported = conn.execute('SELECT MAX(id) FROM rounds WHERE id <= 0').fetchone()[0]
+            candidates = [value for value in (cutoff[0] if cutoff else None, imported) if value is not None]
+            if not candidates:
+                return 0
+            cutoff_id = max(candidates)
+            rows = conn.execute(
+                f'SELECT {", ".join(COLUMNS)} FROM rounds WHERE id <= ? ORDER BY id', (cutoff_id,)
+            ).fetchall()
+            if not rows:
+                return 0
+
+            # 1. Segmentos a disco, escritos completos antes de tocar la base. Cada uno es
+            #    un tramo contiguo de ids del mismo día UTC: con timestamps desordenados
+            #    (importaciones) un día puede tener varios tramos, pero los rangos de id
+            #    de los segmentos nunca se intercalan
+            segments = []
+            runs: List[tuple] = []
+            for row in rows:
+                day = _day(row[3])
+                if not runs or runs[-1][0] != day:
+                    runs.append((day, []))
+                runs[-1][1].append(row)
+            os.makedirs(self.path, exist_ok=True)
+            for day, day_rows in runs:
+                name = f"rounds_{day}_{day_rows[0][0]}_{day_rows[-1][0]}.npz"
+                self._write_segment(name, _to_columns(day_rows))
+                segments.append((name, day, day_rows[0][0], day_rows[-1][0], len(day_rows),
+                                 min(r[3] for r in day_rows), max(r[3] for r in day_rows)))
+
+            # 2. Manifiesto y borrado en una transacción (el manifiesto primero: el trigger
+            #    de session_stats no descuenta las filas ya archivadas)
+            now_ms = int(time.time() * 1000)
+            try:
+                conn.executemany('''
+                    INSERT INTO archive_segments (file, day, first_id, last_id, rows, first_ts, last_ts, created_ms)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''', [segment + (now_ms,) for segment in segments])
+                conn.execute('DELETE FROM rounds WHERE id <= ?', (cutoff_id,))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                for segment in segments:
+                    os.remove(os.path.join(self.path, segment[0]))
+                raise
+        finally:
+            conn.close()
+        self.rollovers += 1
+        self.rows_archived += len(rows)
+        self.last_rollover_ms = (time.perf_counter() - start) * 1000
+        return len(rows)
+
+    def _write_segment(self, name: str, columns: Dict[str, np.ndarray]):
+        final = os.path.join(self.path, name)
+        tmp = final + '.tmp'
+        with open(tmp, 'wb') as f:
+            np.savez_compressed(f, **columns)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, final)
+
+    def clear(self, conn) -> List[str]:
+        """
+        Vaciar el manifiesto dentro de la transacción de quien llama. Devuelve los
+        segmentos a borrar con delete_files() después del commit
+        """
+        files = [row[0] for row in conn.execute('SELECT file FROM archive_segments')]
+        conn.execute('DELETE FROM archive_segments')
+        return files
+
+    def delete_files(self, files: Sequence[str]):
+        for name in files:
+            try:
+                os.remove(os.path.join(self.path, name))
+            except FileNotFoundError:
+                pass
+
+    # ------------------------------------------------------------------
+    # Lectura para análisis
+    # ------------------------------------------------------------------
+
+    def segments(self, since_ms: Optional[int] = None, until_ms: Optional[int] = None) -> List[dict]:
+        """Segmentos del manifiesto que se solapan con [since_ms, until_ms]"""
+        conn = self._connect()
+        try:
+            rows = conn.execute('''
+                SELECT file, day, first_id, last_id, rows, first_ts, last_ts FROM archive_segments
+                WHERE last_ts >= ? AND first_ts <= ? ORDER BY first_id
+            ''', (since_ms if since_ms is not None else -2**62,
+                  until_ms if until_ms is not None else 2**62)).fetchall()
+        finally:
+            conn.close()
+        return [dict(row) for row in rows]
+
+    def scan(self, columns: Optional[Sequence[str]] = None, since_ms: Optional[int] = None,
+             until_ms: Optional[int] = None, session_id: Optional[int] = None,
+             after_id: Optional[int] = None) -> Iterator[Dict[str, np.ndarray]]:
+        """
+        Recorrer los segmentos como columnas numpy (solo se descomprimen las pedidas).
+        `after_id` salta las rondas ya procesadas (id <= after_id).
+
+        Yields:
+            {columna: array} por segmento, ya filtrado
+        """
+        wanted = list(columns or COLUMNS)
+        needed = set(wanted)
+        if since_ms is not None or until_ms is not None:
+            needed.add('timestamp')
+        if session_id is not None:
+            needed.add('session_id')
+        if after_id is not None:
+            needed.add('id')
+        for segment in self.segments(since_ms, until_ms):
+            if after_id is not None and segment['last_id'] <= after_id:
+                continue
+            with np.load(os.path.join(self.path, segment['file']), allow_pickle=False) as data:
+                cols = {name: data[name] for name in needed}
+            keep = None
+            if since_ms is not None:
+                keep = cols['timestamp'] >= since_ms
+            if until_ms is not None:
+                mask = cols['timestamp'] <= until_ms
+                keep = mask if keep is None else keep & mask
+            if session_id is not None:
+                mask = cols['session_id'] == session_id
+                keep = mask if keep is None else keep & mask
+            if after_id is not None:
+                mask = cols['id'] > after_id
+                keep = mask if keep is None else keep & mask
+            if keep is not None:
+                if not keep.any():
+                    continue
+                cols = {name: values[keep] for name, values in cols.items()}
+            yield {name: cols[name] for name in wanted}
+
+    def load(self, columns: Optional[Sequence[str]] = None, **filters) -> Dict[str, np.ndarray]:
+        """Igual que scan() pero concatenado en un solo bloque de columnas"""
+        wanted = list(columns or COLUMNS)
+        parts = list(self.scan(wanted, **filters))
+        if not parts:
+            return {name: np.array([], dtype=NUMERIC_DTYPES.get(name, str)) for name in wanted}
+        return {name: np.concatenate([part[name] for part in parts]) for name in wanted}
+
+    def get_stats(self) -> dict:
+        conn = self._connect()
+        try:
+            row = conn.execute('''
+                SELECT COUNT(*), COALESCE(SUM(rows), 0), MIN(first_ts), MAX(last_ts) FROM archive_segments
+            ''').fetchone()
+        finally:
+            conn.close()
+        size = 0
+        if os.path.isdir(self.path):
+            size = sum(os.path.getsize(os.path.join(self.path, name))
+                       for name in os.listdir(self.path) if name.endswith('.npz'))
+        return {
+            "path": self.path,
+            "hot_rows": self.hot_rows,
+            "segments": row[0],
+            "rows": row[1],
+            "first_ts": row[2],
+            "last_ts": row[3],
+            "bytes": size,
+            "rollovers": self.rollovers,
+            "rows_archived": self.rows_archived,
+            "last_rollover_ms": round(self.last_rollover_ms, 3)
+        }
@@ -0,0 +1,126 @@
+"""
+Correlación en memoria de clicks con la ronda siguiente.
+Los clicks se registran en el mismo proceso (report_click_internal) con un
+instante monotónico; la etapa de persistencia saca el más reciente de la sesión
+al guardar cada ronda, sin consultar click_reports. Un click que llega tarde
+por HTTP con su propio timestamp (anterior a una ronda ya guardada sin click)
+se concilia: se devuelve esa ronda para corregirla en la base.
+"""
+import threading
+import time
+from collections import deque
+from typing import NamedTuple, Optional
+
+
+class PendingClick(NamedTuple):
+    """Click a la espera de su ronda"""
+    at: float          # time.monotonic()
+    session_id: int
+    click_type: str
+
+
+class UnmatchedRound(NamedTuple):
+    """Ronda de la mesa principal guardada sin click (candidata a conciliar)"""
+    at: float          # time.monotonic()
+    session_id: int
+    timestamp_ms: int  # Valor de rounds.timestamp
+
+
+class ClickCorrelator:
+    """Anillos de clicks pendientes y de rondas recientes sin click"""
+
+    def __init__(self, window_s: float = 10.0, capacity: int = 64):
+        """
+        Args:
+            window_s: Antigüedad máxima de un click para asignarlo a una ronda
+            capacity: Clicks pendientes (y rondas sin click) que se conservan
+        """
+        self.window_s = float(window_s)
+        self._clicks = deque(maxlen=max(1, int(capacity)))
+        self._rounds = deque(maxlen=max(1, int(capacity)))
+        self._lock = threading.Lock()
+
+        self.added = 0
+        self.matched = 0
+        self.expired = 0
+        self.reconciled = 0
+
+    @staticmethod
+    def monotonic_from_epoch_ms(timestamp_ms: int) -> float:
+        """Instante monotónico equivalente a un timestamp de reloj (epoch ms)"""
+        age_s = max(0.0, time.time() - timestamp_ms / 1000)
+        return time.monotonic() - age_s
+
+    def add(self, session_id: int, click_type: str, at: Optional[float] = None) -> Optional[UnmatchedRound]:
+        """
+        Registrar un click.
+
+        Args:
+            at: Instante monotónico del click (None = ahora)
+
+        Returns:
+            Ronda ya guardada sin click a la que corresponde este click (llegó tarde),
+            o None si el click queda pendiente para la próxima ronda
+        """
+        now = time.monotonic()
+        at = now if at is None else at
+        with self._lock:
+            self.added += 1
+            if at < now:
+                # Click con hora propia: ¿era para una ronda que ya se guardó sin click?
+                for i, round_ in enumerate(self._rounds):
+                    if round_.session_id == session_id and 0 <= round_.at - at <= self.window_s:
+                        del self._rounds[i]
+                        self.reconciled += 1
+                        return round_
+            self._clicks.append(PendingClick(at, session_id, click_type))
+            return None
+
+    def match(self, session_id: int, timestamp_ms: int, at: Optional[float] = None) -> Optional[str]:
+        """
+        Tipo de click para la ronda que se está guardando: el más reciente de la
+        sesión dentro de la ventana (se consume). Sin click, la ronda queda como
+        candidata para conciliar clicks tardíos.
+        """
+        now = time.monotonic() if at is None else at
+        with self._lock:
+            while self._clicks and now - self._clicks[0].at > self.window_s:
+                self._clicks.popleft()
+                self.expired += 1
+            # Normalmente el último es el de esta sesión: O(1)
+            skipped = []
+            found = None
+            while self._clicks:
+                click = self._clicks.pop()
+                if click.session_id == session_id and click.at <= now:
+                    found = click
+                    break
+                skipped.append(click)
+            self._clicks.extend(reversed(skipped))
+            if found is not None:
+                # Los clicks anteriores de la misma ronda quedan reemplazados por el último
+                kept = [c for c in self._clicks if c.session_id != session_id]
+                self.expired += len(self._clicks) - len(kept)
+                self._clicks.clear()
+                self._clicks.extend(kept)
+                self.matched += 1
+                return found.click_type
+            self._rounds.append(UnmatchedRound(now, session_id, timestamp_ms))
+            return None
+
+    def clear(self):
+        with self._lock:
+            self._clicks.clear()
+            self._rounds.clear()
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            pending = len(self._clicks)
+        return {
+            "pending": pending,
+            "window_s": self.window_s,
+            "added": self.added,
+            "matched": self.matched,
+            "expired": self.expired,
+            "reconciled": self.reconciled
+        }
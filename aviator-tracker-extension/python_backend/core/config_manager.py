@@ -31,7 +31,103 @@ class ConfigManager:
                 "interval_ms": 1000,
                 "confidence_threshold": 0.7,
                 "tesseract_path": r"C:\Program Files\Tesseract-OCR\tesseract.exe",
-                "debug": False
+                # Motor de aviator_vision.recognition ('persistent' = libtesseract en proceso,
+                # 'pytesseract') o 'auto': el más rápido que alcanza benchmark.min_accuracy
+                "engine": "auto",
+                "benchmark": {
+                    "candidates": ["persistent", "pytesseract"],
+                    "min_accuracy": 0.9
+                },
+                "template": {
+                    "enabled": True,
+                    "min_confidence": 0.85,
+                    "atlas_path": "glyph_atlas.npz"
+                },
+                "change_detection": {
+                    "enabled": True,
+                    "threshold": 12.0
+                },
+                "roi": {
+                    "enabled": True,
+                    "text_height": 20,  # Altura (px) a la que se escala el texto para Tesseract
+                    "pad": 8
+                },
+                # Fase de la ronda por histograma de color (solo se lee el resultado al entrar en 'crashed')
+                "phase_detection": {
+                    "enabled": True,
+                    "min_red_pixels": 50,
+                    "min_white_pixels": 50,
+                    "crash_hold_s": 1.0
+                },
+                # Grabación de frames para replay (POST /ocr/record)
+                "recording": {
+                    "path": "recordings",
+                    "chunk_size": 64
+                },
+                # Mesas extra [{name, x, y, width, height}] (la principal es calibration.multiplier_region)
+                "tables": [],
+                # Con "debug": true los últimos frames quedan en un anillo en memoria y se
+                # vuelcan a out_dir ante una lectura fallida o de baja confianza
+                # (GET /ocr/debug/frames descarga los últimos N en un ZIP)
+                "debug": False,
+                "debug_frames": {
+                    "capacity": 64,
+                    "out_dir": "debug_ocr",
+                    "max_dumps": 20,
+                    "min_dump_interval_s": 10.0,
+                    "min_confidence": 0.6
+                }
+            },
+            "capture": {
+                "backend": "mss",  # 'mss' (vista sin copias) | 'pyautogui'
+                "scheduler": {
+                    "enabled": True,  # False = captura fija cada ocr.interval_ms
+                    # Frecuencia por fase de la ronda (Hz)
+                    "rates_hz": {
+                        "idle": 0.2,
+                        "flying": 1.0,
+                        "long_flight": 0.5,
+                        "crashed": 4.0,
+                        "cooldown": 0.5
+                    },
+                    "idle_after_s": 10.0,
+                    "long_flight_s": 10.0,
+                    "crash_window_s": 2.0
+                }
+            },
+            "pipeline": {
+                "recognition_workers": 1,  # Workers de reconocimiento en paralelo
+                "frame_queue_size": 2,
+                "round_queue_size": 32,
+                "decision_queue_size": 2,
+                # Clicks en memoria a la espera de su ronda: antigüedad máxima y cuántos se conservan
+                "click_window_s": 10.0,
+                "pending_clicks": 64,
+                # Tesseract en un pool de procesos (uno por núcleo) cuando hay varias mesas
+                "process_pool": {
+                    "enabled": True,
+                    "workers": 0,  # 0 = os.cpu_count()
+                    "min_tables": 2
+                }
+            },
+            # SQLite: conexiones persistentes en modo WAL
+            "database": {
+                "max_idle_connections": 4,
+                "busy_timeout_ms": 5000,
+                "synchronous": "NORMAL",  # 'FULL' = fsync en cada commit
+                # Cambios de la tabla config agrupados y escritos cada N segundos (0 = al momento)
+                "config_flush_interval_s": 1.0,
+                # Inserts de rondas/clicks agrupados: commit cada N filas o cada N ms
+                "write_batch_size": 64,
+                "write_flush_ms": 250,
+                # Historial por niveles: la tabla rounds guarda las últimas hot_rounds rondas;
+                # las demás pasan a segmentos .npz en archive_path (cada archive_every_rounds)
+                "hot_rounds": 500,
+                "archive_every_rounds": 100,
+                "archive_path": "archive",
+                # Serie columnar (np.memmap) de todas las rondas para estadísticas y backtests
+                "series_path": "series",
+                "series_chunk_rows": 262144
             },
             "overlay": {
                 "color": "#22c55e",
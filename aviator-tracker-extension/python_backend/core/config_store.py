@@ -0,0 +1,209 @@
+"""
+Caché en memoria de la tabla `config` de SQLite (sesión actual, target,
+contadores anti-AFK...). No confundir con ConfigManager, que maneja config.json.
+
+Se carga una vez al arrancar; las lecturas salen del diccionario y las escrituras
+se acumulan y se escriben juntas (write-behind) cada `flush_interval_s`, al
+pedirlo o al cerrar. Cada volcado es una única transacción: tras un corte, la
+tabla queda en el estado de un volcado completo (nunca con la mitad de un grupo
+de claves que se cambiaron juntas).
+"""
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+
+TRUE_VALUES = ('true', '1', 'yes', 'si', 'sí', 'on')
+
+
+class ConfigStore:
+    """Diccionario clave -> valor (str) con lecturas tipadas y escritura diferida"""
+
+    def __init__(self, connect: Callable, flush_interval_s: float = 1.0):
+        """
+        Args:
+            connect: Función que devuelve una conexión SQLite (get_db_connection)
+            flush_interval_s: Espera máxima antes de escribir los cambios (0 = escribir al momento)
+        """
+        self._connect = connect
+        self.flush_interval_s = max(0.0, float(flush_interval_s))
+        self._values: Dict[str, str] = {}
+        self._typed: Dict[tuple, object] = {}   # (clave, tipo) -> valor ya convertido
+        self._dirty: Dict[str, int] = {}        # clave -> versión pendiente de escribir
+        self._version = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()     # Un volcado a la vez
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.reads = 0
+        self.writes = 0
+        self.flushes = 0
+        self.rows_flushed = 0
+        self.flush_errors = 0
+        self.last_flush_ms = 0.0
+
+    def load(self):
+        """Cargar la tabla completa (al arrancar, después de init_db)"""
+        conn = self._connect()
+        try:
+            rows = conn.execute('SELECT key, value FROM config').fetchall()
+        finally:
+            conn.close()
+        with self._lock:
+            self._values = {row[0]: row[1] for row in rows}
+            self._typed.clear()
+            self._dirty.clear()
+        self._ensure_flusher()
+
+    # ------------------------------------------------------------------
+    # Lecturas
+    # ------------------------------------------------------------------
+
+    def get(self, key: str, default=None) -> Optional[str]:
+        """Valor crudo (str) como lo guarda la tabla"""
+        self.reads += 1
+        value = self._values.get(key)
+        return default if value is None else value
+
+    def _get_typed(self, key: str, default, kind: type, convert: Callable):
+        self.reads += 1
+        cache_key = (key, kind)
+        try:
+            return self._typed[cache_key]
+        except KeyError:
+            pass
+        raw = self._values.get(key)
+        if raw is None:
+            return default
+        try:
+            value = convert(raw)
+        except (TypeError, ValueError):
+            return default
+        with self._lock:
+            if self._values.get(key) == raw:  # No cachear si cambió mientras se convertía
+                self._typed[cache_key] = value
+        return value
+
+    def get_int(self, key: str, default: int = 0) -> int:
+        return self._get_typed(key, default, int, lambda raw: int(float(raw)))
+
+    def get_float(self, key: str, default: float = 0.0) -> float:
+        return self._get_typed(key, default, float, float)
+
+    def get_bool(self, key: str, default: bool = False) -> bool:
+        return self._get_typed(key, default, bool, lambda raw: raw.strip().lower() in TRUE_VALUES)
+
+    # ------------------------------------------------------------------
+    # Escrituras
+    # ------------------------------------------------------------------
+
+    def set(self, key: str, value, flush: bool = False):
+        """
+        Cambiar un valor (visible al momento para todos los threads).
+
+        Args:
+            flush: Escribir ya a la base de datos y esperar (cambios que no deben perderse)
+        """
+        raw = str(value).lower() if isinstance(value, bool) else str(value)
+        with self._lock:
+            self._values[key] = raw
+            self._typed = {k: v for k, v in self._typed.items() if k[0] != key}
+            self._version += 1
+            self._dirty[key] = self._version
+            self.writes += 1
+        if flush or self.flush_interval_s == 0:
+            self.flush()
+        else:
+            self._ensure_flusher()
+
+    def update(self, values: Dict[str, object], flush: bool = False):
+        """Cambiar varias claves juntas (se escriben en el mismo volcado)"""
+        with self._lock:
+            for key, value in values.items():
+                self._values[key] = str(value).lower() if isinstance(value, bool) else str(value)
+                self._version += 1
+                self._dirty[key] = self._version
+                self.writes += 1
+            self._typed = {k: v for k, v in self._typed.items() if k[0] not in values}
+        if flush or self.flush_interval_s == 0:
+            self.flush()
+        else:
+            self._ensure_flusher()
+
+    def flush(self) -> int:
+        """Escribir los cambios pendientes en una transacción. Devuelve las filas escritas"""
+        with self._flush_lock:
+            with self._lock:
+                if not self._dirty:
+                    return 0
+                pending = dict(self._dirty)
+                rows = [(key, self._values[key]) for key in pending]
+            start = time.perf_counter()
+            conn = self._connect()
+            try:
+                conn.executemany('INSERT OR REPLACE INTO config (key, value) VALUES (?, ?)', rows)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                self.flush_errors += 1
+                raise  # Los cambios siguen pendientes para el próximo volcado
+            finally:
+                conn.close()
+            with self._lock:
+                # Solo se limpian las versiones escritas: un set() durante el volcado queda pendiente
+                for key, version in pending.items():
+                    if self._dirty.get(key) == version:
+                        del self._dirty[key]
+                self.flushes += 1
+                self.rows_flushed += len(rows)
+                self.last_flush_ms = (time.perf_counter() - start) * 1000
+            return len(rows)
+
+    # ------------------------------------------------------------------
+    # Volcado periódico
+    # ------------------------------------------------------------------
+
+    def _ensure_flusher(self):
+        if self.flush_interval_s == 0 or self._stop.is_set():
+            return
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._flush_loop, name="config-flush", daemon=True)
+                    self._thread.start()
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval_s):
+            if self._dirty:
+                try:
+                    self.flush()
+                except Exception as e:
+                    print(f"❌ Error guardando config: {e}")
+
+    def close(self):
+        """Detener el volcado periódico y escribir lo pendiente (al cerrar el servidor)"""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(self.flush_interval_s + 1)
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"❌ Error guardando config al cerrar: {e}")
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            pending = len(self._dirty)
+            keys = len(self._values)
+        return {
+            "keys": keys,
+            "pending": pending,
+            "reads": self.reads,
+            "writes": self.writes,
+            "flushes": self.flushes,
+            "rows_flushed": self.rows_flushed,
+            "flush_errors": self.flush_errors,
+            "last_flush_ms": round(self.last_flush_ms, 3),
+            "flush_interval_s": self.flush_interval_s
+        }
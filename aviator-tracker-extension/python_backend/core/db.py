@@ -0,0 +1,210 @@
+"""
+Conexiones SQLite reutilizables para el servidor.
+Cada thread toma una conexión del pool la primera vez que la pide y la sigue
+usando mientras la tenga abierta (las llamadas anidadas reciben la misma);
+`close()` la devuelve al pool en lugar de cerrarla. Las conexiones se abren una
+sola vez con WAL y synchronous=NORMAL, y conservan su caché de sentencias
+preparadas (las consultas calientes se compilan una vez por conexión).
+"""
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+# Sentencias distintas con tiempos registrados (el resto se agrupa)
+MAX_TRACKED_STATEMENTS = 200
+
+# Instante actual en epoch ms calculado por SQLite (default de las columnas timestamp).
+# julianday() da un REAL: sin ROUND el CAST trunca y un segundo exacto queda 1 ms antes
+NOW_MS_SQL = "CAST(ROUND((julianday('now') - 2440587.5) * 86400000) AS INTEGER)"
+
+# Timestamp viejo (texto 'YYYY-MM-DD HH:MM:SS' de CURRENT_TIMESTAMP, ms de JS
+# guardados por /ocr/save, o segundos) a epoch ms (columna `timestamp`)
+LEGACY_TS_TO_MS = '''
+    COALESCE(CASE
+        WHEN typeof(timestamp) IN ('integer', 'real')
+            THEN CAST(ROUND(CASE WHEN timestamp < 100000000000 THEN timestamp * 1000 ELSE timestamp END) AS INTEGER)
+        WHEN timestamp GLOB '[0-9]*' AND timestamp NOT GLOB '*[^0-9.]*'
+            THEN CAST(ROUND(CASE WHEN CAST(timestamp AS REAL) < 100000000000
+                      THEN CAST(timestamp AS REAL) * 1000 ELSE CAST(timestamp AS REAL) END) AS INTEGER)
+        ELSE CAST(ROUND((julianday(timestamp) - 2440587.5) * 86400000) AS INTEGER)
+    END, 0)
+'''
+
+
+class PooledConnection(sqlite3.Connection):
+    """Conexión del pool: mide cada sentencia y close() la devuelve al pool"""
+
+    pool: "ConnectionPool" = None
+
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self.pool._timed(sql, start)
+
+    def executemany(self, sql, seq_of_parameters):
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self.pool._timed(sql, start)
+
+    def close(self):
+        self.pool.release(self)
+
+    def close_for_real(self):
+        super().close()
+
+
+class ConnectionPool:
+    """Una conexión por thread mientras está en uso; las libres se reutilizan"""
+
+    def __init__(self, path: str, max_idle: int = 4, busy_timeout_ms: int = 5000,
+                 synchronous: str = "NORMAL", cached_statements: int = 256):
+        """
+        Args:
+            path: Archivo de la base de datos
+            max_idle: Conexiones libres que se conservan (las demás se cierran)
+            busy_timeout_ms: Espera máxima por el lock de escritura
+            synchronous: PRAGMA synchronous (NORMAL: sin fsync por commit con WAL)
+            cached_statements: Tamaño de la caché de sentencias preparadas por conexión
+        """
+        self.path = path
+        self.max_idle = max(0, int(max_idle))
+        self.busy_timeout_ms = int(busy_timeout_ms)
+        self.synchronous = synchronous
+        self.cached_statements = int(cached_statements)
+        self._local = threading.local()
+        self._idle: List[PooledConnection] = []
+        self._lock = threading.Lock()
+        self._statements: Dict[str, list] = {}
+
+        self.opened = 0
+        self.closed = 0
+        self.checkouts = 0
+        self.reused = 0
+        self.open_ms = 0.0
+        self.rollbacks = 0  # Transacciones que quedaron abiertas al devolver la conexión
+
+    def _open(self) -> PooledConnection:
+        start = time.perf_counter()
+        conn = sqlite3.connect(
+            self.path,
+            factory=PooledConnection,
+            check_same_thread=False,  # Una conexión del pool cambia de thread entre usos
+            cached_statements=self.cached_statements
+        )
+        conn.pool = self
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(f'PRAGMA synchronous={self.synchronous}')
+        conn.execute(f'PRAGMA busy_timeout={self.busy_timeout_ms}')
+        with self._lock:
+            self.opened += 1
+            self.open_ms += (time.perf_counter() - start) * 1000
+        return conn
+
+    def acquire(self) -> PooledConnection:
+        """Conexión del thread actual (la misma si ya tiene una abierta)"""
+        local = self._local
+        conn = getattr(local, 'conn', None)
+        if conn is not None:
+            local.depth += 1
+            return conn
+        with self._lock:
+            self.checkouts += 1
+            conn = self._idle.pop() if self._idle else None
+            if conn is not None:
+                self.reused += 1
+        if conn is None:
+            conn = self._open()
+        local.conn, local.depth = conn, 1
+        return conn
+
+    def release(self, conn: PooledConnection):
+        """Devolver la conexión (al cerrar la última referencia del thread)"""
+        local = self._local
+        if getattr(local, 'conn', None) is not conn:
+            return  # Cierre repetido: la conexión ya volvió al pool
+        local.depth -= 1
+        if local.depth <= 0:
+            self._checkin(conn)
+
+    def release_thread(self):
+        """Devolver la conexión del thread actual aunque falten close() (fin de request)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            self._checkin(conn)
+
+    def _checkin(self, conn: PooledConnection):
+        self._local.conn, self._local.depth = None, 0
+        try:
+            if conn.in_transaction:
+                # Un error dejó cambios sin commit: no deben filtrarse al próximo uso
+                conn.rollback()
+                with self._lock:
+                    self.rollbacks += 1
+        except sqlite3.Error:
+            conn.close_for_real()
+            return
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+            self.closed += 1
+        conn.close_for_real()
+
+    def close_all(self):
+        """Cerrar las conexiones libres (las que están en uso vuelven y se conservan)"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self.closed += len(idle)
+        for conn in idle:
+            conn.close_for_real()
+
+    def _timed(self, sql: str, start: float):
+        elapsed = (time.perf_counter() - start) * 1000
+        key = " ".join(sql.split())[:120]
+        with self._lock:
+            stats = self._statements.get(key)
+            if stats is None:
+                if len(self._statements) >= MAX_TRACKED_STATEMENTS:
+                    key = "(otras)"
+                    stats = self._statements.setdefault(key, [0, 0.0, 0.0])
+                else:
+                    stats = self._statements[key] = [0, 0.0, 0.0]
+            stats[0] += 1
+            stats[1] += elapsed
+            stats[2] = max(stats[2], elapsed)
+
+    def get_stats(self, top: Optional[int] = 20) -> dict:
+        """Conexiones abiertas/reutilizadas y sentencias más costosas (tiempo total)"""
+        with self._lock:
+            statements = sorted(self._statements.items(), key=lambda item: item[1][1], reverse=True)
+            return {
+                "path": self.path,
+                "opened": self.opened,
+                "closed": self.closed,
+                "idle": len(self._idle),
+                "checkouts": self.checkouts,
+                "reused": self.reused,
+                "rollbacks": self.rollbacks,
+                "avg_open_ms": round(self.open_ms / self.opened, 3) if self.opened else 0.0,
+                "statements": [
+                    {
+                        "sql": sql,
+                        "count": count,
+                        "total_ms": round(total, 3),
+                        "avg_ms": round(total / count, 3),
+                        "max_ms": round(worst, 3)
+                    }
+                    for sql, (count, total, worst) in statements[:top]
+                ]
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self._statements.clear()
@@ -0,0 +1,219 @@
+"""
+Escritura diferida y agrupada de filas en SQLite.
+Los threads del tracker y de Flask encolan inserts (sin esperar al disco); un
+thread escritor los agrupa en una transacción por lote (executemany por cada
+tramo consecutivo de la misma sentencia, respetando el orden de llegada) y
+hace commit al juntar `batch_size` filas o al pasar `flush_interval_s`.
+`flush()` espera a que todo lo encolado antes esté confirmado (read-your-writes).
+"""
+import queue
+import threading
+import time
+from typing import Callable, Dict, Optional, Sequence
+
+
+class _Barrier:
+    """Marca en la cola: se señala cuando todo lo anterior está confirmado"""
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+class BatchWriter:
+    """Thread escritor con lotes por tamaño o tiempo y métricas de commit"""
+
+    def __init__(self, connect: Callable, batch_size: int = 64, flush_interval_s: float = 0.25,
+                 queue_size: int = 10000, on_commit: Optional[Callable[[Dict[str, int]], None]] = None,
+                 log: Callable[[str], None] = print):
+        """
+        Args:
+            connect: Función que devuelve una conexión SQLite (get_db_connection)
+            batch_size: Filas por transacción como máximo
+            flush_interval_s: Espera máxima de una fila antes del commit
+            queue_size: Filas encoladas como máximo (el productor espera si se llena)
+            on_commit: Callback tras cada commit con {sentencia: filas escritas}
+            log: Función para reportar errores
+        """
+        self._connect = connect
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval_s = max(0.0, float(flush_interval_s))
+        self.on_commit = on_commit
+        self._log = log
+        self._statements: Dict[str, str] = {}
+        self._queue = queue.Queue(maxsize=max(1, int(queue_size)))
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopping = False
+        self._pending = 0
+
+        self.submitted = 0
+        self.written = 0
+        self.failed = 0
+        self.batches = 0
+        self.max_batch = 0
+        self.commit_ms_total = 0.0
+        self.commit_ms_max = 0.0
+        self.barriers = 0
+
+    def register(self, name: str, sql: str):
+        """Registrar una sentencia por nombre (ej: 'rounds' -> INSERT INTO rounds ...)"""
+        self._statements[name] = sql
+
+    def submit(self, name: str, params: Sequence):
+        """Encolar una fila para la sentencia `name` (no espera al disco)"""
+        if name not in self._statements:
+            raise KeyError(f"Sentencia no registrada: {name}")
+        with self._lock:
+            self._pending += 1
+            self.submitted += 1
+        self._ensure_thread()
+        self._queue.put((name, tuple(params)))
+
+    def flush(self, timeout: Optional[float] = 5.0) -> bool:
+        """Esperar a que lo encolado hasta ahora esté confirmado. False si vence el timeout"""
+        if self._pending == 0:
+            return True
+        if threading.current_thread() is self._thread:
+            return False  # Desde el propio escritor (on_commit): no puede esperarse a sí mismo
+        barrier = _Barrier()
+        with self._lock:
+            self.barriers += 1
+        self._ensure_thread()
+        self._queue.put(barrier)
+        return barrier.done.wait(timeout)
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    # ------------------------------------------------------------------
+    # Thread escritor
+    # ------------------------------------------------------------------
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=1.0)
+            except queue.Empty:
+                if self._stopping:
+                    return
+                continue
+            if item is None:
+                return
+
+            # Juntar filas hasta llenar el lote, vencer el plazo o encontrar una barrera
+            batch, barriers = [], []
+            deadline = time.perf_counter() + self.flush_interval_s
+            while True:
+                if isinstance(item, _Barrier):
+                    barriers.append(item)
+                    break  # Quien espera no debe esperar al plazo
+                if item is None:
+                    self._stopping = True
+                    break
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                remaining = deadline - time.perf_counter()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            if batch:
+                self._write(batch)
+            for barrier in barriers:
+                barrier.done.set()
+            if self._stopping and self._queue.empty():
+                return
+
+    def _write(self, batch):
+        start = time.perf_counter()
+        counts: Dict[str, int] = {}
+        conn = self._connect()
+        try:
+            try:
+                for name, rows in self._runs(batch):
+                    conn.executemany(self._statements[name], rows)
+                    counts[name] = counts.get(name, 0) + len(rows)
+                conn.commit()
+                failed = 0
+            except Exception as e:
+                conn.rollback()
+                self._log(f"Error escribiendo lote de {len(batch)} filas ({e}), reintentando fila por fila")
+                counts, failed = self._write_one_by_one(conn, batch)
+        finally:
+            conn.close()
+        elapsed = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self._pending -= len(batch)
+            self.written += len(batch) - failed
+            self.failed += failed
+            self.batches += 1
+            self.max_batch = max(self.max_batch, len(batch))
+            self.commit_ms_total += elapsed
+            self.commit_ms_max = max(self.commit_ms_max, elapsed)
+        if self.on_commit and counts:
+            try:
+                self.on_commit(counts)
+            except Exception as e:
+                self._log(f"Error en on_commit del escritor: {e}")
+
+    def _write_one_by_one(self, conn, batch):
+        """Aislar la fila inválida: las demás del lote se escriben igual"""
+        counts, failed = {}, 0
+        for name, params in batch:
+            try:
+                conn.execute(self._statements[name], params)
+                conn.commit()
+                counts[name] = counts.get(name, 0) + 1
+            except Exception as e:
+                conn.rollback()
+                failed += 1
+                self._log(f"Fila descartada ({name}): {e}")
+        return counts, failed
+
+    @staticmethod
+    def _runs(batch):
+        """Tramos consecutivos de la misma sentencia (mantiene el orden entre tablas)"""
+        name, rows = None, []
+        for item_name, params in batch:
+            if item_name != name and rows:
+                yield name, rows
+                rows = []
+            name = item_name
+            rows.append(params)
+        if rows:
+            yield name, rows
+
+    def close(self, timeout: float = 5.0):
+        """Escribir lo pendiente y detener el thread (al cerrar el servidor)"""
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        self._queue.put(None)
+        thread.join(timeout)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "pending": self._pending,
+                "submitted": self.submitted,
+                "written": self.written,
+                "failed": self.failed,
+                "batches": self.batches,
+                "avg_batch": round(self.written / self.batches, 2) if self.batches else 0.0,
+                "max_batch": self.max_batch,
+                "avg_commit_ms": round(self.commit_ms_total / self.batches, 3) if self.batches else 0.0,
+                "max_commit_ms": round(self.commit_ms_max, 3),
+                "flush_waits": self.barriers,
+                "batch_size": self.batch_size,
+                "flush_interval_s": self.flush_interval_s
+            }
@@ -0,0 +1,192 @@
+"""
+Exportación de rondas en streaming (CSV, NDJSON o Parquet).
+Recorre primero los segmentos del historial frío y después la tabla `rounds`
+con un cursor (fetchmany por bloques), todo dentro de una misma transacción de
+lectura: el manifiesto y la tabla se ven en el mismo instante aunque un
+archivado corra mientras se exporta. Cada bloque se serializa y se entrega
+apenas está listo, así la memoria no depende del tamaño del historial.
+"""
+import csv
+import io
+import json
+from typing import Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from core.archive import COLUMNS, TEXT_COLUMNS
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+
+CHUNK_ROWS = 5000
+
+# formato -> (Content-Type, extensión)
+FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+# Bloque de filas como columnas paralelas (listas con None para NULL)
+Block = Dict[str, list]
+
+
+def available_formats() -> List[str]:
+    return [fmt for fmt in FORMATS if fmt != "parquet" or pq is not None]
+
+
+def _from_archive(part: Dict[str, np.ndarray]) -> Block:
+    """Columnas de un segmento con los NULL de vuelta (-1, NaN y '' -> None)"""
+    block = {}
+    for name in COLUMNS:
+        values = part[name]
+        if name in TEXT_COLUMNS:
+            block[name] = [v or None for v in values.tolist()]
+        elif values.dtype.kind == 'f':
+            block[name] = [None if v != v else v for v in values.tolist()]
+        elif name == 'session_id':
+            block[name] = [None if v < 0 else v for v in values.tolist()]
+        else:
+            block[name] = values.tolist()
+    return block
+
+
+def iter_blocks(connect: Callable, archive=None, session_id: Optional[int] = None,
+                since_ms: Optional[int] = None, until_ms: Optional[int] = None,
+                chunk_rows: int = CHUNK_ROWS) -> Iterator[Block]:
+    """
+    Bloques de hasta `chunk_rows` rondas en orden de id (archivo y después tabla).
+
+    Args:
+        connect: Debe devolver la conexión del thread (ConnectionPool.acquire) para
+                 que el archivo lea el manifiesto dentro de la misma transacción
+        archive: RoundArchive (None = solo la tabla caliente)
+    """
+    where, params = [], []
+    if session_id is not None:
+        where.append('session_id = ?')
+        params.append(session_id)
+    if since_ms is not None:
+        where.append('timestamp >= ?')
+        params.append(since_ms)
+    if until_ms is not None:
+        where.append('timestamp <= ?')
+        params.append(until_ms)
+    sql = f"SELECT {', '.join(COLUMNS)} FROM rounds"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY id"
+
+    conn = connect()
+    try:
+        conn.execute('BEGIN')  # Snapshot de lectura para el manifiesto y la tabla
+        if archive is not None:
+            for part in archive.scan(COLUMNS, since_ms, until_ms, session_id):
+                block = _from_archive(part)
+                for start in range(0, len(block['id']), chunk_rows):
+                    yield {name: values[start:start + chunk_rows] for name, values in block.items()}
+        cursor = conn.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(chunk_rows)
+            if not rows:
+                break
+            yield {name: [row[i] for row in rows] for i, name in enumerate(COLUMNS)}
+    finally:
+        try:
+            conn.rollback()  # Solo lectura: cerrar la transacción
+        except Exception:
+            pass
+        conn.close()
+
+
+# ------------------------------------------------------------------
+# Serializadores (generadores de bytes)
+# ------------------------------------------------------------------
+
+def stream_csv(blocks: Iterator[Block]) -> Iterator[bytes]:
+    """Cabecera + filas; las columnas timestamp/multiplier se pueden volver a importar"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(COLUMNS)
+    for block in blocks:
+        writer.writerows(zip(*(block[name] for name in COLUMNS)))
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def stream_ndjson(blocks: Iterator[Block]) -> Iterator[bytes]:
+    """Un objeto JSON por línea"""
+    for block in blocks:
+        lines = [json.dumps(dict(zip(COLUMNS, row)), ensure_ascii=False)
+                 for row in zip(*(block[name] for name in COLUMNS))]
+        yield ("\n".join(lines) + "\n").encode('utf-8')
+
+
+class _Drain(io.RawIOBase):
+    """Destino de ParquetWriter que se vacía después de cada row group"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def take(self) -> bytes:
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+
+def _parquet_schema():
+    return pa.schema([
+        ('id', pa.int64()),
+        ('session_id', pa.int64()),
+        ('multiplier', pa.float64()),
+        ('timestamp', pa.int64()),  # epoch ms
+        ('click_type', pa.string()),
+        ('result', pa.string()),
+        ('target_used', pa.float64()),
+        ('source', pa.string()),
+    ])
+
+
+def stream_parquet(blocks: Iterator[Block]) -> Iterator[bytes]:
+    """Un row group por bloque (requiere pyarrow)"""
+    if pq is None:
+        raise RuntimeError("Exportar a Parquet requiere pyarrow (pip install pyarrow)")
+    schema = _parquet_schema()
+    sink = _Drain()
+    writer = pq.ParquetWriter(sink, schema, compression='snappy')
+    try:
+        for block in blocks:
+            writer.write_table(pa.table(block, schema=schema))
+            data = sink.take()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    yield sink.take()  # Pie del archivo (metadatos)
+
+
+SERIALIZERS = {"csv": stream_csv, "ndjson": stream_ndjson, "parquet": stream_parquet}
+
+
+def export_stream(fmt: str, blocks: Iterator[Block]) -> Iterator[bytes]:
+    if fmt not in SERIALIZERS:
+        raise ValueError(f"Formato no soportado: '{fmt}' (usar {', '.join(FORMATS)})")
+    return SERIALIZERS[fmt](blocks)
@@ -0,0 +1,319 @@
+"""
+Importación de historiales exportados a la tabla `rounds`.
+Formatos:
+  - txt: reporte "Base de datos N.txt" de la extensión (tabla de ancho fijo
+    `ID | FECHA | HORA | RESULTADO`, fecha D/M/AAAA en hora local)
+  - csv: columnas Timestamp (ISO 8601 o epoch) y Multiplier
+
+Los archivos se leen línea a línea (generadores) y se cargan en una tabla
+temporal con executemany por lotes; un solo INSERT ... SELECT pasa a `rounds`
+las filas cuya clave (timestamp, multiplier) no está en `round_keys`. Esa tabla
+tiene la clave de todas las rondas guardadas (un trigger la completa en cada
+INSERT en `rounds`, en vivo o importada, y las archivadas no se borran), así ni
+reimportar un archivo con otra etiqueta ni importar un CSV de /api/export
+duplica rondas, aunque las originales ya estén en el historial frío.
+
+Las rondas importadas reciben ids <= 0, por debajo de todos los existentes
+(en orden de timestamp): son historial anterior, así nunca desplazan a las
+rondas en vivo de la tabla caliente y el archivado las mueve enseguida al
+historial frío sin romper el orden de ids archivo < tabla.
+
+Uso:
+    python -m core.importer "../Base de datos 1.txt" "../Base de datos 2.txt" --session 7
+"""
+import argparse
+import csv
+import os
+import re
+import sqlite3
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterable, Iterator, NamedTuple, Optional, TextIO, Tuple
+
+
+IMPORT_SOURCE = "import"  # Prefijo de rounds.source de las filas importadas
+BATCH_SIZE = 5000
+
+KEYS_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS round_keys (
+        timestamp INTEGER NOT NULL,  -- epoch ms
+        multiplier REAL NOT NULL,
+        PRIMARY KEY (timestamp, multiplier)
+    ) WITHOUT ROWID
+'''
+KEYS_TRIGGER = '''
+    CREATE TRIGGER IF NOT EXISTS trg_round_keys AFTER INSERT ON rounds
+    WHEN NEW.timestamp IS NOT NULL AND NEW.multiplier IS NOT NULL BEGIN
+        INSERT OR IGNORE INTO round_keys (timestamp, multiplier) VALUES (NEW.timestamp, NEW.multiplier);
+    END
+'''
+
+# 12    | 3/1/2026   | 8:41:20   | 2.18x
+TXT_ROW_RE = re.compile(
+    r'^\s*\d+\s*\|\s*(\d{1,2})/(\d{1,2})/(\d{4})\s*\|\s*(\d{1,2}):(\d{2})(?::(\d{2}))?\s*\|\s*([\d.,]+)\s*x?\s*$',
+    re.IGNORECASE
+)
+TXT_DATA_START_RE = re.compile(r'^\s*\d+\s*\|')  # Línea de datos (válida o no)
+
+# Una fila mal formada: (número de línea, texto)
+InvalidCallback = Callable[[int, str], None]
+
+
+class ImportResult(NamedTuple):
+    """Resumen de una importación"""
+    source: str
+    read: int         # Filas válidas leídas
+    inserted: int     # Rondas nuevas
+    duplicates: int   # Ya guardadas, en vivo o importadas (o repetidas en el mismo archivo)
+    invalid: int      # Líneas de datos que no se pudieron interpretar
+    elapsed_ms: float
+
+
+def create_schema(cursor) -> bool:
+    """
+    Tabla de claves de rondas y su trigger (la llama init_db dentro de su transacción).
+
+    Returns:
+        True si la tabla es nueva: ya tiene las claves de `rounds`, faltan las
+        del historial frío (ver add_keys)
+    """
+    exists = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'round_keys'"
+    ).fetchone()
+    cursor.execute(KEYS_SCHEMA)
+    cursor.execute(KEYS_TRIGGER)
+    # Claves por etiqueta de la versión anterior: sus rondas están en rounds o en el archivo
+    cursor.execute('DROP TABLE IF EXISTS import_keys')
+    if exists:
+        return False
+    cursor.execute('''
+        INSERT OR IGNORE INTO round_keys (timestamp, multiplier)
+        SELECT timestamp, multiplier FROM rounds WHERE timestamp IS NOT NULL AND multiplier IS NOT NULL
+    ''')
+    return True
+
+
+def add_keys(cursor, parts: Iterable[dict]) -> int:
+    """Agregar las claves de bloques de columnas `timestamp` y `multiplier` (RoundArchive.scan)"""
+    added = 0
+    for part in parts:
+        keys = [(ts, mult) for ts, mult in zip(part['timestamp'].tolist(), part['multiplier'].tolist())
+                if mult == mult]  # Sin multiplicador (NaN) no hay clave
+        cursor.executemany('INSERT OR IGNORE INTO round_keys (timestamp, multiplier) VALUES (?, ?)', keys)
+        added += len(keys)
+    return added
+
+
+def source_name(label: Optional[str] = None) -> str:
+    """Valor de rounds.source para una importación ('import' o 'import:<label>')"""
+    label = (label or "").strip()
+    return f"{IMPORT_SOURCE}:{label}" if label else IMPORT_SOURCE
+
+
+def _local_ms(year, month, day, hour, minute, second, tz) -> int:
+    moment = datetime(year, month, day, hour, minute, second)
+    if tz is not None:
+        moment = moment.replace(tzinfo=tz)
+    return int(moment.timestamp() * 1000)  # Sin tz: hora local de esta máquina
+
+
+def _multiplier(text: str) -> float:
+    return round(float(text.strip().lower().rstrip('x').replace(',', '.')), 2)
+
+
+def parse_timestamp(value: str, tz=None) -> int:
+    """ISO 8601 (con o sin zona) o epoch en segundos/ms a epoch ms"""
+    value = value.strip()
+    try:
+        number = float(value)
+    except ValueError:
+        moment = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        if moment.tzinfo is None and tz is not None:
+            moment = moment.replace(tzinfo=tz)
+        return int(moment.timestamp() * 1000)
+    return int(number * 1000 if number < 100000000000 else number)
+
+
+# ------------------------------------------------------------------
+# Lectores (generadores de (timestamp_ms, multiplier))
+# ------------------------------------------------------------------
+
+def parse_txt(lines: Iterable[str], tz=None, on_invalid: Optional[InvalidCallback] = None) -> Iterator[Tuple[int, float]]:
+    """Filas del reporte de ancho fijo; cabeceras y separadores se ignoran"""
+    for number, line in enumerate(lines, 1):
+        match = TXT_ROW_RE.match(line)
+        if match is None:
+            if on_invalid and TXT_DATA_START_RE.match(line):
+                on_invalid(number, line.rstrip())
+            continue
+        day, month, year, hour, minute, second, value = match.groups()
+        try:
+            yield (_local_ms(int(year), int(month), int(day), int(hour), int(minute), int(second or 0), tz),
+                   _multiplier(value))
+        except ValueError:
+            if on_invalid:
+                on_invalid(number, line.rstrip())
+
+
+def parse_csv(lines: Iterable[str], tz=None, on_invalid: Optional[InvalidCallback] = None) -> Iterator[Tuple[int, float]]:
+    """Filas con columnas Timestamp y Multiplier (sin distinguir mayúsculas)"""
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
+        return
+    names = [name.strip().lower() for name in header]
+    try:
+        ts_col, mult_col = names.index('timestamp'), names.index('multiplier')
+    except ValueError:
+        raise ValueError(f"El CSV necesita columnas Timestamp y Multiplier (tiene: {', '.join(header)})")
+    for row in reader:
+        if not row:
+            continue
+        try:
+            yield parse_timestamp(row[ts_col], tz), _multiplier(row[mult_col])
+        except (IndexError, ValueError):
+            if on_invalid:
+                on_invalid(reader.line_num, ",".join(row))
+
+
+PARSERS = {"txt": parse_txt, "csv": parse_csv}
+
+
+def detect_format(filename: str) -> str:
+    ext = os.path.splitext(filename)[1].lower().lstrip('.')
+    if ext not in PARSERS:
+        raise ValueError(f"Formato no soportado: '{ext or filename}' (usar {', '.join(PARSERS)})")
+    return ext
+
+
+# ------------------------------------------------------------------
+# Carga
+# ------------------------------------------------------------------
+
+def _batches(rows: Iterator[tuple], size: int) -> Iterator[list]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def import_rounds(conn, rows: Iterable[Tuple[int, float]], source: str = IMPORT_SOURCE,
+                  session_id: Optional[int] = None, batch_size: int = BATCH_SIZE) -> ImportResult:
+    """
+    Insertar rondas (timestamp_ms, multiplier) sin duplicar, en una transacción.
+    Los ids asignados son <= 0 y menores que los de cualquier ronda guardada.
+
+    Args:
+        conn: Conexión SQLite (con las tablas rounds y round_keys)
+        source: Valor de rounds.source (no forma parte de la clave de duplicados)
+        session_id: Partida a la que se asignan (None = sin partida)
+    """
+    start = time.perf_counter()
+    read = 0
+    conn.execute('''
+        CREATE TEMP TABLE IF NOT EXISTS import_stage (
+            timestamp INTEGER NOT NULL,
+            multiplier REAL NOT NULL
+        )
+    ''')
+    try:
+        conn.execute('DELETE FROM import_stage')
+        for batch in _batches(iter(rows), max(1, int(batch_size))):
+            conn.executemany('INSERT INTO import_stage (timestamp, multiplier) VALUES (?, ?)', batch)
+            read += len(batch)
+        # Los ids bajan desde el menor guardado (tabla o archivo) y nunca pasan de 0
+        floor_id = conn.execute('''
+            SELECT MIN(m) FROM (
+                SELECT MIN(id) AS m FROM rounds
+                UNION ALL SELECT MIN(first_id) FROM archive_segments
+                UNION ALL SELECT 1
+            )
+        ''').fetchone()[0]
+        cursor = conn.execute('''
+            INSERT INTO rounds (id, session_id, multiplier, timestamp, source)
+            SELECT ? - ROW_NUMBER() OVER (ORDER BY s.timestamp DESC, s.multiplier DESC), ?, s.multiplier, s.timestamp, ?
+            FROM (SELECT DISTINCT timestamp, multiplier FROM import_stage) s
+            WHERE NOT EXISTS (
+                SELECT 1 FROM round_keys k WHERE k.timestamp = s.timestamp AND k.multiplier = s.multiplier
+            )
+        ''', (floor_id, session_id, source))
+        inserted = cursor.rowcount  # trg_round_keys ya agregó sus claves
+        conn.execute('DELETE FROM import_stage')
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    elapsed = (time.perf_counter() - start) * 1000
+    return ImportResult(source, read, inserted, read - inserted, 0, elapsed)
+
+
+def import_stream(conn, stream: TextIO, fmt: str, source: str = IMPORT_SOURCE,
+                  session_id: Optional[int] = None, tz=None, batch_size: int = BATCH_SIZE) -> ImportResult:
+    """Importar desde un archivo de texto abierto (o un upload envuelto en TextIOWrapper)"""
+    if fmt not in PARSERS:
+        raise ValueError(f"Formato no soportado: '{fmt}' (usar {', '.join(PARSERS)})")
+    invalid = []
+    rows = PARSERS[fmt](stream, tz=tz, on_invalid=lambda number, line: invalid.append(number))
+    result = import_rounds(conn, rows, source, session_id, batch_size)
+    return result._replace(invalid=len(invalid))  # El lector ya se consumió
+
+
+def import_file(conn, path: str, fmt: Optional[str] = None, source: str = IMPORT_SOURCE,
+                session_id: Optional[int] = None, tz=None, batch_size: int = BATCH_SIZE) -> ImportResult:
+    """Importar un archivo .txt o .csv del disco"""
+    fmt = fmt or detect_format(path)
+    with open(path, 'r', encoding='utf-8-sig', errors='replace', newline='') as f:
+        return import_stream(conn, f, fmt, source, session_id, tz, batch_size)
+
+
+def parse_tz(offset: Optional[str]):
+    """'-03:00' / '+2' / 'utc' a tzinfo (None = hora local de esta máquina)"""
+    if offset is None or offset == "":
+        return None
+    if offset.lower() in ('utc', 'z'):
+        return timezone.utc
+    match = re.match(r'^([+-])(\d{1,2})(?::?(\d{2}))?$', offset.strip())
+    if match is None:
+        raise ValueError(f"Zona horaria inválida: {offset} (ej: -03:00, +2, utc)")
+    sign = -1 if match.group(1) == '-' else 1
+    minutes = int(match.group(2)) * 60 + int(match.group(3) or 0)
+    return timezone(sign * timedelta(minutes=minutes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importar historiales (.txt de la extensión o .csv) a aviator_stats.db")
+    parser.add_argument('files', nargs='+', help="Archivos a importar")
+    parser.add_argument('--db', default=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                                     'aviator_stats.db'))
+    parser.add_argument('--format', choices=sorted(PARSERS), help="Forzar formato (por defecto según extensión)")
+    parser.add_argument('--source', default="", help="Etiqueta: rounds.source = 'import:<etiqueta>'")
+    parser.add_argument('--session', type=int, help="Partida a la que se asignan las rondas")
+    parser.add_argument('--tz', help="Zona de las horas sin zona (ej: --tz=-03:00; por defecto la local)")
+    parser.add_argument('--batch', type=int, default=BATCH_SIZE, help="Filas por executemany")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA busy_timeout=5000')
+    tables = conn.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name IN ('rounds', 'round_keys')"
+    ).fetchone()[0]
+    if tables < 2:
+        # round_keys necesita también las claves del historial frío: las carga el servidor
+        raise SystemExit(f"❌ {args.db} no tiene las tablas rounds/round_keys (arrancar el servidor una vez)")
+    tz = parse_tz(args.tz)
+    try:
+        for path in args.files:
+            result = import_file(conn, path, args.format, source_name(args.source), args.session, tz, args.batch)
+            print(f"📥 {os.path.basename(path)}: {result.read} leídas, {result.inserted} nuevas, "
+                  f"{result.duplicates} duplicadas, {result.invalid} inválidas ({result.elapsed_ms:.0f} ms)")
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
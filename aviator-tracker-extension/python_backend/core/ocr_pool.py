@@ -0,0 +1,107 @@
+"""
+Pool de procesos para el OCR de respaldo (Tesseract).
+Cada proceso crea y carga su propio motor (aviator_vision.recognition) una sola
+vez en el initializer y lee máscaras del texto, de modo que varias mesas se
+leen en paralelo sin competir por el GIL ni por el lock de un único motor.
+"""
+import os
+import time
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import numpy as np
+
+from aviator_vision.recognition import Recognizer, RecognitionResult, create_backend
+
+
+# Motor del proceso worker (se crea en _init_worker)
+_recognizer: Optional[Recognizer] = None
+
+
+def _init_worker(backend: str, options: dict):
+    global _recognizer
+    try:
+        recognizer = create_backend(backend, **options)
+        if not recognizer.load():
+            print(f"⚠️ Worker OCR {os.getpid()}: motor '{backend}' no disponible")
+        _recognizer = recognizer
+    except Exception as e:
+        print(f"⚠️ Worker OCR {os.getpid()} sin motor: {e}")
+
+
+def _read(mask: np.ndarray) -> RecognitionResult:
+    if _recognizer is None:
+        raise RuntimeError("Worker OCR sin motor")
+    return _recognizer.read(mask)
+
+
+def _worker_backend() -> Optional[str]:
+    return _recognizer.name if _recognizer is not None else None
+
+
+class RecognitionPool:
+    """Pool de procesos con un motor de reconocimiento por proceso"""
+
+    def __init__(self, backend: str, options: Optional[dict] = None, workers: int = 0):
+        """
+        Args:
+            backend: Nombre del motor registrado (ej: 'persistent')
+            options: Opciones de create_backend (tesseract_cmd, text_height, pad)
+            workers: Procesos (0 = uno por núcleo)
+        """
+        self.workers = int(workers) or os.cpu_count() or 1
+        self.backend = backend
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(backend, dict(options or {}))
+        )
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.errors = 0
+        self.total_ms = 0.0
+
+    def warmup(self, timeout: float = 30) -> str:
+        """Arrancar los procesos y cargar sus motores. Devuelve el motor de los workers"""
+        futures = [self._executor.submit(_worker_backend) for _ in range(self.workers)]
+        backends = {future.result(timeout=timeout) for future in futures}
+        if None in backends:
+            raise RuntimeError(f"motor '{self.backend}' no disponible en los workers")
+        return self.backend
+
+    def read(self, mask: np.ndarray, timeout: float = 10) -> RecognitionResult:
+        """
+        Leer una máscara en algún proceso libre (bloquea hasta el resultado).
+
+        Returns:
+            RecognitionResult
+        """
+        start = time.perf_counter()
+        with self._lock:
+            self.submitted += 1
+        try:
+            result = self._executor.submit(_read, mask).result(timeout=timeout)
+        except Exception:
+            with self._lock:
+                self.errors += 1
+            raise
+        with self._lock:
+            self.completed += 1
+            self.total_ms += (time.perf_counter() - start) * 1000
+        return result
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "backend": self.backend,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "errors": self.errors,
+                "avg_ms": round(self.total_ms / self.completed, 2) if self.completed else None
+            }
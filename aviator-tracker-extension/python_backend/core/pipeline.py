@@ -0,0 +1,118 @@
+"""
+Colas acotadas entre las etapas del tracker OCR.
+Cada etapa (captura -> reconocimiento -> persistencia -> decisión) corre en su
+propio thread y se comunica por una `StageQueue`, que registra profundidad,
+descartes y bloqueos para ver dónde se acumula trabajo.
+"""
+import queue
+import threading
+import time
+from typing import Any, Optional
+
+
+class StageQueue:
+    """Cola acotada con métricas de backpressure"""
+
+    def __init__(self, name: str, maxsize: int, drop_oldest: bool = False):
+        """
+        Args:
+            name: Nombre de la cola (para métricas)
+            maxsize: Capacidad máxima
+            drop_oldest: Si está llena, descartar el elemento más antiguo en lugar
+                         de bloquear al productor (útil para frames: solo importa el último)
+        """
+        self.name = name
+        self.maxsize = max(1, int(maxsize))
+        self.drop_oldest = drop_oldest
+        self._queue = queue.Queue(maxsize=self.maxsize)
+        self._lock = threading.Lock()
+
+        self.enqueued = 0
+        self.dequeued = 0
+        self.dropped = 0        # Elementos descartados por cola llena
+        self.blocked = 0        # Veces que el productor tuvo que esperar
+        self.blocked_ms = 0.0   # Tiempo total esperando hueco
+        self.max_depth = 0
+
+    def put(self, item: Any, timeout: Optional[float] = None) -> bool:
+        """
+        Encolar un elemento.
+
+        Args:
+            item: Elemento a encolar
+            timeout: Espera máxima (s) si la cola está llena y no descarta
+
+        Returns:
+            True si se encoló, False si se descartó
+        """
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            if self.drop_oldest:
+                try:
+                    self._queue.get_nowait()
+                    with self._lock:
+                        self.dropped += 1
+                except queue.Empty:
+                    pass
+                try:
+                    self._queue.put_nowait(item)
+                except queue.Full:
+                    with self._lock:
+                        self.dropped += 1
+                    return False
+            else:
+                start = time.perf_counter()
+                try:
+                    self._queue.put(item, timeout=timeout)
+                except queue.Full:
+                    with self._lock:
+                        self.dropped += 1
+                    return False
+                finally:
+                    with self._lock:
+                        self.blocked += 1
+                        self.blocked_ms += (time.perf_counter() - start) * 1000
+
+        with self._lock:
+            self.enqueued += 1
+            self.max_depth = max(self.max_depth, self._queue.qsize())
+        return True
+
+    def get(self, timeout: Optional[float] = None) -> Any:
+        """
+        Desencolar un elemento.
+
+        Raises:
+            queue.Empty: Si no llega nada antes del timeout
+        """
+        item = self._queue.get(timeout=timeout)
+        with self._lock:
+            self.dequeued += 1
+        return item
+
+    def clear(self):
+        """Vaciar la cola (al detener el tracker)"""
+        try:
+            while True:
+                self._queue.get_nowait()
+        except queue.Empty:
+            pass
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def get_stats(self) -> dict:
+        """Profundidad actual y contadores de backpressure"""
+        with self._lock:
+            return {
+                "depth": self.depth,
+                "maxsize": self.maxsize,
+                "max_depth": self.max_depth,
+                "enqueued": self.enqueued,
+                "dequeued": self.dequeued,
+                "dropped": self.dropped,
+                "blocked": self.blocked,
+                "blocked_ms": round(self.blocked_ms, 1)
+            }
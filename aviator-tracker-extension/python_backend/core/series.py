@@ -0,0 +1,301 @@
+"""
+Serie columnar de todas las rondas (caliente + archivo) en archivos np.memmap.
+Columnas paralelas `id`, `multiplier`, `timestamp_ms`, `session_id`, `result` y
+`source` (mesa principal, otra mesa o importada), en bloques de `chunk_rows` filas de tamaño fijo (un archivo por columna y
+bloque: nunca se redimensiona un archivo mapeado). Las rondas se agregan en el
+lugar al confirmarse en SQLite; los análisis leen vistas de los arrays sin
+copiar ni consultar la base.
+
+`meta.json` guarda cuántas filas son válidas, el último id de `rounds`
+incluido y las columnas (si cambian, la serie se reconstruye): se escribe después de los datos, así tras un corte la serie queda en
+un prefijo válido y `sync()` completa el resto desde la base y el archivo.
+"""
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from core.importer import IMPORT_SOURCE
+from core.tables import MAIN_TABLE
+
+
+# Columna -> (dtype, valor para NULL)
+COLUMNS = {
+    'id': (np.int64, 0),
+    'multiplier': (np.float64, np.nan),
+    'timestamp_ms': (np.int64, 0),
+    'session_id': (np.int64, -1),
+    'result': (np.int8, 0),
+    'source': (np.int8, 0),
+}
+RESULT_CODES = {'ganada': 1, 'perdida': 2}  # 0 = sin resultado
+RESULT_NAMES = {code: name for name, code in RESULT_CODES.items()}
+
+# Valores de la columna `source` (rounds.source agrupado)
+SOURCE_OTHER = 0   # Mesas extra
+SOURCE_MAIN = 1    # Mesa principal (dashboard, filtros y clicks)
+SOURCE_IMPORT = 2  # Historiales importados
+
+# after_id de una serie vacía: menor que cualquier id de rounds
+EMPTY_AFTER_ID = -(1 << 63)
+
+# Columnas de rounds en el orden de las tuplas de append()
+SELECT_COLUMNS = 'id, multiplier, timestamp, session_id, result, source'
+
+
+def source_code(source: Optional[str]) -> int:
+    """Código de `source` para un valor de rounds.source"""
+    if source == MAIN_TABLE:
+        return SOURCE_MAIN
+    if source and (source == IMPORT_SOURCE or source.startswith(IMPORT_SOURCE + ':')):
+        return SOURCE_IMPORT
+    return SOURCE_OTHER
+
+
+class RoundSeries:
+    """Arrays np.memmap por columna, agregados en el lugar y leídos sin copia"""
+
+    def __init__(self, path: str, chunk_rows: int = 1 << 18):
+        """
+        Args:
+            path: Carpeta de los archivos de la serie
+            chunk_rows: Filas por bloque (cada bloque ocupa chunk_rows * 34 bytes)
+        """
+        self.path = path
+        self.chunk_rows = max(1024, int(chunk_rows))
+        self.length = 0
+        self.last_id = 0
+        self._chunks: List[Dict[str, np.memmap]] = []
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()  # Un sync/reset a la vez
+
+        self.appended = 0
+        self.syncs = 0
+        self.last_sync_ms = 0.0
+
+    def open(self):
+        """Mapear los bloques existentes (al arrancar, antes de sync())"""
+        os.makedirs(self.path, exist_ok=True)
+        meta_path = os.path.join(self.path, 'meta.json')
+        meta = {}
+        if os.path.exists(meta_path):
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        if meta and (meta.get('chunk_rows') != self.chunk_rows or meta.get('columns') != list(COLUMNS)):
+            meta = {}  # Cambió el tamaño de bloque o las columnas: se reconstruye desde la base
+        with self._lock:
+            self._chunks = []
+            self.length = int(meta.get('length', 0))
+            self.last_id = int(meta.get('last_id', 0))
+            for index in range(-(-self.length // self.chunk_rows)):
+                self._chunks.append(self._map_chunk(index))
+
+    def _map_chunk(self, index: int) -> Dict[str, np.memmap]:
+        chunk = {}
+        for name, (dtype, _) in COLUMNS.items():
+            file = os.path.join(self.path, f'{name}.{index:04d}.bin')
+            mode = 'r+' if os.path.exists(file) else 'w+'
+            chunk[name] = np.memmap(file, dtype=dtype, mode=mode, shape=(self.chunk_rows,))
+        return chunk
+
+    def _write_meta(self):
+        meta_path = os.path.join(self.path, 'meta.json')
+        with open(meta_path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump({'length': self.length, 'last_id': self.last_id, 'chunk_rows': self.chunk_rows,
+                       'columns': list(COLUMNS)}, f)
+        os.replace(meta_path + '.tmp', meta_path)
+
+    # ------------------------------------------------------------------
+    # Escritura
+    # ------------------------------------------------------------------
+
+    def append(self, rows: Sequence) -> int:
+        """
+        Agregar rondas (id, multiplier, timestamp, session_id, result, source) en orden de id.
+        Las que ya están en la serie (id <= last_id) se ignoran.
+
+        Returns:
+            Filas agregadas
+        """
+        after_id = self.after_id
+        rows = [row for row in rows if row[0] > after_id]
+        if not rows:
+            return 0
+        columns = {
+            'id': np.array([row[0] for row in rows], dtype=np.int64),
+            'multiplier': np.array([np.nan if row[1] is None else row[1] for row in rows], dtype=np.float64),
+            'timestamp_ms': np.array([row[2] or 0 for row in rows], dtype=np.int64),
+            'session_id': np.array([-1 if row[3] is None else row[3] for row in rows], dtype=np.int64),
+            'result': np.array([RESULT_CODES.get(row[4], 0) for row in rows], dtype=np.int8),
+            'source': np.array([source_code(row[5]) for row in rows], dtype=np.int8),
+        }
+        return self.append_columns(columns)
+
+    def append_columns(self, columns: Dict[str, np.ndarray]) -> int:
+        """
+        Agregar columnas ya armadas (mismo largo, ids crecientes). Las filas con
+        id <= last_id (o que no suben respecto de la anterior) se descartan.
+        """
+        with self._lock:
+            ids = np.asarray(columns['id'])
+            keep = ids > np.maximum.accumulate(np.concatenate(([self.after_id], ids[:-1])))
+            if not keep.all():
+                columns = {name: np.asarray(columns[name])[keep] for name in COLUMNS}
+            count = len(columns['id'])
+            if count == 0:
+                return 0
+            written = 0
+            while written < count:
+                index, offset = divmod(self.length, self.chunk_rows)
+                if index == len(self._chunks):
+                    self._chunks.append(self._map_chunk(index))
+                take = min(count - written, self.chunk_rows - offset)
+                for name in COLUMNS:
+                    self._chunks[index][name][offset:offset + take] = columns[name][written:written + take]
+                    self._chunks[index][name].flush()
+                # Los lectores solo ven filas completas: el largo sube después de escribirlas
+                self.length += take
+                written += take
+            self.last_id = int(columns['id'][-1])
+            self._write_meta()
+            self.appended += count
+        return count
+
+    @property
+    def after_id(self) -> int:
+        """Id a partir del cual faltan filas (las importadas tienen ids <= 0)"""
+        return self.last_id if self.length else EMPTY_AFTER_ID
+
+    @property
+    def first_id(self) -> Optional[int]:
+        """Id de la primera fila (None si la serie está vacía)"""
+        return int(self._chunks[0]['id'][0]) if self.length else None
+
+    def sync(self, conn, archive=None) -> int:
+        """
+        Agregar las rondas confirmadas que faltan (id > last_id): primero las del
+        archivo frío y luego las de la tabla `rounds`.
+
+        Returns:
+            Filas agregadas
+        """
+        start = time.perf_counter()
+        added = 0
+        with self._sync_lock:
+            if archive is not None:
+                for part in archive.scan(['id', 'multiplier', 'timestamp', 'session_id', 'result', 'source'],
+                                         after_id=self.after_id):
+                    added += self.append_columns({
+                        'id': part['id'],
+                        'multiplier': part['multiplier'],
+                        'timestamp_ms': part['timestamp'],
+                        'session_id': part['session_id'],
+                        'result': np.array([RESULT_CODES.get(r, 0) for r in part['result']], dtype=np.int8),
+                        'source': np.array([source_code(r) for r in part['source']], dtype=np.int8),
+                    })
+            added += self.append(conn.execute(
+                f'SELECT {SELECT_COLUMNS} FROM rounds WHERE id > ? ORDER BY id', (self.after_id,)
+            ).fetchall())
+            self.syncs += 1
+            self.last_sync_ms = (time.perf_counter() - start) * 1000
+        return added
+
+    def reset(self):
+        """Vaciar la serie (la base se borró y los ids vuelven a empezar)"""
+        with self._sync_lock, self._lock:
+            self.length = 0
+            self.last_id = 0
+            self._write_meta()  # Los bloques se reutilizan: no se borran archivos mapeados
+
+    # ------------------------------------------------------------------
+    # Lectura
+    # ------------------------------------------------------------------
+
+    def chunks(self, columns: Optional[Sequence[str]] = None, start: int = 0,
+               stop: Optional[int] = None) -> Iterator[Dict[str, np.ndarray]]:
+        """Vistas (sin copia) de las filas [start, stop), un dict de columnas por bloque"""
+        wanted = list(columns or COLUMNS)
+        length, chunks = self.length, list(self._chunks)
+        stop = length if stop is None else max(0, min(stop, length))
+        position = max(0, start)
+        while position < stop:
+            index, offset = divmod(position, self.chunk_rows)
+            take = min(stop - position, self.chunk_rows - offset)
+            yield {name: chunks[index][name][offset:offset + take] for name in wanted}
+            position += take
+
+    def view(self, columns: Optional[Sequence[str]] = None, start: int = 0,
+             stop: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Columnas de las filas [start, stop) (índices negativos desde el final).
+        Sin copia si el rango cae en un solo bloque; si no, se concatenan.
+        """
+        length = self.length
+        if start < 0:
+            start = max(0, length + start)
+        if stop is not None and stop < 0:
+            stop = length + stop
+        wanted = list(columns or COLUMNS)
+        parts = list(self.chunks(wanted, start, stop))
+        if len(parts) == 1:
+            return parts[0]
+        if not parts:
+            return {name: np.empty(0, dtype=COLUMNS[name][0]) for name in wanted}
+        return {name: np.concatenate([part[name] for part in parts]) for name in wanted}
+
+    def last(self, n: int, columns: Optional[Sequence[str]] = None,
+             source: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Las últimas `n` rondas, de la más vieja a la más nueva.
+
+        Args:
+            source: Solo las de ese origen (SOURCE_MAIN, ...); devuelve copias
+        """
+        if source is None or n <= 0:
+            return self.view(columns, -n) if n > 0 else self.view(columns, self.length)
+        wanted = list(columns or COLUMNS)
+        length = self.length
+        window = max(4 * n, 1024)
+        while True:
+            # Ventana desde el final que se agranda hasta juntar n filas de ese origen
+            start = max(0, length - window)
+            index = np.flatnonzero(self.view(['source'], start, length)['source'] == source)
+            if len(index) >= n or start == 0:
+                break
+            window *= 4
+        data = self.view(wanted, start, length)
+        return {name: data[name][index[-n:]] for name in wanted}
+
+    def select(self, columns: Optional[Sequence[str]] = None, session_id: Optional[int] = None,
+               since_ms: Optional[int] = None, until_ms: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Filas de una sesión y/o rango de tiempo (máscara vectorizada, devuelve copias)"""
+        wanted = list(columns or COLUMNS)
+        needed = set(wanted)
+        if session_id is not None:
+            needed.add('session_id')
+        if since_ms is not None or until_ms is not None:
+            needed.add('timestamp_ms')
+        data = self.view(list(needed))
+        keep = np.ones(len(next(iter(data.values()))), dtype=bool)
+        if session_id is not None:
+            keep &= data['session_id'] == session_id
+        if since_ms is not None:
+            keep &= data['timestamp_ms'] >= since_ms
+        if until_ms is not None:
+            keep &= data['timestamp_ms'] <= until_ms
+        return {name: data[name][keep] for name in wanted}
+
+    def get_stats(self) -> dict:
+        return {
+            "path": self.path,
+            "rows": self.length,
+            "last_id": self.last_id,
+            "chunks": len(self._chunks),
+            "chunk_rows": self.chunk_rows,
+            "appended": self.appended,
+            "syncs": self.syncs,
+            "last_sync_ms": round(self.last_sync_ms, 3)
+        }
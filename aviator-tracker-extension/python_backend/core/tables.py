@@ -0,0 +1,93 @@
+"""
+Mesas vigiladas por el OCR.
+Cada mesa es una región con nombre y su propio estado (detector de cambios,
+fase de la ronda, ROI y último valor leído). Todas se capturan con una sola
+captura por tick (la caja que las contiene) y cada región es una vista de ella.
+"""
+import re
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+
+
+MAIN_TABLE = "main"  # Región calibrada con el overlay (la única que dispara clicks)
+
+TABLE_NAME_RE = re.compile(r'^[\w-]{1,32}$')
+
+# (x, y, ancho, alto) en coordenadas de pantalla
+Region = Tuple[int, int, int, int]
+
+
+class TableState:
+    """Estado de una mesa"""
+
+    def __init__(self, name: str, region: Optional[Region] = None, change_detector=None,
+                 phase_detector=None, roi=None):
+        """
+        Args:
+            name: Identificador de la mesa (se guarda como `source` de cada ronda)
+            region: Región (x, y, ancho, alto) o None si aún no está calibrada
+            change_detector: FrameChangeDetector propio (o None)
+            phase_detector: RoundPhaseDetector propio (o None)
+            roi: RoiCropper propio (o None)
+        """
+        self.name = name
+        self.region = tuple(int(v) for v in region) if region else None
+        self.change_detector = change_detector
+        self.phase_detector = phase_detector
+        self.roi = roi
+        self.reset()
+
+    def reset(self):
+        """Limpiar el estado de lectura (al iniciar el OCR)"""
+        self.last_value = None
+        self.crash_round = 0     # Entradas en 'crashed' vistas por la captura
+        self.accepted_round = 0  # Última ronda ya leída por el reconocimiento
+        self.accepted_seq = 0
+        self.frames = 0
+        self.detections = 0
+        for component in (self.change_detector, self.phase_detector, self.roi):
+            if component:
+                component.reset()
+
+    def get_stats(self) -> dict:
+        region = self.region
+        return {
+            "name": self.name,
+            "region": {"x": region[0], "y": region[1], "width": region[2], "height": region[3]} if region else None,
+            "value": self.last_value,
+            "frames": self.frames,
+            "detections": self.detections,
+            "phase": self.phase_detector.phase if self.phase_detector else None
+        }
+
+
+def union_region(regions: Iterable[Region]) -> Region:
+    """Caja mínima (x, y, ancho, alto) que contiene todas las regiones"""
+    regions = list(regions)
+    x0 = min(r[0] for r in regions)
+    y0 = min(r[1] for r in regions)
+    x1 = max(r[0] + r[2] for r in regions)
+    y1 = max(r[1] + r[3] for r in regions)
+    return x0, y0, x1 - x0, y1 - y0
+
+
+def slice_region(frame: np.ndarray, origin: Tuple[int, int], region: Region) -> np.ndarray:
+    """
+    Recortar una región de una captura mayor (vista, sin copia).
+
+    Args:
+        frame: Captura (alto, ancho, canales) cuya esquina está en `origin`
+        origin: (x, y) de la captura en pantalla
+        region: Región a recortar en coordenadas de pantalla
+    """
+    x, y = region[0] - origin[0], region[1] - origin[1]
+    return frame[y:y + region[3], x:x + region[2]]
+
+
+def parse_region(data: dict) -> Region:
+    """Región a partir de un dict {x, y, width, height} (ValueError si no es válida)"""
+    region = tuple(int(data[key]) for key in ("x", "y", "width", "height"))
+    if region[2] <= 0 or region[3] <= 0:
+        raise ValueError("width y height deben ser positivos")
+    return region
@@ -2,17 +2,17 @@ import random
 import time
 import pyautogui
 import pytesseract
-from PIL import Image, ImageEnhance
 import threading
 import json
 import os
 import io
 import base64
-import sqlite3
 import sys
 import uuid
-from queue import Queue
-from flask import Flask, request, jsonify
+from datetime import datetime, timezone
+import atexit
+from queue import Queue, Empty
+from flask import Flask, Response, request, jsonify, send_file
 from flask_cors import CORS
 from collections import deque
 import numpy as np  # Para operaciones vectorizadas rápidas
@@ -30,10 +30,33 @@ if sys.platform.startswith('win'):
 from PyQt5.QtWidgets import QApplication
 from PyQt5.QtCore import QTimer
 
+# Paquete compartido con desktop-app (raíz del repositorio)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
 # Imports de módulos core
 from core.overlay_manager import CalibrationOverlay, OCRCalibrationOverlay
 from core.screen_clicker import ScreenClicker
 from core.config_manager import ConfigManager
+from core.pipeline import StageQueue
+from core.tables import TableState, MAIN_TABLE, TABLE_NAME_RE, union_region, slice_region, parse_region
+from core.ocr_pool import RecognitionPool
+from core.db import LEGACY_TS_TO_MS, NOW_MS_SQL, ConnectionPool
+from core.config_store import ConfigStore
+from core.db_writer import BatchWriter
+from core.archive import RoundArchive
+from core.series import RoundSeries, RESULT_CODES, SOURCE_MAIN
+from core.click_ring import ClickCorrelator
+from core import importer
+from core import export as round_export
+from aviator_vision.frame_change import FrameChangeDetector
+from aviator_vision.capture import ScreenGrabber, CHANNELS_BGRA, CHANNELS_RGB
+from aviator_vision.scheduler import AdaptiveScheduler, MIN_RED_PIXELS
+from aviator_vision.roi import RoiCropper
+from aviator_vision.corpus import FrameRecorder
+from aviator_vision.debug_frames import DebugFrameRing
+from aviator_vision.round_phase import RoundPhaseDetector, PHASE_CRASHED
+from aviator_vision.recognition import TemplateRecognizer, create_backend, format_multiplier, red_mask
+from aviator_vision.recognition.benchmark import DEFAULT_CANDIDATES, select_backend
 
 
 app = Flask(__name__)
@@ -134,33 +157,173 @@ def process_queue_events():
 
 DB_PATH = os.path.join(os.path.dirname(__file__), 'aviator_stats.db')
 
+# Versión del esquema (PRAGMA user_version): 1 = timestamps enteros en epoch ms,
+# 2 = historial frío en segmentos (el trigger de borrado ignora las filas archivadas)
+SCHEMA_VERSION = 2
+
+ROUNDS_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS {name} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        session_id INTEGER,
+        multiplier REAL,
+        timestamp INTEGER NOT NULL DEFAULT ({now}), -- epoch ms (UTC)
+        click_type TEXT, -- 'apostar', 'falso', 'exponencial', null
+        result TEXT,     -- 'ganada', 'perdida', null
+        target_used REAL,
+        source TEXT DEFAULT '{main}'
+    )
+'''
+
+CLICKS_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS {name} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        session_id INTEGER,
+        click_type TEXT,
+        timestamp INTEGER NOT NULL DEFAULT ({now}) -- epoch ms (UTC)
+    )
+'''
+
+
+def now_ms():
+    """Instante actual en epoch ms (formato de las columnas timestamp)"""
+    return int(time.time() * 1000)
+
+
+def to_epoch_ms(value):
+    """
+    Normalizar un timestamp recibido (ms o segundos, número o texto, ISO 8601)
+    a epoch ms. None o inválido = ahora
+    """
+    if value is None or isinstance(value, bool):
+        return now_ms()
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        try:
+            parsed = datetime.fromisoformat(str(value).strip().replace('Z', '+00:00'))
+        except ValueError:
+            return now_ms()
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return int(parsed.timestamp() * 1000)
+    return int(number * 1000 if number < 100000000000 else number)
+
+
+def _migrate_timestamps_ms(cursor):
+    """Reconstruir rounds y click_reports con timestamp INTEGER (epoch ms)"""
+    migrated = 0
+    for table, schema, columns in (
+        ('rounds', ROUNDS_SCHEMA, 'id, session_id, multiplier, click_type, result, target_used, source'),
+        ('click_reports', CLICKS_SCHEMA, 'id, session_id, click_type'),
+    ):
+        info = {row[1]: row[2] for row in cursor.execute(f'PRAGMA table_info({table})')}
+        if info.get('timestamp', '').upper() == 'INTEGER':
+            continue
+        cursor.execute(schema.format(name=f'{table}_ms', now=NOW_MS_SQL, main=MAIN_TABLE))
+        cursor.execute(f'''
+            INSERT INTO {table}_ms ({columns}, timestamp)
+            SELECT {columns}, {LEGACY_TS_TO_MS} FROM {table}
+        ''')
+        migrated += cursor.rowcount
+        # Índices y triggers se van con la tabla vieja; init_db los vuelve a crear
+        cursor.execute(f'DROP TABLE {table}')
+        cursor.execute(f'ALTER TABLE {table}_ms RENAME TO {table}')
+    return migrated
+
+# Contadores del dashboard por sesión (lectura O(1)): los mantienen los triggers
+# en cada INSERT/UPDATE/DELETE de rounds y click_reports
+_ROUND_DELTA = '''
+    INSERT OR IGNORE INTO session_stats (session_id) SELECT {row}.session_id WHERE {row}.session_id IS NOT NULL;
+    UPDATE session_stats SET
+        total_rounds = total_rounds {op} 1,
+        wins = wins {op} (CASE WHEN {row}.result = 'ganada' AND {row}.click_type IS NOT NULL THEN 1 ELSE 0 END),
+        losses = losses {op} (CASE WHEN {row}.result = 'perdida' AND {row}.click_type IS NOT NULL THEN 1 ELSE 0 END),
+        rounds_no_bet = rounds_no_bet {op} (CASE WHEN {row}.click_type IS NULL THEN 1 ELSE 0 END)
+    WHERE session_id = {row}.session_id;
+'''
+_CLICK_DELTA = '''
+    INSERT OR IGNORE INTO session_stats (session_id) SELECT {row}.session_id WHERE {row}.session_id IS NOT NULL;
+    UPDATE session_stats SET
+        click_apostar = click_apostar {op} (CASE WHEN {row}.click_type = 'apostar' THEN 1 ELSE 0 END),
+        click_falso = click_falso {op} (CASE WHEN {row}.click_type = 'falso' THEN 1 ELSE 0 END),
+        click_exponencial = click_exponencial {op} (CASE WHEN {row}.click_type = 'exponencial' THEN 1 ELSE 0 END)
+    WHERE session_id = {row}.session_id;
+'''
+SESSION_STATS_TRIGGERS = {
+    'trg_rounds_stats_insert': "AFTER INSERT ON rounds BEGIN" + _ROUND_DELTA.format(row='NEW', op='+') + "END",
+    # Las rondas que pasan al archivo siguen contando para su sesión
+    'trg_rounds_stats_delete': "AFTER DELETE ON rounds "
+        "WHEN OLD.id > (SELECT COALESCE(MAX(last_id), 0) FROM archive_segments) BEGIN"
+        + _ROUND_DELTA.format(row='OLD', op='-') + "END",
+    'trg_rounds_stats_update': "AFTER UPDATE OF session_id, result, click_type ON rounds BEGIN"
+        + _ROUND_DELTA.format(row='OLD', op='-') + _ROUND_DELTA.format(row='NEW', op='+') + "END",
+    'trg_clicks_stats_insert': "AFTER INSERT ON click_reports BEGIN" + _CLICK_DELTA.format(row='NEW', op='+') + "END",
+    'trg_clicks_stats_delete': "AFTER DELETE ON click_reports BEGIN" + _CLICK_DELTA.format(row='OLD', op='-') + "END",
+}
+
+
+def rebuild_session_stats(conn):
+    """Recalcular session_stats desde cero con las rondas de la tabla (tabla nueva o contadores dañados)"""
+    conn.execute('DELETE FROM session_stats')
+    conn.execute('''
+        INSERT INTO session_stats (session_id, total_rounds, wins, losses, rounds_no_bet)
+        SELECT session_id,
+               COUNT(*),
+               SUM(CASE WHEN result = 'ganada' AND click_type IS NOT NULL THEN 1 ELSE 0 END),
+               SUM(CASE WHEN result = 'perdida' AND click_type IS NOT NULL THEN 1 ELSE 0 END),
+               SUM(CASE WHEN click_type IS NULL THEN 1 ELSE 0 END)
+        FROM rounds WHERE session_id IS NOT NULL GROUP BY session_id
+    ''')
+    conn.execute('''
+        INSERT OR IGNORE INTO session_stats (session_id)
+        SELECT DISTINCT session_id FROM click_reports WHERE session_id IS NOT NULL
+    ''')
+    conn.execute('''
+        UPDATE session_stats SET
+            click_apostar = (SELECT COUNT(*) FROM click_reports c
+                             WHERE c.session_id = session_stats.session_id AND c.click_type = 'apostar'),
+            click_falso = (SELECT COUNT(*) FROM click_reports c
+                           WHERE c.session_id = session_stats.session_id AND c.click_type = 'falso'),
+            click_exponencial = (SELECT COUNT(*) FROM click_reports c
+                                 WHERE c.session_id = session_stats.session_id AND c.click_type = 'exponencial')
+    ''')
+
+# Conexiones persistentes (WAL, synchronous=NORMAL): una por thread mientras se usa
+db_pool = ConnectionPool(
+    DB_PATH,
+    max_idle=int(config_manager.get('database.max_idle_connections', 4)),
+    busy_timeout_ms=int(config_manager.get('database.busy_timeout_ms', 5000)),
+    synchronous=str(config_manager.get('database.synchronous', 'NORMAL')).upper()
+)
+
+# Historial frío: segmentos columnares .npz con las rondas fuera de la tabla caliente
+ARCHIVE_PATH = config_manager.get('database.archive_path', 'archive')
+if not os.path.isabs(ARCHIVE_PATH):
+    ARCHIVE_PATH = os.path.join(os.path.dirname(__file__), ARCHIVE_PATH)
+round_archive = RoundArchive(
+    ARCHIVE_PATH,
+    db_pool.acquire,
+    hot_rows=int(config_manager.get('database.hot_rounds', 500))
+)
+ARCHIVE_EVERY_ROUNDS = max(1, int(config_manager.get('database.archive_every_rounds', 100)))
+_rounds_since_archive = 0
+
+# Serie columnar (np.memmap) de todas las rondas para análisis sin SQL
+SERIES_PATH = config_manager.get('database.series_path', 'series')
+if not os.path.isabs(SERIES_PATH):
+    SERIES_PATH = os.path.join(os.path.dirname(__file__), SERIES_PATH)
+round_series = RoundSeries(SERIES_PATH, chunk_rows=int(config_manager.get('database.series_chunk_rows', 1 << 18)))
+
 
 def init_db():
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_db_connection()
     cursor = conn.cursor()
     
     # Tabla de Rondas
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS rounds (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            session_id INTEGER,
-            multiplier REAL,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-            click_type TEXT, -- 'apostar', 'falso', 'exponencial', null
-            result TEXT,     -- 'ganada', 'perdida', null
-            target_used REAL
-        )
-    ''')
+    cursor.execute(ROUNDS_SCHEMA.format(name='rounds', now=NOW_MS_SQL, main=MAIN_TABLE))
     
     # Tabla de Click Reports (para registrar clicks asíncronos)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS click_reports (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            session_id INTEGER,
-            click_type TEXT,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
+    cursor.execute(CLICKS_SCHEMA.format(name='click_reports', now=NOW_MS_SQL, main=MAIN_TABLE))
     
     # Tabla de Configuración (para persistir target y sesión actual)
     cursor.execute('''
@@ -184,42 +347,182 @@ def init_db():
         )
     ''')
     
+    # Migración: mesa de origen de cada ronda (seguimiento multi-mesa)
+    columns = [row[1] for row in cursor.execute('PRAGMA table_info(rounds)')]
+    if 'source' not in columns:
+        cursor.execute(f"ALTER TABLE rounds ADD COLUMN source TEXT DEFAULT '{MAIN_TABLE}'")
+    
+    # Manifiesto del historial frío (segmentos .npz)
+    round_archive.create_schema(cursor)
+    
+    schema_version = cursor.execute('PRAGMA user_version').fetchone()[0]
+    if schema_version < 1:
+        # Migración: timestamps de texto (resolución de segundos) a enteros epoch ms
+        migrated = _migrate_timestamps_ms(cursor)
+        if migrated:
+            add_log(f"🗄️ Migradas {migrated} filas a timestamps en epoch ms", "INFO")
+    if schema_version < 2:
+        # El trigger de borrado cambió: se vuelve a crear abajo
+        cursor.execute('DROP TRIGGER IF EXISTS trg_rounds_stats_delete')
+    if schema_version < SCHEMA_VERSION:
+        cursor.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+    
+    # Claves (timestamp, multiplier) de todas las rondas: la importación no duplica
+    # rondas ya guardadas, estén en la tabla o en el historial frío
+    if importer.create_schema(cursor):
+        importer.add_keys(cursor, round_archive.scan(['timestamp', 'multiplier']))
+    
     # OPTIMIZACIÓN 1A: Índices para acelerar consultas
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_rounds_session ON rounds(session_id, id DESC)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_rounds_result ON rounds(result, timestamp)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_rounds_ts ON rounds(timestamp)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_rounds_source ON rounds(source, id DESC)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_click_session ON click_reports(session_id, timestamp)')
     
-    # OPTIMIZACIÓN 1B: Auto-limpieza - mantener solo últimas 50 rondas
+    # OPTIMIZACIÓN 1C: Contadores del dashboard por sesión (mantenidos por triggers)
+    stats_exists = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'session_stats'"
+    ).fetchone()
     cursor.execute('''
-        DELETE FROM rounds 
-        WHERE id NOT IN (
-            SELECT id FROM rounds 
-            ORDER BY id DESC 
-            LIMIT 50
+        CREATE TABLE IF NOT EXISTS session_stats (
+            session_id INTEGER PRIMARY KEY,
+            total_rounds INTEGER NOT NULL DEFAULT 0,
+            wins INTEGER NOT NULL DEFAULT 0,
+            losses INTEGER NOT NULL DEFAULT 0,
+            rounds_no_bet INTEGER NOT NULL DEFAULT 0,
+            click_apostar INTEGER NOT NULL DEFAULT 0,
+            click_falso INTEGER NOT NULL DEFAULT 0,
+            click_exponencial INTEGER NOT NULL DEFAULT 0
         )
     ''')
+    for name, body in SESSION_STATS_TRIGGERS.items():
+        cursor.execute(f'CREATE TRIGGER IF NOT EXISTS {name} {body}')
+    if not stats_exists:
+        rebuild_session_stats(conn)
     
     conn.commit()
+    
+    # OPTIMIZACIÓN 1B: Historial por niveles - la tabla se queda con las últimas
+    # database.hot_rounds rondas y el resto pasa a segmentos comprimidos
+    removed = round_archive.cleanup_orphans(conn)
+    if removed:
+        add_log(f"🗄️ {removed} segmento(s) de un archivado incompleto eliminados", "INFO")
     conn.close()
+    archived = round_archive.roll_over()
+    if archived:
+        add_log(f"🗄️ {archived} rondas movidas al historial frío", "INFO")
 
-init_db()
+def open_round_series():
+    """Mapear la serie columnar y completarla con las rondas que falten"""
+    round_series.open()
+    conn = get_db_connection()
+    try:
+        max_id = max(
+            conn.execute('SELECT COALESCE(MAX(id), 0) FROM rounds').fetchone()[0],
+            conn.execute('SELECT COALESCE(MAX(last_id), 0) FROM archive_segments').fetchone()[0]
+        )
+        min_id = conn.execute('''
+            SELECT MIN(m) FROM (SELECT MIN(id) AS m FROM rounds UNION ALL SELECT MIN(first_id) FROM archive_segments)
+        ''').fetchone()[0]
+        if round_series.last_id > max_id:
+            round_series.reset()  # La base se borró o se reemplazó: reconstruir
+        elif round_series.length and min_id is not None and min_id < round_series.first_id:
+            round_series.reset()  # Rondas importadas (ids <= 0) por la línea de comandos
+        added = round_series.sync(conn, round_archive)
+    finally:
+        conn.close()
+    if added:
+        add_log(f"📈 Serie de rondas: {added} agregadas ({round_series.length} en total)", "INFO")
 
 def get_db_connection():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """Conexión del thread actual (close() la devuelve al pool)"""
+    return db_pool.acquire()
 
-def get_config(key, default=None):
-    conn = get_db_connection()
-    row = conn.execute('SELECT value FROM config WHERE key = ?', (key,)).fetchone()
-    conn.close()
-    return row['value'] if row else default
 
-def set_config(key, value):
-    conn = get_db_connection()
-    conn.execute('INSERT OR REPLACE INTO config (key, value) VALUES (?, ?)', (key, str(value)))
-    conn.commit()
-    conn.close()
+@app.teardown_request
+def release_db_connection(exc=None):
+    # Un error en un endpoint puede saltarse el close(): la conexión vuelve igual al pool
+    db_pool.release_thread()
+
+# Tabla `config` en memoria: lecturas del diccionario, escrituras agrupadas en segundo plano
+config_store = ConfigStore(
+    get_db_connection,
+    flush_interval_s=float(config_manager.get('database.config_flush_interval_s', 1.0))
+)
+
+def get_config(key, default=None):
+    return config_store.get(key, default)
+
+def set_config(key, value, flush=False):
+    """Cambiar un valor; flush=True lo escribe ya (si no, en el próximo volcado)"""
+    config_store.set(key, value, flush=flush)
+
+def _on_rows_committed(counts):
+    # El dashboard se recalcula cuando las filas ya están en la base, no al encolarlas
+    global dashboard_needs_update, _rounds_since_archive
+    if 'rounds' in counts or 'rounds_frontend' in counts:
+        # Antes de archivar: la serie toma las filas nuevas (y las que una
+        # importación dejó y ya se archivaron)
+        conn = get_db_connection()
+        try:
+            round_series.sync(conn, round_archive)
+        except Exception as e:
+            add_log(f"❌ Error actualizando la serie de rondas: {e}", "ERROR")
+        finally:
+            conn.close()
+    if counts.keys() & {'rounds', 'rounds_frontend', 'click_reports', 'round_click'}:
+        dashboard_needs_update = True
+    
+    # Archivar desde el propio thread escritor: no compite con los inserts
+    _rounds_since_archive += counts.get('rounds', 0) + counts.get('rounds_frontend', 0)
+    if _rounds_since_archive >= ARCHIVE_EVERY_ROUNDS:
+        _rounds_since_archive = 0
+        try:
+            archived = round_archive.roll_over()
+            if archived:
+                add_log(f"🗄️ {archived} rondas movidas al historial frío", "INFO")
+        except Exception as e:
+            add_log(f"❌ Error archivando rondas: {e}", "ERROR")
+
+# Inserts de rondas y clicks: un thread escritor los agrupa en transacciones
+db_writer = BatchWriter(
+    get_db_connection,
+    batch_size=int(config_manager.get('database.write_batch_size', 64)),
+    flush_interval_s=float(config_manager.get('database.write_flush_ms', 250)) / 1000,
+    on_commit=_on_rows_committed,
+    log=lambda msg: add_log(f"❌ {msg}", "ERROR")
+)
+db_writer.register('rounds', '''
+    INSERT INTO rounds (session_id, multiplier, click_type, result, target_used, source, timestamp)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+''')
+db_writer.register('rounds_frontend', '''
+    INSERT INTO rounds (session_id, multiplier, result, timestamp, target_used)
+    VALUES (?, ?, ?, ?, ?)
+''')
+db_writer.register('click_reports', '''
+    INSERT INTO click_reports (session_id, click_type, timestamp) VALUES (?, ?, ?)
+''')
+# Conciliación: click reportado tarde por HTTP para una ronda ya guardada sin click
+db_writer.register('round_click', '''
+    UPDATE rounds SET click_type = ?
+    WHERE source = ? AND timestamp = ? AND session_id = ? AND click_type IS NULL
+''')
+
+# Clicks pendientes de asignar a la próxima ronda (sin consultar click_reports)
+pending_clicks = ClickCorrelator(
+    window_s=float(config_manager.get('pipeline.click_window_s', 10.0)),
+    capacity=int(config_manager.get('pipeline.pending_clicks', 64))
+)
+
+# Los workers del pool OCR (spawn en Windows) reimportan este módulo como
+# __mp_main__: no deben tocar la base de datos
+if __name__ != '__mp_main__':
+    init_db()
+    open_round_series()
+    config_store.load()
+    atexit.register(config_store.close)
+    atexit.register(db_writer.close)
 
 # Variable global para almacenar el último análisis
 last_analysis_result = {}
@@ -799,6 +1102,71 @@ def ocr_control():
         return jsonify({"success": False, "message": str(e)}), 500
 
 
+@app.route('/ocr/record', methods=['POST'])
+def ocr_record():
+    """Iniciar o detener la grabación de frames (corpus para replay offline)"""
+    try:
+        data = request.json or {}
+        action = data.get('action', 'start')
+        
+        if action == 'start':
+            name = data.get('name')
+            if name is not None and not TABLE_NAME_RE.match(str(name)):
+                # Solo un nombre de carpeta: la grabación siempre va dentro de ocr.recording.path
+                return jsonify({"success": False, "message": "Nombre inválido (letras, números, '_' o '-')"}), 400
+            path = ocr_tracker.start_recording(name)
+            return jsonify({"success": True, "recording": True, "path": path})
+        
+        elif action == 'stop':
+            stats = ocr_tracker.stop_recording()
+            return jsonify({"success": True, "recording": False, "stats": stats})
+        
+        else:
+            return jsonify({"success": False, "message": "Acción inválida"}), 400
+            
+    except Exception as e:
+        add_log(f"❌ Error en grabación OCR: {e}", "ERROR")
+        return jsonify({"success": False, "message": str(e)}), 500
+
+
+@app.route('/ocr/debug', methods=['POST'])
+def ocr_debug():
+    """Activar o desactivar el anillo de frames de debug"""
+    data = request.json or {}
+    ocr_tracker.set_debug(bool(data.get('enabled', True)))
+    ring = ocr_tracker.debug_frames
+    return jsonify({"success": True, "enabled": ring is not None, "stats": ring.get_stats() if ring else None})
+
+
+@app.route('/ocr/debug/dump', methods=['POST'])
+def ocr_debug_dump():
+    """Volcar los últimos frames de debug a disco (en segundo plano)"""
+    ring = ocr_tracker.debug_frames
+    if ring is None:
+        return jsonify({"success": False, "message": "Debug desactivado (POST /ocr/debug)"}), 400
+    data = request.json or {}
+    path = ring.dump(str(data.get('reason', 'manual')), data.get('limit'))
+    if not path:
+        return jsonify({"success": False, "message": "Sin frames o volcado en curso"}), 409
+    return jsonify({"success": True, "path": path})
+
+
+@app.route('/ocr/debug/frames', methods=['GET'])
+def ocr_debug_frames():
+    """Descargar los últimos N frames de debug (PNG + index.json) en un ZIP"""
+    ring = ocr_tracker.debug_frames
+    if ring is None:
+        return jsonify({"success": False, "message": "Debug desactivado (POST /ocr/debug)"}), 400
+    limit = request.args.get('limit', None, type=int)
+    data = ring.archive(limit)
+    return send_file(
+        io.BytesIO(data),
+        mimetype='application/zip',
+        as_attachment=True,
+        download_name=f"debug_ocr_{time.strftime('%Y%m%d_%H%M%S')}.zip"
+    )
+
+
 @app.route('/ocr/status', methods=['GET'])
 def ocr_status():
     """Obtener estado actual del OCR"""
@@ -810,6 +1178,21 @@ def ocr_status():
         return jsonify({
             "running": ocr_tracker.running,
             "value": last_value,
+            "engine": ocr_tracker.recognizer.name if ocr_tracker.recognizer else None,
+            "benchmark": [r._asdict() for r in ocr_tracker.benchmark_results],
+            "template": dict(
+                ocr_tracker.template.matcher.get_stats(),
+                hits=ocr_tracker.template_hits,
+                fallbacks=ocr_tracker.template_fallbacks
+            ) if ocr_tracker.template else None,
+            "frame_cache": ocr_tracker.change_detector.get_stats() if ocr_tracker.change_detector else None,
+            "pipeline": ocr_tracker.get_pipeline_stats(),
+            "scheduler": ocr_tracker.scheduler.get_stats() if ocr_tracker.scheduler else None,
+            "roi": ocr_tracker.roi.get_stats() if ocr_tracker.roi else None,
+            "phase": ocr_tracker.phase_detector.get_stats() if ocr_tracker.phase_detector else None,
+            "recording": ocr_tracker.recorder.get_stats() if ocr_tracker.recorder else None,
+            "debug_frames": ocr_tracker.debug_frames.get_stats() if ocr_tracker.debug_frames else None,
+            "tables": [table.get_stats() for table in list(ocr_tracker.tables.values())],
             "region": {
                 "x": region[0] if region else None,
                 "y": region[1] if region else None,
@@ -822,6 +1205,58 @@ def ocr_status():
         return jsonify({"running": False, "value": None, "region": None})
 
 
+@app.route('/ocr/phases', methods=['GET'])
+def get_ocr_phases():
+    """Cambios de fase recientes de la ronda (waiting/flying/crashed/cooldown)"""
+    table = ocr_tracker.tables.get(request.args.get('table', MAIN_TABLE))
+    if table is None:
+        return jsonify({"success": False, "message": "Mesa no encontrada"}), 404
+    if not table.phase_detector:
+        return jsonify({"enabled": False, "events": []})
+    limit = request.args.get('limit', 50, type=int)
+    return jsonify({
+        "enabled": True,
+        "table": table.name,
+        "stats": table.phase_detector.get_stats(),
+        "events": table.phase_detector.get_events(limit)
+    })
+
+
+@app.route('/ocr/tables', methods=['GET'])
+def get_ocr_tables():
+    """Mesas vigiladas (la principal es la región calibrada)"""
+    return jsonify([table.get_stats() for table in list(ocr_tracker.tables.values())])
+
+
+@app.route('/ocr/tables', methods=['POST'])
+def set_ocr_table():
+    """Añadir o mover una mesa extra: {name, x, y, width, height}"""
+    try:
+        data = request.json or {}
+        name = str(data.get('name', ''))
+        if not TABLE_NAME_RE.match(name) or name == MAIN_TABLE:
+            return jsonify({"success": False, "message": "Nombre de mesa inválido"}), 400
+        region = parse_region(data)
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"success": False, "message": f"Región inválida: {e}"}), 400
+    
+    table = ocr_tracker.set_table(name, region)
+    add_log(f"🗂️ Mesa '{name}' en {region}", "INFO")
+    # El pool de procesos se decide al iniciar: con el OCR en marcha aplica al reiniciar
+    return jsonify({"success": True, "table": table.get_stats(), "restart_required": ocr_tracker.running})
+
+
+@app.route('/ocr/tables/<name>', methods=['DELETE'])
+def delete_ocr_table(name):
+    """Quitar una mesa extra"""
+    if name == MAIN_TABLE:
+        return jsonify({"success": False, "message": "La mesa principal se borra con /reset/ocr"}), 400
+    if not ocr_tracker.remove_table(name):
+        return jsonify({"success": False, "message": "Mesa no encontrada"}), 404
+    add_log(f"🗂️ Mesa '{name}' eliminada", "INFO")
+    return jsonify({"success": True})
+
+
 @app.route('/ocr/logs', methods=['GET'])
 def get_ocr_logs():
     return jsonify(list(ocr_logs))
@@ -835,217 +1270,710 @@ def get_ocr_logs():
 class OCRTracker:
     def __init__(self):
         self.running = False
-        self.region = None 
-        self.last_value = None
-        self.thread = None
+        self.threads = []
+        self.stop_event = None
         self.lock = threading.Lock()
         self.last_activity = time.time()
         self.reload_threshold = 60  # seconds
+        self.recognizer = None  # Motor OCR de respaldo (aviator_vision.recognition)
+        self.recognizer_options = {}
+        self.benchmark_results = []
+        self.engine_ready = False
+        self.ocr_pool = None  # Pool de procesos para Tesseract (varias mesas)
+        self.template = None  # Reconocedor rápido por plantillas
+        self.template_min_confidence = 0.85
+        self.template_hits = 0
+        self.template_fallbacks = 0
+        self.grabber = None  # Captura mss (None = pyautogui)
+        
+        # Mesas vigiladas: 'main' es la región calibrada con el overlay; las demás
+        # vienen de ocr.tables. Cada una tiene sus propios detectores
+        self.tables = {MAIN_TABLE: self._new_table(MAIN_TABLE)}
+        for entry in config_manager.get('ocr.tables', []) or []:
+            try:
+                name = str(entry['name'])
+                if TABLE_NAME_RE.match(name) and name != MAIN_TABLE:
+                    self.tables[name] = self._new_table(name, parse_region(entry))
+            except (KeyError, TypeError, ValueError) as e:
+                add_log(f"⚠️ Mesa inválida en ocr.tables ignorada: {entry} ({e})", "WARN")
+        
+        # Frecuencia de captura según la fase de la ronda (None = ocr.interval_ms fijo)
+        self.scheduler = None
+        if config_manager.get('capture.scheduler.enabled', True):
+            self.scheduler = AdaptiveScheduler.from_config(config_manager.get('capture.scheduler'))
+        
+        # Pipeline: captura -> reconocimiento -> persistencia -> decisión
+        # Frames: solo importa el más reciente (se descarta el más viejo si se llena)
+        # Rondas: nunca se descartan (el productor espera)
+        # Decisiones: un disparo para una ronda vieja no sirve (se descarta la más vieja)
+        self.frame_queue = StageQueue("frames", config_manager.get('pipeline.frame_queue_size', 2), drop_oldest=True)
+        self.round_queue = StageQueue("rounds", config_manager.get('pipeline.round_queue_size', 32))
+        self.decision_queue = StageQueue("decisions", config_manager.get('pipeline.decision_queue_size', 2), drop_oldest=True)
+        self.frame_seq = 0
+        self.recorder = None  # Grabación de frames para replay (None = desactivada)
+        self.debug_frames = None  # Anillo de frames de debug (None = desactivado)
+        if config_manager.get('ocr.debug', False):
+            self.set_debug(True)
+        self.frames_captured = 0
+        self.capture_started = None
+        self.capture_overruns = 0
+        self.stale_results = 0
+
+    def _new_table(self, name, region=None):
+        """Crear una mesa con sus detectores según config.json"""
+        change_detector = None
+        if config_manager.get('ocr.change_detection.enabled', True):
+            change_detector = FrameChangeDetector(
+                threshold=float(config_manager.get('ocr.change_detection.threshold', 12.0))
+            )
+        
+        # Recorte de la máscara a la caja del texto (tolera calibraciones holgadas)
+        roi = None
+        if config_manager.get('ocr.roi.enabled', True):
+            roi = RoiCropper(
+                pad=int(config_manager.get('ocr.roi.pad', 8)),
+                text_height=int(config_manager.get('ocr.roi.text_height', 20))
+            )
+        
+        # Fase de la ronda por histograma de color: solo la entrada en 'crashed' lanza OCR
+        phase_detector = None
+        if config_manager.get('ocr.phase_detection.enabled', True):
+            phase_detector = RoundPhaseDetector(
+                min_red_pixels=int(config_manager.get('ocr.phase_detection.min_red_pixels', MIN_RED_PIXELS)),
+                min_white_pixels=int(config_manager.get('ocr.phase_detection.min_white_pixels', 50)),
+                crash_hold_s=float(config_manager.get('ocr.phase_detection.crash_hold_s', 1.0))
+            )
+        return TableState(name, region, change_detector, phase_detector, roi)
+
+    # Accesos a la mesa principal (región calibrada, endpoints de estado)
+    @property
+    def main_table(self):
+        return self.tables[MAIN_TABLE]
+
+    @property
+    def region(self):
+        return self.main_table.region
+
+    @region.setter
+    def region(self, value):
+        self.main_table.region = tuple(value) if value else None
+
+    @property
+    def last_value(self):
+        return self.main_table.last_value
+
+    @property
+    def change_detector(self):
+        return self.main_table.change_detector
+
+    @property
+    def roi(self):
+        return self.main_table.roi
+
+    @property
+    def phase_detector(self):
+        return self.main_table.phase_detector
+
+    def set_table(self, name, region):
+        """Añadir o mover una mesa extra y guardarla en ocr.tables"""
+        with self.lock:
+            table = self.tables.get(name)
+            if table is None:
+                table = self.tables[name] = self._new_table(name, region)
+            else:
+                table.region = region
+                table.reset()
+        self._save_tables()
+        return table
+
+    def remove_table(self, name):
+        """Quitar una mesa extra. Devuelve False si no existía"""
+        with self.lock:
+            if self.tables.pop(name, None) is None:
+                return False
+        self._save_tables()
+        return True
+
+    def _save_tables(self):
+        with self.lock:
+            entries = [
+                {"name": t.name, "x": t.region[0], "y": t.region[1], "width": t.region[2], "height": t.region[3]}
+                for t in self.tables.values() if t.name != MAIN_TABLE and t.region
+            ]
+        config_manager.set('ocr.tables', entries)
+        config_manager.save()
+
+    def init_engine(self):
+        """Cargar y calentar el motor OCR elegido en config.json (ocr.engine)"""
+        mode = config_manager.get('ocr.engine', 'auto')
+        self.engine_ready = True
+        
+        grabber = ScreenGrabber()
+        if config_manager.get('capture.backend', 'mss') == 'mss' and grabber.available:
+            self.grabber = grabber
+            add_log("📸 Captura: mss (vista BGRA sin copias)", "INFO")
+        else:
+            self.grabber = None
+            add_log("📸 Captura: pyautogui.screenshot", "INFO")
+        
+        if config_manager.get('ocr.template.enabled', True):
+            atlas_path = config_manager.get('ocr.template.atlas_path', 'glyph_atlas.npz')
+            if not os.path.isabs(atlas_path):
+                atlas_path = os.path.join(os.path.dirname(__file__), atlas_path)
+            self.template = TemplateRecognizer(atlas_path=atlas_path)
+            self.template_min_confidence = float(config_manager.get('ocr.template.min_confidence', 0.85))
+            add_log(f"🔡 Matcher de glifos {'listo' if self.template.ready else 'en aprendizaje'}", "INFO")
+        
+        roi_enabled = config_manager.get('ocr.roi.enabled', True)
+        self.recognizer_options = {
+            "tesseract_cmd": tesseract_path,
+            # Sin ROI la máscara es la región completa: no se reescala
+            "text_height": int(config_manager.get('ocr.roi.text_height', 20)) if roi_enabled else 0,
+            "pad": int(config_manager.get('ocr.roi.pad', 8))
+        }
+        
+        recognizer = None
+        if mode == 'auto':
+            # Autoevaluación: el más rápido que lee bien las muestras incluidas
+            min_accuracy = float(config_manager.get('ocr.benchmark.min_accuracy', 0.9))
+            recognizer, self.benchmark_results = select_backend(
+                config_manager.get('ocr.benchmark.candidates', DEFAULT_CANDIDATES),
+                min_accuracy, **self.recognizer_options
+            )
+            for r in self.benchmark_results:
+                if r.available:
+                    add_log(f"⏱️ Motor {r.backend}: {r.accuracy:.0%} de acierto, {r.avg_ms:.1f} ms/lectura", "INFO")
+                else:
+                    add_log(f"⏱️ Motor {r.backend}: no disponible ({r.error})", "INFO")
+        else:
+            try:
+                recognizer = create_backend(mode, **self.recognizer_options)
+                if not recognizer.load():
+                    add_log(f"⚠️ Motor OCR '{mode}' no disponible, usando pytesseract", "WARN")
+                    recognizer = None
+            except KeyError as e:
+                add_log(f"⚠️ {e}", "WARN")
+        
+        if recognizer is None:
+            # Sin motor utilizable: pytesseract (el watchdog sigue buscando tesseract.exe)
+            recognizer = create_backend('pytesseract', **self.recognizer_options)
+        self.recognizer = recognizer
+        add_log(f"⚡ Motor OCR: {recognizer.name}", "SUCCESS")
+
+    def _capture(self, region):
+        """Capturar la región. Devuelve (frame, índices de canal R, G, B)"""
+        if self.grabber is not None:
+            return self.grabber.grab(*region), CHANNELS_BGRA
+        return np.array(pyautogui.screenshot(region=region)), CHANNELS_RGB
+
+    def _ocr_read(self, red_mask_bool):
+        """Leer la máscara con el motor de respaldo (en el pool si está activo)"""
+        pool = self.ocr_pool
+        if pool is not None:
+            try:
+                return pool.read(red_mask_bool)
+            except Exception as e:
+                # Pool roto (un worker murió): seguir en este proceso
+                add_log(f"⚠️ Pool OCR no disponible ({e}), reconociendo en el proceso principal", "WARN")
+                self.ocr_pool = None
+                pool.shutdown()
+        return self.recognizer.read(red_mask_bool)
+
+    def _template_read(self, red_mask_bool):
+        """Lectura rápida por plantillas; None si no es confiable (usar Tesseract)"""
+        if self.template is None:
+            return None
+        result = self.template.read(red_mask_bool)
+        if result.multiplier is not None and result.confidence is not None \
+                and result.confidence >= self.template_min_confidence:
+            self.template_hits += 1
+            return result
+        self.template_fallbacks += 1
+        return None
+
+    def _learn_glyphs(self, red_mask_bool, result):
+        """Alimentar el atlas de glifos con lecturas confiables de Tesseract"""
+        if self.template is None or (result.confidence is not None and result.confidence < 0.8):
+            return
+        self.template.learn(red_mask_bool, result)
 
     def start(self):
         if not self.running:
+            if not self.engine_ready:
+                self.init_engine()
             self.running = True
             self.last_activity = time.time()
-            self.thread = threading.Thread(target=self._run_loop, daemon=True)
-            self.thread.start()
-            add_log("Analizador OCR iniciado (Modo Historial)")
+            with self.lock:
+                for table in self.tables.values():
+                    table.reset()
+            if self.scheduler:
+                self.scheduler.reset()
+            # Cola de frames por mesa: en un mismo tick pueden entrar varias mesas
+            # y el frame de una no debe desplazar al de otra
+            self.frame_queue = StageQueue(
+                "frames", int(config_manager.get('pipeline.frame_queue_size', 2)) * len(self.tables), drop_oldest=True
+            )
+            for stage_queue in (self.round_queue, self.decision_queue):
+                stage_queue.clear()
+            
+            # Un evento por arranque: los threads de un start/stop anterior
+            # terminan solos aunque se vuelva a iniciar enseguida
+            self.stop_event = threading.Event()
+            workers = max(1, int(config_manager.get('pipeline.recognition_workers', 1)))
+            self._init_pool()
+            if self.ocr_pool:
+                # Un thread de reconocimiento por proceso para mantener el pool ocupado
+                workers = max(workers, self.ocr_pool.workers)
+            stages = [("ocr-capture", self._capture_loop)]
+            stages += [(f"ocr-recognize-{i + 1}", self._recognition_loop) for i in range(workers)]
+            stages += [("ocr-persist", self._persist_loop), ("ocr-decision", self._decision_loop)]
+            self.threads = [
+                threading.Thread(target=target, args=(self.stop_event,), name=name, daemon=True)
+                for name, target in stages
+            ]
+            for thread in self.threads:
+                thread.start()
+            add_log(f"Analizador OCR iniciado (Modo Historial, {len(self.tables)} mesa(s), "
+                    f"{workers} worker(s) de reconocimiento)")
+
+    def _init_pool(self):
+        """Crear el pool de procesos OCR si hay suficientes mesas (pipeline.process_pool)"""
+        if self.ocr_pool is not None or not config_manager.get('pipeline.process_pool.enabled', True):
+            return
+        if len(self.tables) < int(config_manager.get('pipeline.process_pool.min_tables', 2)):
+            return
+        try:
+            pool = RecognitionPool(
+                self.recognizer.name, self.recognizer_options,
+                workers=int(config_manager.get('pipeline.process_pool.workers', 0))
+            )
+            backend = pool.warmup()
+            self.ocr_pool = pool
+            add_log(f"⚡ Pool OCR listo: {pool.workers} proceso(s) ({backend})", "SUCCESS")
+        except Exception as e:
+            add_log(f"⚠️ No se pudo crear el pool OCR ({e}), reconociendo en el proceso principal", "WARN")
 
     def stop(self):
         self.running = False
+        if self.stop_event:
+            self.stop_event.set()
         add_log("Analizador OCR detenido")
 
-    def _run_loop(self):
-        import re
-        import time
-        from PIL import Image, ImageEnhance
-        
-        add_log("Iniciando bucle de captura a 1Hz")
+    def start_recording(self, name=None):
+        """
+        Grabar los frames procesados (y su lectura) en un corpus para replay.
+        `name` = carpeta dentro de ocr.recording.path (por defecto fecha y hora)
+        """
+        if self.recorder:
+            return self.recorder.path
+        if name is not None and not TABLE_NAME_RE.match(str(name)):
+            raise ValueError(f"Nombre de grabación inválido: {name}")
+        base = config_manager.get('ocr.recording.path', 'recordings')
+        if not os.path.isabs(base):
+            base = os.path.join(os.path.dirname(__file__), base)
+        path = os.path.join(base, name or time.strftime('%Y%m%d_%H%M%S'))
+        self.recorder = FrameRecorder(path, chunk_size=int(config_manager.get('ocr.recording.chunk_size', 64)))
+        add_log(f"⏺️ Grabando frames en {path}", "INFO")
+        return path
+
+    def stop_recording(self):
+        """Cerrar la grabación. Devuelve sus estadísticas"""
+        recorder, self.recorder = self.recorder, None
+        if recorder is None:
+            return None
+        recorder.close()
+        stats = recorder.get_stats()
+        add_log(f"⏹️ Grabación cerrada: {stats['frames_written']} frames ({stats['bytes_written'] / 1024:.0f} KB)", "INFO")
+        return stats
+
+    def set_debug(self, enabled):
+        """
+        Activar el anillo de frames de debug: cada lectura guarda su frame y su
+        máscara en memoria; solo se escriben a disco ante una lectura fallida o
+        de baja confianza, o al pedirlo (POST /ocr/debug/dump)
+        """
+        if enabled and self.debug_frames is None:
+            out_dir = config_manager.get('ocr.debug_frames.out_dir', 'debug_ocr')
+            if not os.path.isabs(out_dir):
+                out_dir = os.path.join(os.path.dirname(__file__), out_dir)
+            self.debug_frames = DebugFrameRing(
+                capacity=int(config_manager.get('ocr.debug_frames.capacity', 64)),
+                out_dir=out_dir,
+                max_dumps=int(config_manager.get('ocr.debug_frames.max_dumps', 20)),
+                min_dump_interval_s=float(config_manager.get('ocr.debug_frames.min_dump_interval_s', 10.0))
+            )
+            add_log(f"🐞 Frames de debug en memoria ({self.debug_frames.capacity} últimos)", "INFO")
+        elif not enabled and self.debug_frames is not None:
+            ring, self.debug_frames = self.debug_frames, None
+            ring.close()
+            add_log("🐞 Frames de debug desactivados", "INFO")
+
+    def _debug_frame(self, frame, table, red_mask_bool, result):
+        """Guardar la lectura en el anillo y volcarlo si falló o fue dudosa"""
+        ring = self.debug_frames
+        if ring is None:
+            return
+        ring.add(
+            raw=frame.get("raw"),
+            processed=red_mask_bool,
+            value=result.text,
+            confidence=result.confidence,
+            note=f"{table.name} {result.backend}",
+            channels=frame.get("channels", CHANNELS_RGB)
+        )
+        min_confidence = float(config_manager.get('ocr.debug_frames.min_confidence', 0.6))
+        if result.multiplier is None:
+            reason = "lectura_fallida"
+        elif result.confidence is not None and result.confidence < min_confidence:
+            reason = "baja_confianza"
+        else:
+            return
+        path = ring.dump(f"{reason}_{table.name}", force=False)
+        if path:
+            add_log(f"🐞 Frames de debug ({reason}) → {path}", "WARN")
+
+    def _record(self, img_array, channels, value=None, table=MAIN_TABLE):
+        # Solo se graba la mesa principal (todos los frames de un corpus miden lo mismo)
+        recorder = self.recorder
+        if recorder is not None and table == MAIN_TABLE:
+            try:
+                recorder.add(img_array, value, channels=channels)
+            except Exception as e:
+                add_log(f"Error grabando frame: {str(e)}", "ERROR")
+
+    def get_pipeline_stats(self):
+        """Profundidad de colas, descartes y ritmo real de captura"""
+        elapsed = time.time() - self.capture_started if self.capture_started else 0
+        return {
+            "threads": [t.name for t in self.threads if t.is_alive()],
+            "frames_captured": self.frames_captured,
+            "capture_hz": round(self.frames_captured / elapsed, 2) if elapsed > 0 else 0.0,
+            "capture_overruns": self.capture_overruns,
+            "stale_results": self.stale_results,
+            "process_pool": self.ocr_pool.get_stats() if self.ocr_pool else None,
+            "queues": {
+                q.name: q.get_stats() for q in (self.frame_queue, self.round_queue, self.decision_queue)
+            }
+        }
+
+    # ------------------------------------------------------------------
+    # ETAPA 1: CAPTURA (cadencia fija, nunca espera a las demás etapas)
+    # ------------------------------------------------------------------
+
+    def _capture_loop(self, stop_event):
+        interval = max(0.05, float(config_manager.get('ocr.interval_ms', 1000)) / 1000)
+        if self.scheduler:
+            add_log("Iniciando bucle de captura adaptativo (frecuencia según fase de la ronda)")
+        else:
+            add_log(f"Iniciando bucle de captura a {1 / interval:.0f}Hz")
+        self.frames_captured = 0
+        self.capture_started = time.time()
+        next_tick = time.perf_counter()
         
-        while self.running:
+        while not stop_event.is_set():
+            pause = 0
             try:
-                # ANTI-STUCK WATCHDOG (60s)
-                if time.time() - self.last_activity > self.reload_threshold:
-                    add_log(f"⚠️ ALERTA: Sin actividad OCR > {self.reload_threshold}s - RECARGANDO PÁGINA (F5)", "WARNING")
-                    pyautogui.press('f5')
-                    
-                    # Incrementar contador de recargas
-                    try:
-                        current_reloads = int(get_config('total_reloads', 0))
-                        set_config('total_reloads', current_reloads + 1)
-                    except:
-                        pass
-                        
-                    self.last_activity = time.time()
-                    time.sleep(5) # Esperar a que recargue
-                    continue
-
-                if not self.region:
-                    time.sleep(1)
-                    continue
-
-                if not pytesseract.pytesseract.tesseract_cmd or not os.path.exists(pytesseract.pytesseract.tesseract_cmd):
-                    add_log("Motor OCR no disponible. Reintentando búsqueda...", "WARN")
-                    path = find_tesseract()
-                    if path: pytesseract.pytesseract.tesseract_cmd = path
-                    time.sleep(2)
-                    continue
-
-                with self.lock:
-                    region = list(self.region)
-                
-                # PIXEL JITTER (Sigilo)
-                jitter_x = random.randint(-2, 2)
-                jitter_y = random.randint(-2, 2)
-                region_with_jitter = (region[0] + jitter_x, region[1] + jitter_y, region[2], region[3])
-                
-                # 1. CAPTURA
-                screenshot = pyautogui.screenshot(region=region_with_jitter)
-                
-                # 2. FILTRO DE COLOR ROJO (OPTIMIZADO CON NUMPY)
-                # Convertir imagen a array NumPy (rápido)
-                img_array = np.array(screenshot)
-                
-                # Crear máscara vectorizada (operación en C, 10x más rápido)
-                # Detectar rojo: R alto (>200), G y B bajos (<120)
-                red_mask_bool = (img_array[:,:,0] > 200) & \
-                                (img_array[:,:,1] < 120) & \
-                                (img_array[:,:,2] < 120)
-                
-                # Contar píxeles rojos
-                red_pixel_count = np.sum(red_mask_bool)
-                
-                # Convertir máscara booleana a imagen blanco/negro
-                red_mask_array = np.where(red_mask_bool, 255, 0).astype(np.uint8)
-                red_mask = Image.fromarray(red_mask_array, mode='L')
-                
-                # 3. VERIFICAR SI HAY SUFICIENTES PÍXELES ROJOS
-                if red_pixel_count < 50:  # Umbral mínimo de píxeles rojos
-                    time.sleep(1)
-                    continue
-                
-                # 4. PROCESAMIENTO DE LA MÁSCARA ROJA
-                # Mejorar contraste de la máscara para OCR
-                enhancer = ImageEnhance.Contrast(red_mask)
-                processed_mask = enhancer.enhance(2.5)
-
-                # 5. OCR
-                custom_config = r'--oem 3 --psm 7 -c tessedit_char_whitelist=0123456789.,xX'
-                text = pytesseract.image_to_string(processed_mask, config=custom_config)
-                
-                text_clean = text.strip().lower().replace(' ', '').replace('l', '1').replace('i', '1').replace('o', '0')
-                match = re.search(r'(\d+(?:[.,]\d+)?)[xX]?', text_clean)
+                pause = self._capture_tick()
+            except Exception as e:
+                add_log(f"Error captura OCR: {str(e)}", "ERROR")
+            
+            next_tick += (self.scheduler.next_interval() if self.scheduler else interval) + pause
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                stop_event.wait(delay)
+            else:
+                # La captura tardó más que el intervalo: no acumular retraso
+                self.capture_overruns += 1
+                next_tick = time.perf_counter()
+
+    def _capture_tick(self):
+        """Capturar todas las mesas y encolar las que tengan texto rojo. Devuelve pausa extra (s)"""
+        # ANTI-STUCK WATCHDOG (60s)
+        if time.time() - self.last_activity > self.reload_threshold:
+            add_log(f"⚠️ ALERTA: Sin actividad OCR > {self.reload_threshold}s - RECARGANDO PÁGINA (F5)", "WARNING")
+            pyautogui.press('f5')
+            
+            # Incrementar contador de recargas
+            try:
+                set_config('total_reloads', config_store.get_int('total_reloads', 0) + 1)
+            except:
+                pass
                 
-                if match:
-                    val_str = match.group(1).replace(',', '.')
-                    try:
-                        found_val = float(val_str)
-                        new_val_str = f"{found_val:.2f}x"
-                        
-                        if self.last_value != new_val_str:
-                            add_log(f"DETECTADO: {new_val_str} (Analizado: {text_clean})", "SUCCESS")
-                            with self.lock:
-                                self.last_value = new_val_str
-                                self.last_activity = time.time() # Reset watchdog
-                            
-                            # GUARDAR EN BASE DE DATOS
-                            try:
-                                global dashboard_needs_update
-                                dashboard_needs_update = True  # Invalidar caché del dashboard
-                                
-                                session_id = int(get_config('current_session_id', 1))
-                                target = float(get_config('target_multiplier', 1.11))
-                                
-                                # Buscar click reciente (dentro de la ventana de 3s si es posible, o el último no usado)
-                                conn = get_db_connection()
-                                click = conn.execute('''
-                                    SELECT click_type FROM click_reports 
-                                    WHERE session_id = ? AND timestamp > datetime('now', '-10 seconds')
-                                    ORDER BY id DESC LIMIT 1
-                                ''', (session_id,)).fetchone()
-                                
-                                click_type = click['click_type'] if click else None
-                                result = 'ganada' if found_val >= target else 'perdida'
-                                
-                                conn.execute('''
-                                    INSERT INTO rounds (session_id, multiplier, click_type, result, target_used)
-                                    VALUES (?, ?, ?, ?, ?)
-                                ''', (session_id, found_val, click_type, result, target))
-                                
-                                # Limpiar clicks procesados (opcional, o simplemente ignorarlos por timestamp)
-                                conn.commit()
-                                
-                                # PROCESAR DISPAROS O ANTI-AFK
-                                try:
-                                    rounds_since = int(get_config('rounds_since_last_bet', 0)) + 1
-                                    anti_afk_target = int(get_config('anti_afk_next', 3))
-                                    
-                                    # Obtener historial para filtros
-                                    history = [{"multiplier": r['multiplier']} for r in conn.execute(
-                                        'SELECT multiplier FROM rounds ORDER BY id DESC LIMIT 15').fetchall()]
-                                    
-                                    # Cerrar conexión aquí, después de todas las consultas
-                                    conn.close() 
-                                    
-                                    filter_ok, analysis_data = evaluate_filters(history, target)
-                                    
-                                    # Comprobar si Sniper está activo globalmente
-                                    sniper_active = get_config('sniper_active', 'false') == 'true'
-                                    
-                                    if filter_ok:
-                                        if sniper_active:
-                                            add_log("🎯 GATILLO SNIPER ACTIVADO", "SUCCESS")
-                                            if execute_stealth_click('btn1'):
-                                                report_click_internal('apostar')
-                                                set_config('rounds_since_last_bet', 0)
-                                                set_config('anti_afk_next', random.randint(2, 4))
-                                        else:
-                                            add_log("🎯 GATILLO DETECTADO (Sniper Desactivado)", "INFO")
-                                            
-                                    elif rounds_since >= anti_afk_target:
-                                        # Anti-AFK también respeta el toggle general o tiene el suyo propio?
-                                        # Por ahora lo subordinamos al toggle Anti-AFK específico (ya implementado global anti_afk_enabled)
-                                        # PERO el usuario pidió que los clicks no se hagan si están desactivados.
-                                        # Asumimos que "Sniper Desactivado" bloquea todo disparo REAL de apuesta,
-                                        # pero Anti-AFK tiene su propio control.
-                                        
-                                        # Verificar toggle Anti-AFK global (variable en memoria o config)
-                                        # En server.py usabamos `anti_afk_enabled` global variable
-                                        
-                                        if anti_afk_enabled:
-                                            add_log(f"🔄 ANTI-AFK TRIGGER (Ronda {rounds_since})", "INFO")
-                                            if execute_stealth_click('btn1'):
-                                                time.sleep(random.uniform(0.2, 0.5))
-                                                execute_stealth_click('btn1')  # Cancelar
-                                                report_click_internal('falso')
-                                                set_config('rounds_since_last_bet', 0)
-                                                set_config('anti_afk_next', random.randint(2, 4))
-                                        else:
-                                             set_config('rounds_since_last_bet', rounds_since)
-                                    else:
-                                        set_config('rounds_since_last_bet', rounds_since)
-                                        add_log(f"Rondas sin apostar: {rounds_since}/{anti_afk_target}")
-                                except Exception as proc_err:
-                                    add_log(f"Error procesando disparos: {str(proc_err)}", "ERROR")
-                                    # Asegurar cierre en caso de error
-                                    try: conn.close() 
-                                    except: pass
-                                    
-                            except Exception as db_err:
-                                add_log(f"Error guardando ronda: {str(db_err)}", "ERROR")
-                                try: conn.close()
-                                except: pass
-
-                            # PAUSA: 2 segundos después de detectar número
-                            time.sleep(2)
-                    except:
-                        time.sleep(1)
-                else:
-                    # No hay match de número, esperar 1s
-                    time.sleep(1)
-                    
+            self.last_activity = time.time()
+            return 5  # Esperar a que recargue
+
+        with self.lock:
+            tables = [(table, table.region) for table in self.tables.values() if table.region]
+        if not tables:
+            return 0
+
+        if self.ocr_pool is None and not self.recognizer.load():
+            add_log("Motor OCR no disponible. Reintentando búsqueda...", "WARN")
+            path = find_tesseract()
+            if path: self.recognizer.tesseract_cmd = path
+            return 2
+
+        # PIXEL JITTER (Sigilo)
+        jitter_x = random.randint(-2, 2)
+        jitter_y = random.randint(-2, 2)
+        
+        # 1. CAPTURA: una sola captura de la caja que contiene todas las mesas
+        # (vista NumPy directa del buffer mss); cada mesa es una vista de ella
+        x, y, width, height = union_region(region for _, region in tables)
+        img_array, channels = self._capture((x + jitter_x, y + jitter_y, width, height))
+        self.frames_captured += 1
+        
+        changed, red_pixels = False, 0
+        for table, region in tables:
+            table_changed, table_red = self._process_table(table, slice_region(img_array, (x, y), region), channels)
+            changed = changed or table_changed
+            red_pixels = max(red_pixels, table_red)
+        
+        # El planificador sigue a la mesa más activa
+        if self.scheduler:
+            self.scheduler.observe(changed=changed, red_pixels=red_pixels if changed else None)
+        return 0
+
+    def _process_table(self, table, img_array, channels):
+        """
+        Analizar la región de una mesa y encolarla si tiene un resultado nuevo.
+
+        Returns:
+            (cambió, píxeles rojos) para el planificador
+        """
+        table.frames += 1
+        
+        # 1b. DETECCIÓN DE CAMBIOS (antes de cualquier procesamiento)
+        # Si la pantalla no cambió, el último resultado sigue vigente
+        if table.change_detector and table.change_detector.is_unchanged(img_array):
+            if table.phase_detector:
+                table.phase_detector.update(None)  # Solo transiciones por tiempo
+            return False, 0
+        
+        # 1c. FASE DE LA RONDA (histograma de color, sin OCR)
+        # Solo la entrada en 'crashed' necesita una lectura; si esa lectura falla
+        # se reintenta con los siguientes frames rojos de la misma ronda
+        flight_s = None
+        if table.phase_detector:
+            event = table.phase_detector.update(img_array, channels=channels)
+            red_pixels = table.phase_detector.last_red_pixels
+            if event and event.phase == PHASE_CRASHED:
+                table.crash_round += 1
+                flight_s = table.phase_detector.last_flight_s
+            elif table.accepted_round >= table.crash_round:
+                self._record(img_array, channels, table=table.name)
+                return True, red_pixels
+        
+        # 2. FILTRO DE COLOR ROJO (OPTIMIZADO CON NUMPY)
+        # Crear máscara vectorizada (operación en C, 10x más rápido)
+        # Detectar rojo: R alto (>200), G y B bajos (<120)
+        red_mask_bool = red_mask(img_array, channels=channels)
+        
+        # 3. VERIFICAR SI HAY SUFICIENTES PÍXELES ROJOS
+        # (el conteo también alimenta al planificador: rojo = resultado del crash en pantalla)
+        red_pixel_count = np.count_nonzero(red_mask_bool)
+        if not table.phase_detector:
+            red_pixels = red_pixel_count
+        if red_pixel_count < MIN_RED_PIXELS:
+            self._record(img_array, channels, table=table.name)
+            return True, red_pixels
+        
+        # 4. RECORTE AL TEXTO (ROI): solo la caja del texto pasa al reconocimiento
+        if table.roi:
+            red_mask_bool = table.roi.crop(red_mask_bool)
+            if red_mask_bool is None:
+                self._record(img_array, channels, table=table.name)
+                return True, red_pixels
+        
+        # 5. ENCOLAR PARA RECONOCIMIENTO (si la cola está llena se descarta el frame más viejo)
+        with self.lock:
+            self.frame_seq += 1
+            seq = self.frame_seq
+        frame = {"seq": seq, "table": table.name, "captured_at": time.time(), "mask": red_mask_bool}
+        if table.phase_detector:
+            frame["round"], frame["flight_s"] = table.crash_round, flight_s
+        if (self.recorder and table.name == MAIN_TABLE) or self.debug_frames:
+            # El frame se graba (y/o pasa al anillo de debug) al terminar el
+            # reconocimiento, con su lectura
+            frame["raw"], frame["channels"] = img_array, channels
+        self.frame_queue.put(frame)
+        return True, red_pixels
+
+    # ------------------------------------------------------------------
+    # ETAPA 2: RECONOCIMIENTO (uno o varios workers)
+    # ------------------------------------------------------------------
+
+    def _recognition_loop(self, stop_event):
+        while not stop_event.is_set():
+            try:
+                frame = self.frame_queue.get(timeout=0.5)
+            except Empty:
+                continue
+            try:
+                detection = self._recognize(frame)
+                if detection and not self.round_queue.put(detection, timeout=5):
+                    add_log(f"⚠️ Cola de persistencia llena, ronda {detection['value']} descartada", "WARN")
             except Exception as e:
                 add_log(f"Error OCR: {str(e)}", "ERROR")
-                time.sleep(1)
+
+    def _recognize(self, frame):
+        """Leer el multiplicador de un frame. Devuelve la detección si es un valor nuevo"""
+        table = self.tables.get(frame["table"])
+        if table is None:
+            return None  # Mesa eliminada mientras el frame esperaba
+        red_mask_bool = frame["mask"]
+        
+        # LECTURA RÁPIDA POR PLANTILLAS (sub-milisegundo)
+        result = self._template_read(red_mask_bool)
+        
+        if result is None:
+            # OCR (respaldo): el motor normaliza la máscara (altura fija, texto negro sobre blanco)
+            result = self._ocr_read(red_mask_bool)
+            self._learn_glyphs(red_mask_bool, result)
+        
+        found_val = result.multiplier
+        new_val_str = format_multiplier(found_val) if found_val is not None else None
+        
+        if "raw" in frame:
+            self._record(frame["raw"], frame["channels"], new_val_str, table.name)
+        self._debug_frame(frame, table, red_mask_bool, result)
+        if new_val_str is None:
+            return None
+        
+        with self.lock:
+            # Con varios workers un frame viejo puede terminar después de uno nuevo
+            if frame["seq"] < table.accepted_seq:
+                self.stale_results += 1
+                return None
+            table.accepted_seq = frame["seq"]
+            if "round" in frame:
+                # Con detector de fase cada entrada en 'crashed' es una ronda nueva,
+                # aunque repita el valor anterior (ej: dos 1.00x seguidos)
+                if frame["round"] <= table.accepted_round:
+                    return None
+                table.accepted_round = frame["round"]
+            elif table.last_value == new_val_str:
+                return None
+            table.last_value = new_val_str
+            table.detections += 1
+            self.last_activity = time.time()  # Reset watchdog
+        
+        flight = f", vuelo {frame['flight_s']:.1f}s" if frame.get("flight_s") is not None else ""
+        source = f" [{table.name}]" if table.name != MAIN_TABLE else ""
+        add_log(f"DETECTADO{source}: {new_val_str} (Analizado: {result.text} [{result.backend}]{flight})", "SUCCESS")
+        return {"value": new_val_str, "multiplier": found_val, "captured_at": frame["captured_at"], "source": table.name}
+
+    # ------------------------------------------------------------------
+    # ETAPA 3: PERSISTENCIA
+    # ------------------------------------------------------------------
+
+    def _persist_loop(self, stop_event):
+        # Al detener se vacía la cola: las rondas ya leídas no se pierden
+        while not stop_event.is_set() or self.round_queue.depth:
+            try:
+                detection = self.round_queue.get(timeout=0.5)
+            except Empty:
+                continue
+            decision = self._persist_round(detection)
+            # Solo la mesa principal dispara clicks (los botones calibrados son los suyos)
+            if decision and detection.get("source", MAIN_TABLE) == MAIN_TABLE:
+                self.decision_queue.put(decision)
+
+    def _persist_round(self, detection):
+        """
+        Encolar la ronda para el escritor por lotes. Devuelve los datos para la
+        etapa de decisión (solo la mesa principal decide)
+        """
+        conn = None
+        try:
+            found_val = detection["multiplier"]
+            source = detection.get("source", MAIN_TABLE)
+            session_id = config_store.get_int('current_session_id', 1)
+            target = config_store.get_float('target_multiplier', 1.11)
+            result = 'ganada' if found_val >= target else 'perdida'
+            
+            if source != MAIN_TABLE:
+                # Mesas extra: sin clicks ni decisiones, no hace falta esperar al disco
+                db_writer.submit('rounds', (session_id, found_val, None, result, target, source, now_ms()))
+                return None
+            
+            # Click reciente de la sesión (anillo en memoria, dentro de pipeline.click_window_s)
+            # Los clicks solo se hacen sobre la mesa principal
+            timestamp = now_ms()
+            click_type = pending_clicks.match(session_id, timestamp)
+            
+            # Las rondas anteriores pueden estar aún en cola: confirmarlas antes de
+            # leerlas (normalmente no hay nada pendiente y no se espera)
+            if not db_writer.flush():
+                add_log("⚠️ El escritor de la base de datos no confirmó a tiempo", "WARN")
+            conn = get_db_connection()
+            
+            # Historial de la misma mesa para filtros: esta ronda + las 14 anteriores
+            history = [{"multiplier": found_val}] + [{"multiplier": r['multiplier']} for r in conn.execute(
+                'SELECT multiplier FROM rounds WHERE source = ? ORDER BY id DESC LIMIT 14', (source,)).fetchall()]
+            
+            db_writer.submit('rounds', (session_id, found_val, click_type, result, target, source, timestamp))
+            return {"multiplier": found_val, "target": target, "history": history}
+        except Exception as db_err:
+            add_log(f"Error guardando ronda: {str(db_err)}", "ERROR")
+            return None
+        finally:
+            if conn is not None:
+                try: conn.close()
+                except: pass
+
+    # ------------------------------------------------------------------
+    # ETAPA 4: DECISIÓN (filtros, disparos sniper y anti-AFK)
+    # ------------------------------------------------------------------
+
+    def _decision_loop(self, stop_event):
+        while not stop_event.is_set():
+            try:
+                decision = self.decision_queue.get(timeout=0.5)
+            except Empty:
+                continue
+            try:
+                self._decide(decision)
+            except Exception as proc_err:
+                add_log(f"Error procesando disparos: {str(proc_err)}", "ERROR")
+                db_pool.release_thread()
+
+    def _decide(self, decision):
+        """Evaluar filtros y ejecutar el disparo sniper o el click anti-AFK"""
+        rounds_since = config_store.get_int('rounds_since_last_bet', 0) + 1
+        anti_afk_target = config_store.get_int('anti_afk_next', 3)
+        
+        filter_ok, analysis_data = evaluate_filters(decision["history"], decision["target"])
+        
+        # Comprobar si Sniper está activo globalmente
+        sniper_active = config_store.get_bool('sniper_active', False)
+        
+        if filter_ok:
+            if sniper_active:
+                add_log("🎯 GATILLO SNIPER ACTIVADO", "SUCCESS")
+                if execute_stealth_click('btn1'):
+                    report_click_internal('apostar')
+                    # Ambos contadores en el mismo volcado
+                    config_store.update({'rounds_since_last_bet': 0, 'anti_afk_next': random.randint(2, 4)})
+            else:
+                add_log("🎯 GATILLO DETECTADO (Sniper Desactivado)", "INFO")
+                
+        elif rounds_since >= anti_afk_target:
+            # "Sniper Desactivado" bloquea todo disparo REAL de apuesta,
+            # pero Anti-AFK tiene su propio control (variable global anti_afk_enabled)
+            if anti_afk_enabled:
+                add_log(f"🔄 ANTI-AFK TRIGGER (Ronda {rounds_since})", "INFO")
+                if execute_stealth_click('btn1'):
+                    time.sleep(random.uniform(0.2, 0.5))
+                    execute_stealth_click('btn1')  # Cancelar
+                    report_click_internal('falso')
+                    # Ambos contadores en el mismo volcado
+                    config_store.update({'rounds_since_last_bet': 0, 'anti_afk_next': random.randint(2, 4)})
+            else:
+                 set_config('rounds_since_last_bet', rounds_since)
+        else:
+            set_config('rounds_since_last_bet', rounds_since)
+            add_log(f"Rondas sin apostar: {rounds_since}/{anti_afk_target}")
 
 # Crear instancia de OCR Tracker
 ocr_tracker = OCRTracker()
@@ -1059,22 +1987,17 @@ ocr_tracker = OCRTracker()
 def save_ocr_data():
     try:
         data = request.json
-        # Convertir timestamp JS (ms) a SQLite format si es necesario, 
-        # o guardar directo. Aquí guardamos directo en rounds.
+        # La columna timestamp guarda epoch ms (el mismo formato que Date.now() de JS)
         if not data:
             return jsonify({"success": False, "error": "No data"}), 400
 
-        conn = get_db_connection()
-        
         # Mapear campos frontend -> backend db
         # Frontend: { multiplier, timestamp, bet ('win'/'loss'), isSystemBet, partida, ronda }
         # Backend 'rounds' table: (session_id, multiplier, click_type, result, timestamp)
         
         session_id = data.get('partida', 1)
         multiplier = data.get('multiplier', 0.0)
-        timestamp = data.get('timestamp') # JS ms
-        # Convirtiendo fecha a algo legible o dejando integer?
-        # En get_dashboard usabamos timestamp para sort.
+        timestamp = to_epoch_ms(data.get('timestamp')) # JS ms
         
         # Determinar result string
         bet_res = data.get('bet') # 'win' / 'loss' / null
@@ -1096,13 +2019,7 @@ def save_ocr_data():
         # ESTRATEGIA: Update or Insert basado en session_id + timestamp cercano?
         # Por ahora, INSERT simple para cumplir la funcion del endpoint que faltaba.
         
-        conn.execute('''
-            INSERT INTO rounds (session_id, multiplier, result, timestamp, target_used)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (session_id, multiplier, result_str, timestamp, 0)) # Target 0 si desconocido
-        
-        conn.commit()
-        conn.close()
+        db_writer.submit('rounds_frontend', (session_id, multiplier, result_str, timestamp, 0)) # Target 0 si desconocido
         
         return jsonify({"success": True})
     except Exception as e:
@@ -1124,52 +2041,37 @@ def get_dashboard():
     try:
         # OPTIMIZACIÓN 4: Solo actualizar si hay ronda nueva
         if dashboard_needs_update or dashboard_cache is None:
-            session_id = int(get_config('current_session_id', 1))
-            target = float(get_config('target_multiplier', 1.11))
+            # Se baja antes de leer: un commit durante el cálculo vuelve a marcarlo
+            dashboard_needs_update = False
+            session_id = config_store.get_int('current_session_id', 1)
+            target = config_store.get_float('target_multiplier', 1.11)
             
             conn = get_db_connection()
             
-            # 1. Rondas Totales de la partida
-            total_rounds = conn.execute('SELECT COUNT(*) FROM rounds WHERE session_id = ?', (session_id,)).fetchone()[0]
-            
-            # 2. Wins / Losses
-            wins = conn.execute("SELECT COUNT(*) FROM rounds WHERE session_id = ? AND result = 'ganada' AND click_type IS NOT NULL", (session_id,)).fetchone()[0]
-            losses = conn.execute("SELECT COUNT(*) FROM rounds WHERE session_id = ? AND result = 'perdida' AND click_type IS NOT NULL", (session_id,)).fetchone()[0]
-            
-            # 3. Clicks por tipo
-            click_apostar = conn.execute("SELECT COUNT(*) FROM click_reports WHERE session_id = ? AND click_type = 'apostar'", (session_id,)).fetchone()[0]
-            click_falso = conn.execute("SELECT COUNT(*) FROM click_reports WHERE session_id = ? AND click_type = 'falso'", (session_id,)).fetchone()[0]
-            click_exp = conn.execute("SELECT COUNT(*) FROM click_reports WHERE session_id = ? AND click_type = 'exponencial'", (session_id,)).fetchone()[0]
+            # 1. Contadores de la partida (una fila de session_stats, mantenida por triggers)
+            row = conn.execute('SELECT * FROM session_stats WHERE session_id = ?', (session_id,)).fetchone()
+            stats = dict(row) if row else {}
             
             # Recargas (Desde Config global)
-            total_reloads = int(get_config('total_reloads', 0))
-            
-            # 4. Rondas sin apostar
-            rounds_no_bet = conn.execute("SELECT COUNT(*) FROM rounds WHERE session_id = ? AND click_type IS NULL", (session_id,)).fetchone()[0]
+            total_reloads = config_store.get_int('total_reloads', 0)
             
-            # Historial para filtros (solo multiplicadores)
-            history_rows = conn.execute('SELECT multiplier FROM rounds ORDER BY id DESC LIMIT 15').fetchall()
-            history_filter = [{"multiplier": r['multiplier']} for r in history_rows]
-            
-            # Historial completo para Frontend (Rich Objects)
-            full_history_rows = conn.execute('''
-                SELECT multiplier, timestamp, session_id, result 
-                FROM rounds 
-                ORDER BY id DESC LIMIT 20
-            ''').fetchall()
-            
-            rich_history = []
-            for r in full_history_rows:
-                bet_status = None
-                if r['result'] == 'ganada': bet_status = 'win'
-                elif r['result'] == 'perdida': bet_status = 'loss'
-                
-                rich_history.append({
-                    "multiplier": r['multiplier'],
-                    "timestamp": r['timestamp'],
-                    "partida": r['session_id'],
-                    "bet": bet_status
-                })
+            # 2. Historial completo para Frontend (Rich Objects) desde la serie en memoria,
+            #    solo la mesa principal; los filtros usan las últimas 15
+            recent = round_series.last(20, ['multiplier', 'timestamp_ms', 'session_id', 'result'],
+                                       source=SOURCE_MAIN)
+            bet_names = {RESULT_CODES['ganada']: 'win', RESULT_CODES['perdida']: 'loss'}
+            rich_history = [
+                {
+                    "multiplier": None if np.isnan(multiplier) else float(multiplier),  # NULL = NaN en la serie
+                    "timestamp": int(timestamp),
+                    "partida": int(partida) if partida >= 0 else None,
+                    "bet": bet_names.get(int(result))
+                }
+                for multiplier, timestamp, partida, result in zip(
+                    recent['multiplier'][::-1], recent['timestamp_ms'][::-1],
+                    recent['session_id'][::-1], recent['result'][::-1])
+            ]
+            history_filter = [{"multiplier": r["multiplier"]} for r in rich_history[:15] if r["multiplier"] is not None]
             
             # Evaluar Filtro Sniper
             filter_ok, filter_msg = evaluate_filters(history_filter, target)
@@ -1181,13 +2083,13 @@ def get_dashboard():
                 "session_id": session_id,
                 "target": target,
                 "counters": {
-                    "total_rounds": total_rounds,
-                    "wins": wins,
-                    "losses": losses,
-                    "rounds_no_bet": rounds_no_bet,
-                    "click_apostar": click_apostar,
-                    "click_falso": click_falso,
-                    "click_exponencial": click_exp,
+                    "total_rounds": stats.get('total_rounds', 0),
+                    "wins": stats.get('wins', 0),
+                    "losses": stats.get('losses', 0),
+                    "rounds_no_bet": stats.get('rounds_no_bet', 0),
+                    "click_apostar": stats.get('click_apostar', 0),
+                    "click_falso": stats.get('click_falso', 0),
+                    "click_exponencial": stats.get('click_exponencial', 0),
                     "session_reloads": total_reloads
                 },
                 "history": rich_history,
@@ -1196,22 +2098,30 @@ def get_dashboard():
                     "message": filter_msg
                 }
             }
-            
-            dashboard_needs_update = False
         
         return jsonify(dashboard_cache)
     except Exception as e:
+        dashboard_needs_update = True
         return jsonify({"error": str(e)}), 500
 
-def report_click_internal(click_type):
-    """Registra un click en la base de datos sin necesidad de request HTTP."""
+def report_click_internal(click_type, timestamp=None):
+    """
+    Registra un click sin necesidad de request HTTP: queda pendiente en memoria
+    para la próxima ronda y se guarda en click_reports por el escritor.
+    `timestamp` (epoch ms) = hora real del click si se reporta con retraso.
+    """
     try:
-        session_id = int(get_config('current_session_id', 1))
-        conn = get_db_connection()
-        conn.execute('INSERT INTO click_reports (session_id, click_type) VALUES (?, ?)', (session_id, click_type))
-        conn.commit()
-        conn.close()
-        add_log(f"🖱️ Click auto-reportado: {click_type}")
+        session_id = config_store.get_int('current_session_id', 1)
+        clicked_ms = now_ms() if timestamp is None else timestamp
+        db_writer.submit('click_reports', (session_id, click_type, clicked_ms))
+        at = None if timestamp is None else ClickCorrelator.monotonic_from_epoch_ms(timestamp)
+        late_round = pending_clicks.add(session_id, click_type, at)
+        if late_round is not None:
+            # La ronda ya se guardó sin click: corregirla (va después de su INSERT en la cola)
+            db_writer.submit('round_click', (click_type, MAIN_TABLE, late_round.timestamp_ms, late_round.session_id))
+            add_log(f"🖱️ Click {click_type} conciliado con la ronda anterior")
+        else:
+            add_log(f"🖱️ Click auto-reportado: {click_type}")
     except Exception as e:
         add_log(f"Error en reporte interno de click: {str(e)}", "ERROR")
 
@@ -1219,7 +2129,9 @@ def report_click_internal(click_type):
 def report_click():
     data = request.json
     click_type = data.get('type')
-    report_click_internal(click_type)
+    # Hora del click en el cliente (opcional): permite conciliar reportes que llegan tarde
+    timestamp = to_epoch_ms(data['timestamp']) if data.get('timestamp') is not None else None
+    report_click_internal(click_type, timestamp)
     return jsonify({"success": True})
 
 # FASE 3: Toggle Anti-AFK
@@ -1238,9 +2150,9 @@ def toggle_anti_afk():
 
 @app.route('/api/new_session', methods=['POST'])
 def new_session():
-    current = int(get_config('current_session_id', 1))
+    current = config_store.get_int('current_session_id', 1)
     new_id = current + 1
-    set_config('current_session_id', new_id)
+    set_config('current_session_id', new_id, flush=True)
     add_log(f"🆕 Nueva Partida Iniciada: ID {new_id}")
     return jsonify({"success": True, "session_id": new_id})
 
@@ -1294,7 +2206,7 @@ def test_click_button(button_id):
 def update_config():
     data = request.json
     if 'target' in data:
-        set_config('target_multiplier', data['target'])
+        set_config('target_multiplier', data['target'], flush=True)
         add_log(f"⚙️ Target actualizado a: {data['target']}x")
     
     # Soporte para sync de otras configs
@@ -1305,9 +2217,162 @@ def update_config():
         
     return jsonify({"success": True})
 
+@app.route('/api/db/stats', methods=['GET'])
+def db_stats():
+    """Conexiones del pool SQLite y tiempos por sentencia (?reset=1 reinicia los tiempos)"""
+    stats = db_pool.get_stats(request.args.get('top', 20, type=int))
+    stats["config_cache"] = config_store.get_stats()
+    stats["writer"] = db_writer.get_stats()
+    stats["pending_clicks"] = pending_clicks.get_stats()
+    if request.args.get('reset'):
+        db_pool.reset_stats()
+    return jsonify(stats)
+
+@app.route('/api/archive', methods=['GET'])
+def archive_info():
+    """Historial frío: totales y segmentos (?since=&until= en epoch ms)"""
+    since = request.args.get('since', None, type=int)
+    until = request.args.get('until', None, type=int)
+    return jsonify({
+        "stats": round_archive.get_stats(),
+        "segments": round_archive.segments(since, until)
+    })
+
+@app.route('/api/stats/rounds', methods=['GET'])
+def rounds_stats():
+    """
+    Estadísticas vectorizadas sobre la serie completa (caliente + archivo).
+    ?session_id=&since=&until= (epoch ms) filtran; ?targets=1.5,2,3 calcula la
+    tasa de acierto de cada target (barrido de filtros sin consultar SQLite)
+    """
+    try:
+        session_id = request.args.get('session_id', None, type=int)
+        since = request.args.get('since', None, type=int)
+        until = request.args.get('until', None, type=int)
+        targets = [float(t) for t in request.args.get('targets', '').split(',') if t.strip()]
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    
+    start = time.perf_counter()
+    if session_id is None and since is None and until is None:
+        data = round_series.view(['multiplier'])  # Sin filtros: vista sin copia
+    else:
+        data = round_series.select(['multiplier'], session_id=session_id, since_ms=since, until_ms=until)
+    m = data['multiplier']
+    m = m[~np.isnan(m)]
+    stats = {"count": int(m.size)}
+    if m.size:
+        p25, p50, p75, p90, p99 = np.percentile(m, [25, 50, 75, 90, 99])
+        stats.update({
+            "mean": round(float(m.mean()), 4),
+            "min": float(m.min()),
+            "max": float(m.max()),
+            "percentiles": {"p25": float(p25), "p50": float(p50), "p75": float(p75),
+                            "p90": float(p90), "p99": float(p99)}
+        })
+    if targets:
+        stats["targets"] = [
+            {"target": t, "hit_rate": round(float(np.count_nonzero(m >= t)) / m.size, 4) if m.size else 0.0}
+            for t in targets
+        ]
+    stats["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    stats["series"] = round_series.get_stats()
+    return jsonify(stats)
+
+# Carpeta de la que /api/import puede leer archivos locales (la de la extensión)
+IMPORT_DIR = os.path.realpath(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@app.route('/api/import', methods=['POST'])
+def import_history():
+    """
+    Importar un historial .txt (reporte de la extensión) o .csv (Timestamp, Multiplier).
+    Multipart con `file`, o `path` a un archivo dentro de la carpeta de la extensión
+    (relativo a ella; no se aceptan rutas fuera). Opcionales: format (txt|csv),
+    source (etiqueta), session_id, tz (ej: -03:00; por defecto hora local)
+    """
+    global dashboard_needs_update
+    params = request.form.to_dict() if request.form or request.files else (request.get_json(silent=True) or {})
+    try:
+        session_id = int(params['session_id']) if params.get('session_id') not in (None, '') else None
+        tz = importer.parse_tz(params.get('tz'))
+        source = importer.source_name(params.get('source'))
+        fmt = params.get('format') or None
+        if fmt is not None and fmt not in importer.PARSERS:
+            raise ValueError(f"Formato no soportado: '{fmt}' (usar {', '.join(importer.PARSERS)})")
+        upload = request.files.get('file')
+        if upload is not None:
+            fmt = fmt or importer.detect_format(upload.filename or '')
+            stream = io.TextIOWrapper(upload.stream, encoding='utf-8-sig', errors='replace', newline='')
+            name = upload.filename
+        elif params.get('path'):
+            # Solo archivos dentro de la carpeta de la extensión (sin escapar con ../ ni enlaces)
+            path = os.path.realpath(os.path.join(IMPORT_DIR, params['path']))
+            if os.path.commonpath([IMPORT_DIR, path]) != IMPORT_DIR:
+                return jsonify({"success": False, "error": "La ruta debe estar dentro de la carpeta de la extensión"}), 400
+            fmt = fmt or importer.detect_format(path)
+            stream = open(path, 'r', encoding='utf-8-sig', errors='replace', newline='')
+            name = os.path.basename(path)
+        else:
+            return jsonify({"success": False, "error": "Falta 'file' o 'path'"}), 400
+    except (ValueError, OSError) as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    
+    try:
+        db_writer.flush()  # Los ids de las importadas quedan después de lo ya encolado
+        conn = get_db_connection()
+        try:
+            with stream:
+                result = importer.import_stream(conn, stream, fmt, source, session_id, tz)
+            if result.inserted:
+                # Las importadas (ids <= 0) pasan directo al historial frío y la serie,
+                # que solo agrega ids nuevos, se reconstruye para incluirlas en orden
+                round_archive.roll_over()
+                round_series.reset()
+                round_series.sync(conn, round_archive)
+        finally:
+            conn.close()
+    except Exception as e:
+        add_log(f"❌ Error importando {name}: {e}", "ERROR")
+        return jsonify({"success": False, "error": str(e)}), 500
+    
+    if result.inserted:
+        dashboard_needs_update = True
+    add_log(f"📥 {name}: {result.inserted} rondas importadas ({result.duplicates} duplicadas, "
+            f"{result.invalid} inválidas) en {result.elapsed_ms:.0f} ms", "SUCCESS")
+    return jsonify({"success": True, "file": name, **result._asdict()})
+
+@app.route('/api/export', methods=['GET'])
+def export_rounds():
+    """
+    Descargar rondas (archivo frío + tabla) en streaming.
+    ?format=csv|ndjson|parquet &session_id= &since=&until= (epoch ms)
+    """
+    fmt = request.args.get('format', 'csv').lower()
+    if fmt not in round_export.FORMATS:
+        return jsonify({"success": False, "error": f"Formato no soportado: {fmt}",
+                        "formats": round_export.available_formats()}), 400
+    if fmt not in round_export.available_formats():
+        return jsonify({"success": False, "error": "Exportar a Parquet requiere pyarrow (pip install pyarrow)"}), 400
+    session_id = request.args.get('session_id', None, type=int)
+    since = request.args.get('since', None, type=int)
+    until = request.args.get('until', None, type=int)
+    
+    # Lo encolado ya debe estar en la tabla; la conexión la abre el generador
+    # (corre después de que termina el request)
+    db_writer.flush()
+    blocks = round_export.iter_blocks(db_pool.acquire, round_archive, session_id, since, until)
+    content_type, ext = round_export.FORMATS[fmt]
+    name = f"rounds_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{ext}"
+    return Response(
+        round_export.export_stream(fmt, blocks),
+        content_type=content_type,
+        headers={"Content-Disposition": f"attachment; filename={name}"}
+    )
+
 @app.route('/api/clear_db', methods=['POST'])
 def clear_database():
     try:
+        db_writer.flush()  # Que no lleguen filas encoladas después del borrado
         conn = get_db_connection()
         # Borrar tablas principales
         conn.execute('DELETE FROM rounds')
@@ -1315,10 +2380,17 @@ def clear_database():
         # Resetear secuencia de IDs si se desea, o dejar que SQLite maneje
         conn.execute('DELETE FROM sqlite_sequence WHERE name="rounds"')
         conn.execute('DELETE FROM sqlite_sequence WHERE name="click_reports"')
+        # Contadores y también el historial frío
+        conn.execute('DELETE FROM session_stats')
+        conn.execute('DELETE FROM round_keys')
+        archived_files = round_archive.clear(conn)
+        conn.commit()
+        round_archive.delete_files(archived_files)
+        round_series.reset()
+        pending_clicks.clear()
         
-        # Optimizar espacio
+        # Optimizar espacio (VACUUM no puede correr dentro de una transacción)
         conn.execute('VACUUM')
-        conn.commit()
         conn.close()
         
         add_log("🗑️ BASE DE DATOS BORRADA COMPLETAMENTE", "WARNING")
@@ -1425,7 +2497,7 @@ def calibrate_exponential(sys_id):
                 points = res['points']
                 # Guardar en DB/Config
                 points_data = [{"x": p[0], "y": p[1]} for p in points]
-                set_config(f'exp_sys{sys_id}_points', json.dumps(points_data))
+                set_config(f'exp_sys{sys_id}_points', json.dumps(points_data), flush=True)
                 
                 return jsonify({"success": True, "count": len(points), "points": points_data})
             time.sleep(0.5)
@@ -1465,6 +2537,9 @@ if __name__ == '__main__':
     add_log("🔍 OCR Tracker con filtros Kernel V5.2", "SUCCESS")
     add_log("💾 Base de datos SQLite activa", "SUCCESS")
     
+    # Cargar el motor OCR una sola vez (warm-up antes del primer frame)
+    ocr_tracker.init_engine()
+    
     # 1. Iniciar Flask en thread separado (Daemon)
     # Debe ser daemon para morir cuando el main thread (Qt) muera
     flask_thread = threading.Thread(target=run_flask_server, daemon=True)
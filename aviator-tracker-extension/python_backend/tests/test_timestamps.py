@@ -0,0 +1,53 @@
+"""
+Conversión de timestamps viejos a epoch ms (migración a user_version 1).
+
+Uso:
+    python -m unittest discover -s tests
+"""
+import os
+import sqlite3
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.db import LEGACY_TS_TO_MS, NOW_MS_SQL
+
+
+class LegacyTimestampTest(unittest.TestCase):
+
+    def setUp(self):
+        self.conn = sqlite3.connect(':memory:')
+        self.conn.execute('CREATE TABLE rounds (id INTEGER PRIMARY KEY, timestamp)')
+
+    def tearDown(self):
+        self.conn.close()
+
+    def migrate(self, value) -> int:
+        self.conn.execute('DELETE FROM rounds')
+        self.conn.execute('INSERT INTO rounds (id, timestamp) VALUES (1, ?)', (value,))
+        return self.conn.execute(f'SELECT {LEGACY_TS_TO_MS} FROM rounds').fetchone()[0]
+
+    def test_current_timestamp_text(self):
+        # CURRENT_TIMESTAMP (UTC, segundos exactos): sin ROUND quedaba 1 ms antes
+        self.assertEqual(self.migrate('2026-01-16 14:32:06'), 1768573926000)
+        self.assertEqual(self.migrate('2026-01-16 14:32:06.250'), 1768573926250)
+
+    def test_js_milliseconds(self):
+        self.assertEqual(self.migrate(1768573926000), 1768573926000)
+        self.assertEqual(self.migrate('1768573926000'), 1768573926000)
+
+    def test_seconds(self):
+        self.assertEqual(self.migrate(1768573926), 1768573926000)
+        self.assertEqual(self.migrate(1768573926.123), 1768573926123)
+
+    def test_invalid_is_zero(self):
+        self.assertEqual(self.migrate(None), 0)
+
+    def test_now_is_whole_ms(self):
+        now = self.conn.execute(f'SELECT {NOW_MS_SQL}').fetchone()[0]
+        self.assertIsInstance(now, int)
+
+
+if __name__ == '__main__':
+    unittest.main()
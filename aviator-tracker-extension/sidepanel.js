@@ -2164,7 +2164,7 @@ class SidePanelController {
                             fetch(`${this.pythonServer}/api/report_click`, {
                                 method: 'POST',
                                 headers: { 'Content-Type': 'application/json' },
-                                body: JSON.stringify({ type: 'apostar' })
+                                body: JSON.stringify({ type: 'apostar', timestamp: this.lastAutobet })
                             });
                         }
                     })
@@ -0,0 +1 @@
+# Módulos de visión compartidos entre desktop-app y python_backend
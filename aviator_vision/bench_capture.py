@@ -0,0 +1,62 @@
+"""
+Benchmark de captura: mss (vista BGRA sin copia) vs pyautogui.screenshot (PIL).
+Mide FPS y latencia por frame de captura + máscara roja para ambos caminos.
+
+Uso:
+    python -m aviator_vision.bench_capture --frames 300 --region 500 130 276 67
+"""
+import argparse
+import time
+
+import numpy as np
+
+from aviator_vision.capture import CHANNELS_BGRA, CHANNELS_RGB, ScreenGrabber
+from aviator_vision.recognition.preprocess import red_mask
+
+
+def run(name: str, capture, frames: int) -> dict:
+    """Ejecutar `frames` capturas y devolver FPS y percentiles de latencia (ms)"""
+    capture()  # Warm-up (abre handles, carga DLLs)
+    latencies = np.empty(frames)
+    start = time.perf_counter()
+    for i in range(frames):
+        t0 = time.perf_counter()
+        frame, channels = capture()
+        red_mask(frame, channels=channels).sum()
+        latencies[i] = time.perf_counter() - t0
+    total = time.perf_counter() - start
+
+    result = {
+        "path": name,
+        "fps": frames / total,
+        "p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "p99_ms": float(np.percentile(latencies, 99) * 1000),
+    }
+    print(f"{name:<12} {result['fps']:>8.1f} fps   p50 {result['p50_ms']:>7.2f} ms   p99 {result['p99_ms']:>7.2f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de captura mss vs pyautogui")
+    parser.add_argument('--frames', type=int, default=200)
+    parser.add_argument('--region', type=int, nargs=4, metavar=('X', 'Y', 'W', 'H'),
+                        default=(500, 130, 276, 67))
+    args = parser.parse_args()
+    x, y, w, h = args.region
+
+    print(f"Región {w}x{h} en ({x}, {y}), {args.frames} frames")
+    grabber = ScreenGrabber()
+    if grabber.available:
+        run("mss", lambda: (grabber.grab(x, y, w, h), CHANNELS_BGRA), args.frames)
+    else:
+        print("mss no instalado, se omite")
+
+    try:
+        import pyautogui
+        run("pyautogui", lambda: (np.array(pyautogui.screenshot(region=(x, y, w, h))), CHANNELS_RGB), args.frames)
+    except Exception as e:
+        print(f"pyautogui no disponible ({e}), se omite")
+
+
+if __name__ == '__main__':
+    main()
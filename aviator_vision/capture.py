@@ -0,0 +1,84 @@
+"""
+Captura de pantalla compartida basada en MSS.
+Mantiene un handle `mss` abierto por thread y expone el buffer BGRA de cada
+captura directamente como vista NumPy (sin copias ni conversión a PIL).
+"""
+import threading
+
+import numpy as np
+
+try:
+    import mss
+except ImportError:
+    mss = None
+
+
+# Índices de los canales (R, G, B) según el formato del frame
+CHANNELS_RGB = (0, 1, 2)
+CHANNELS_BGRA = (2, 1, 0)
+
+
+class ScreenGrabber:
+    """Capturador MSS con un handle por thread (los handles no son thread-safe)"""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    @property
+    def available(self) -> bool:
+        return mss is not None
+
+    def _sct(self):
+        sct = getattr(self._local, 'sct', None)
+        if sct is None:
+            if mss is None:
+                raise RuntimeError("mss no está instalado")
+            sct = mss.mss()
+            self._local.sct = sct
+        return sct
+
+    @property
+    def monitors(self) -> list:
+        """Información de todos los monitores"""
+        return self._sct().monitors
+
+    def grab_raw(self, x: int, y: int, width: int, height: int):
+        """Capturar una región y devolver el ScreenShot de mss"""
+        return self._sct().grab({"top": y, "left": x, "width": width, "height": height})
+
+    def grab(self, x: int, y: int, width: int, height: int) -> np.ndarray:
+        """
+        Capturar una región como vista BGRA.
+
+        Args:
+            x, y: Esquina superior izquierda
+            width, height: Tamaño de la región
+
+        Returns:
+            Array uint8 (alto, ancho, 4) que comparte memoria con la captura
+        """
+        return self.to_array(self.grab_raw(x, y, width, height))
+
+    def grab_monitor(self, monitor_number: int = 1) -> np.ndarray:
+        """Capturar un monitor completo como vista BGRA"""
+        sct = self._sct()
+        return self.to_array(sct.grab(sct.monitors[monitor_number]))
+
+    @staticmethod
+    def to_array(shot) -> np.ndarray:
+        """Vista NumPy (sin copia) del buffer BGRA de un ScreenShot de mss"""
+        return np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+
+    @staticmethod
+    def to_image(frame: np.ndarray):
+        """Convertir un frame BGRA a PIL Image RGB (una sola conversión)"""
+        from PIL import Image
+        frame = np.ascontiguousarray(frame)
+        return Image.frombuffer('RGB', (frame.shape[1], frame.shape[0]), frame, 'raw', 'BGRX', 0, 1)
+
+    def close(self):
+        """Cerrar el handle del thread actual"""
+        sct = getattr(self._local, 'sct', None)
+        if sct is not None:
+            sct.close()
+            self._local.sct = None
@@ -0,0 +1,164 @@
+"""
+Corpus de frames grabados para medir el OCR sin pantalla.
+Un corpus es una carpeta de chunks `chunk_000001.npz` (comprimidos, solo se
+añaden) con los frames RGB crudos, su marca de tiempo y el valor reconocido en
+vivo. `python -m aviator_vision.replay` los vuelve a pasar por cualquier motor.
+"""
+import glob
+import os
+import re
+import threading
+import time
+from typing import Iterator, List, NamedTuple, Optional
+
+import numpy as np
+
+from aviator_vision.recognition.parsing import format_multiplier, parse_multiplier as parse_value
+
+
+CHUNK_PATTERN = "chunk_{:06d}.npz"
+CHUNK_RE = re.compile(r'^chunk_(\d+)\.npz$')  # Excluye los .tmp.npz de una escritura cortada
+VALUE_DTYPE = "<U16"
+
+def parse_multiplier(text: str) -> str:
+    """Normalizar un texto OCR a 'N.NNx' ('' si no hay un multiplicador válido)"""
+    value = parse_value(text)
+    return format_multiplier(value) if value is not None else ""
+
+
+class RecordedFrame(NamedTuple):
+    """Frame leído de un corpus"""
+    frame: np.ndarray   # RGB uint8 (alto, ancho, 3)
+    timestamp: float    # Epoch (s)
+    value: str          # Valor reconocido al grabar ('' = sin lectura)
+
+
+def write_chunk(path: str, index: int, frames: np.ndarray, timestamps, values) -> int:
+    """
+    Escribir un chunk completo (escritura atómica).
+
+    Args:
+        path: Carpeta del corpus
+        index: Número de chunk (1, 2, ...)
+        frames: Array (n, alto, ancho, 3) uint8 RGB
+        timestamps: n marcas de tiempo (s)
+        values: n valores ('' = sin lectura)
+
+    Returns:
+        Bytes escritos
+    """
+    chunk_path = os.path.join(path, CHUNK_PATTERN.format(index))
+    tmp_path = chunk_path + ".tmp.npz"
+    np.savez_compressed(
+        tmp_path,
+        frames=frames,
+        timestamps=np.asarray(timestamps, dtype=np.float64),
+        values=np.asarray(values, dtype=VALUE_DTYPE)
+    )
+    os.replace(tmp_path, chunk_path)
+    return os.path.getsize(chunk_path)
+
+
+class FrameRecorder:
+    """Grabador de frames en chunks NPZ comprimidos (thread-safe)"""
+
+    def __init__(self, path: str, chunk_size: int = 64):
+        """
+        Args:
+            path: Carpeta del corpus (se crea si no existe; si ya tiene chunks se continúa)
+            chunk_size: Frames por chunk
+        """
+        self.path = path
+        self.chunk_size = max(1, int(chunk_size))
+        os.makedirs(path, exist_ok=True)
+        self._lock = threading.Lock()
+        self._frames: List[np.ndarray] = []
+        self._timestamps: List[float] = []
+        self._values: List[str] = []
+        # Continuar después del último chunk (puede faltar alguno del medio)
+        self._next_chunk = max((_chunk_index(c) for c in _chunk_files(path)), default=0) + 1
+        self.frames_written = 0
+        self.bytes_written = 0
+
+    def add(self, frame: np.ndarray, value: Optional[str] = None, timestamp: Optional[float] = None,
+            channels=(0, 1, 2)):
+        """
+        Añadir un frame.
+
+        Args:
+            frame: Frame (alto, ancho, 3|4)
+            value: Valor reconocido (None/'' si no hubo lectura)
+            timestamp: Epoch en segundos (por defecto ahora)
+            channels: Índices (R, G, B) del frame (CHANNELS_BGRA para frames de mss)
+        """
+        rgb = np.ascontiguousarray(frame[:, :, list(channels)])
+        with self._lock:
+            # Todos los frames de un chunk deben tener el mismo tamaño
+            if self._frames and self._frames[0].shape != rgb.shape:
+                self._flush_locked()
+            self._frames.append(rgb)
+            self._timestamps.append(time.time() if timestamp is None else timestamp)
+            self._values.append(value or "")
+            if len(self._frames) >= self.chunk_size:
+                self._flush_locked()
+
+    def flush(self):
+        """Escribir el chunk pendiente"""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._frames:
+            return
+        self.bytes_written += write_chunk(
+            self.path, self._next_chunk, np.stack(self._frames), self._timestamps, self._values
+        )
+        self.frames_written += len(self._frames)
+        self._next_chunk += 1
+        self._frames, self._timestamps, self._values = [], [], []
+
+    def close(self):
+        self.flush()
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            pending = len(self._frames)
+        return {
+            "path": self.path,
+            "frames_written": self.frames_written,
+            "frames_pending": pending,
+            "bytes_written": self.bytes_written
+        }
+
+
+def _chunk_index(chunk_path: str) -> int:
+    return int(CHUNK_RE.match(os.path.basename(chunk_path)).group(1))
+
+
+def _chunk_files(path: str) -> List[str]:
+    """Chunks completos del corpus, en orden"""
+    files = [f for f in glob.glob(os.path.join(path, "chunk_*.npz")) if CHUNK_RE.match(os.path.basename(f))]
+    return sorted(files, key=_chunk_index)
+
+
+class FrameCorpus:
+    """Lector de un corpus grabado con FrameRecorder"""
+
+    def __init__(self, path: str):
+        if not os.path.isdir(path):
+            raise FileNotFoundError(f"Corpus no encontrado: {path}")
+        self.path = path
+        self.chunks = _chunk_files(path)
+
+    def __iter__(self) -> Iterator[RecordedFrame]:
+        for chunk in self.chunks:
+            with np.load(chunk) as data:
+                for frame, timestamp, value in zip(data['frames'], data['timestamps'], data['values']):
+                    yield RecordedFrame(frame, float(timestamp), str(value))
+
+    def __len__(self) -> int:
+        total = 0
+        for chunk in self.chunks:
+            with np.load(chunk) as data:
+                total += len(data['timestamps'])
+        return total
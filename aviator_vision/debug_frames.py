@@ -0,0 +1,197 @@
+"""
+Anillo en memoria de los últimos frames de debug del OCR.
+Cada lectura guarda su frame crudo y la imagen procesada en un buffer de tamaño
+fijo (sin tocar el disco). Solo al pedirlo (lectura de baja confianza, llamada
+a la API) se vuelca una copia a disco desde un thread en segundo plano, o se
+empaqueta en un ZIP en memoria para descargarla.
+"""
+import io
+import json
+import os
+import shutil
+import threading
+import time
+import zipfile
+from collections import deque
+from queue import Full, Queue
+from typing import List, NamedTuple, Optional
+
+import numpy as np
+from PIL import Image
+
+
+class DebugFrame(NamedTuple):
+    """Frame guardado en el anillo"""
+    timestamp: float
+    raw: Optional[np.ndarray]        # RGB uint8 (copia)
+    processed: Optional[np.ndarray]  # Gris uint8 o máscara booleana (copia)
+    value: Optional[str]             # Lectura ('' / None = sin lectura)
+    confidence: Optional[float]
+    note: str
+
+
+def _png(image: np.ndarray) -> bytes:
+    if image.dtype == bool:
+        image = np.where(image, 0, 255).astype(np.uint8)  # Texto negro sobre blanco
+    buffer = io.BytesIO()
+    Image.fromarray(np.ascontiguousarray(image)).save(buffer, 'PNG', compress_level=1)
+    return buffer.getvalue()
+
+
+def _entries(frames: List[DebugFrame]):
+    """(nombre de archivo, bytes) de cada imagen y el índice JSON"""
+    index = []
+    for i, frame in enumerate(frames):
+        item = {
+            "index": i,
+            "timestamp": frame.timestamp,
+            "value": frame.value,
+            "confidence": frame.confidence,
+            "note": frame.note
+        }
+        for kind, image in (("raw", frame.raw), ("processed", frame.processed)):
+            if image is not None:
+                name = f"{i:03d}_{kind}.png"
+                item[kind] = name
+                yield name, _png(image)
+        index.append(item)
+    yield "index.json", json.dumps(index, indent=2).encode('utf-8')
+
+
+class DebugFrameRing:
+    """Buffer circular de frames de debug con volcado asíncrono a disco"""
+
+    def __init__(self, capacity: int = 64, out_dir: str = "debug_ocr", max_dumps: int = 20,
+                 min_dump_interval_s: float = 10.0):
+        """
+        Args:
+            capacity: Frames que se conservan (los más viejos se descartan)
+            out_dir: Carpeta donde se vuelcan los snapshots
+            max_dumps: Snapshots que se conservan en disco (se borran los más viejos)
+            min_dump_interval_s: Intervalo mínimo entre volcados automáticos
+        """
+        self.capacity = max(1, int(capacity))
+        self.out_dir = out_dir
+        self.max_dumps = max(1, int(max_dumps))
+        self.min_dump_interval_s = min_dump_interval_s
+        self._frames = deque(maxlen=self.capacity)
+        self._lock = threading.Lock()
+        self._queue = Queue(maxsize=4)
+        self._thread = None
+        self._last_dump = 0.0
+        self.frames_added = 0
+        self.dumps_written = 0
+        self.dumps_skipped = 0
+
+    def add(self, raw: Optional[np.ndarray] = None, processed: Optional[np.ndarray] = None,
+            value: Optional[str] = None, confidence: Optional[float] = None, note: str = "",
+            channels=(0, 1, 2)):
+        """
+        Guardar un frame (se copian los arrays: pueden ser vistas de la captura).
+
+        Args:
+            raw: Frame crudo (alto, ancho, 3|4)
+            processed: Imagen que recibió el OCR (gris o máscara booleana)
+            channels: Índices (R, G, B) del frame crudo (CHANNELS_BGRA para mss)
+        """
+        raw_copy = np.ascontiguousarray(raw[:, :, list(channels)]) if raw is not None else None
+        processed_copy = np.array(processed, copy=True) if processed is not None else None
+        frame = DebugFrame(time.time(), raw_copy, processed_copy, value, confidence, note)
+        with self._lock:
+            self._frames.append(frame)
+            self.frames_added += 1
+
+    def snapshot(self, last_n: Optional[int] = None) -> List[DebugFrame]:
+        """Últimos `last_n` frames (todos si None), del más viejo al más nuevo"""
+        with self._lock:
+            frames = list(self._frames)
+        return frames[-last_n:] if last_n else frames
+
+    def dump(self, reason: str = "manual", last_n: Optional[int] = None, force: bool = True) -> Optional[str]:
+        """
+        Volcar el anillo a disco en segundo plano.
+
+        Args:
+            reason: Sufijo de la carpeta (ej: 'baja_confianza')
+            last_n: Frames a volcar (todos si None)
+            force: False = respetar min_dump_interval_s (volcados automáticos)
+
+        Returns:
+            Carpeta de destino o None si no se volcó
+        """
+        now = time.time()
+        if not force and now - self._last_dump < self.min_dump_interval_s:
+            self.dumps_skipped += 1
+            return None
+        frames = self.snapshot(last_n)
+        if not frames:
+            return None
+        safe_reason = "".join(c if c.isalnum() or c in "-_" else "_" for c in reason)[:40]
+        target = os.path.join(self.out_dir, time.strftime('%Y%m%d_%H%M%S') + f"_{int(now * 1000) % 1000:03d}_{safe_reason}")
+        try:
+            self._queue.put_nowait((target, frames))
+        except Full:
+            self.dumps_skipped += 1
+            return None
+        self._last_dump = now
+        self._ensure_writer()
+        return target
+
+    def archive(self, last_n: Optional[int] = None) -> bytes:
+        """ZIP en memoria con los últimos `last_n` frames (PNG) e index.json"""
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as zf:
+            for name, data in _entries(self.snapshot(last_n)):
+                zf.writestr(name, data)
+        return buffer.getvalue()
+
+    # ------------------------------------------------------------------
+    # Escritura en segundo plano
+    # ------------------------------------------------------------------
+
+    def _ensure_writer(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._writer_loop, name="debug-frames", daemon=True)
+                self._thread.start()
+
+    def _writer_loop(self):
+        while True:
+            task = self._queue.get()
+            if task is None:
+                return
+            target, frames = task
+            try:
+                os.makedirs(target, exist_ok=True)
+                for name, data in _entries(frames):
+                    with open(os.path.join(target, name), 'wb') as f:
+                        f.write(data)
+                self.dumps_written += 1
+                self._prune()
+            except Exception as e:
+                print(f"❌ Error volcando frames de debug: {e}")
+
+    def _prune(self):
+        """Conservar solo los últimos max_dumps snapshots"""
+        dumps = sorted(d for d in os.listdir(self.out_dir) if os.path.isdir(os.path.join(self.out_dir, d)))
+        for old in dumps[:-self.max_dumps]:
+            shutil.rmtree(os.path.join(self.out_dir, old), ignore_errors=True)
+
+    def close(self, timeout: float = 5.0):
+        """Terminar los volcados pendientes y detener el thread"""
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            self._queue.put(None)
+            thread.join(timeout)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            buffered = len(self._frames)
+        return {
+            "capacity": self.capacity,
+            "buffered": buffered,
+            "frames_added": self.frames_added,
+            "dumps_written": self.dumps_written,
+            "dumps_skipped": self.dumps_skipped,
+            "out_dir": self.out_dir
+        }
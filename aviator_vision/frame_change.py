@@ -0,0 +1,104 @@
+"""
+Detector de cambios entre frames consecutivos.
+Compara la captura cruda (en gris) contra la última procesada antes de cualquier
+procesamiento, tolerando el pixel jitter de la captura, para saltar el
+preprocesado y el OCR cuando la pantalla no cambió.
+"""
+import numpy as np
+
+
+class FrameChangeDetector:
+    def __init__(self, threshold: float = 12.0, block: int = 8, max_shift: int = 4):
+        """
+        Args:
+            threshold: Diferencia media máxima por bloque (0-255) para
+                considerar el frame idéntico
+            block: Lado del bloque (px) sobre el que se promedia la diferencia
+            max_shift: Desplazamiento máximo (px) tolerado entre dos capturas
+                (el pixel jitter del tracker mueve cada región ±2px)
+        """
+        self.threshold = threshold
+        self.block = block
+        self.max_shift = max_shift
+        self.previous = None  # Último frame procesado, en gris (int16)
+        self.hits = 0         # Frames idénticos (OCR ahorrado)
+        self.misses = 0       # Frames con cambios (OCR ejecutado)
+
+    @staticmethod
+    def _gray(frame: np.ndarray) -> np.ndarray:
+        """Frame RGB/BGRA/gris -> gris int16 (promedio simple de canales)"""
+        if frame.ndim == 3:
+            return frame[:, :, :3].sum(axis=2, dtype=np.int16) // 3
+        return frame.astype(np.int16)
+
+    def _block_peak(self, diff: np.ndarray) -> float:
+        """Mayor diferencia media entre bloques (un dígito que cambia destaca)"""
+        b = self.block
+        rows, cols = diff.shape[0] // b, diff.shape[1] // b
+        if rows == 0 or cols == 0:
+            return float(diff.mean())
+        blocks = diff[:rows * b, :cols * b].reshape(rows, b, cols, b)
+        return float(blocks.mean(axis=(1, 3)).max())
+
+    def _best_shift(self, a: np.ndarray, b: np.ndarray) -> int:
+        """Desplazamiento 1D que mejor alinea dos perfiles de intensidad"""
+        n = min(len(a), len(b))
+        best_shift, best_err = 0, float('inf')
+        for s in range(-self.max_shift, self.max_shift + 1):
+            err = np.abs(a[max(0, s):n + min(0, s)] - b[max(0, -s):n + min(0, -s)]).mean()
+            if err < best_err:
+                best_shift, best_err = s, err
+        return best_shift
+
+    def difference(self, previous: np.ndarray, current: np.ndarray) -> float:
+        """
+        Diferencia entre dos frames grises tras alinearlos.
+
+        El desplazamiento se estima con los perfiles de filas/columnas (1D,
+        barato) y luego se compara una sola vez en 2D por bloques.
+        """
+        height = min(previous.shape[0], current.shape[0])
+        width = min(previous.shape[1], current.shape[1])
+        previous, current = previous[:height, :width], current[:height, :width]
+
+        dy = self._best_shift(previous.mean(axis=1), current.mean(axis=1))
+        dx = self._best_shift(previous.mean(axis=0), current.mean(axis=0))
+
+        a = previous[max(0, dy):height + min(0, dy), max(0, dx):width + min(0, dx)]
+        b = current[max(0, -dy):height + min(0, -dy), max(0, -dx):width + min(0, -dx)]
+        return self._block_peak(np.abs(a - b))
+
+    def is_unchanged(self, frame: np.ndarray) -> bool:
+        """
+        Comparar el frame con el anterior y actualizar contadores.
+
+        Args:
+            frame: Captura cruda (alto, ancho[, canales]) uint8
+
+        Returns:
+            True si el frame es idéntico al anterior (reutilizar resultado)
+        """
+        gray = self._gray(frame)
+
+        if self.previous is not None and self.difference(self.previous, gray) <= self.threshold:
+            self.hits += 1
+            return True
+
+        # La referencia es el último frame procesado: así una deriva lenta
+        # (fade, animación) termina superando el umbral y dispara el OCR.
+        self.previous = gray
+        self.misses += 1
+        return False
+
+    def reset(self):
+        """Olvidar el último frame (forzar OCR en la próxima captura)"""
+        self.previous = None
+
+    def get_stats(self) -> dict:
+        """Contadores de frames reutilizados vs procesados"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0
+        }
@@ -0,0 +1,19 @@
+"""
+Reconocimiento del multiplicador compartido por desktop-app y python_backend.
+
+- parsing: parser único del texto OCR
+- preprocess: máscara roja, binarizado y normalización para Tesseract
+- base: interfaz Recognizer y registro de motores por nombre
+- backends: pytesseract, Tesseract persistente y plantillas de glifos (al importarse
+  quedan registrados)
+- benchmark: autoevaluación al arrancar (motor más rápido con precisión suficiente);
+  se importa aparte: `from aviator_vision.recognition.benchmark import select_backend`
+"""
+from aviator_vision.recognition.base import (
+    BACKENDS, RecognitionResult, RecognizedWord, Recognizer, available_backends, create_backend, register_backend
+)
+from aviator_vision.recognition.parsing import (
+    TESSERACT_CONFIG, WHITELIST, clean_text, format_multiplier, parse_multiplier
+)
+from aviator_vision.recognition.preprocess import binarize, normalize_mask, red_mask
+from aviator_vision.recognition.backends import PersistentRecognizer, PytesseractRecognizer, TemplateRecognizer
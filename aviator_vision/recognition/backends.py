@@ -0,0 +1,136 @@
+"""
+Motores incluidos: pytesseract (un proceso por lectura), Tesseract persistente
+en proceso (tesserocr / libtesseract) y plantillas de glifos.
+"""
+import os
+import re
+import shutil
+from typing import Optional, Tuple
+
+import numpy as np
+
+from aviator_vision.recognition.base import RecognizedWord, Recognizer, RecognitionResult, register_backend
+from aviator_vision.recognition.glyph_matcher import GlyphMatcher
+from aviator_vision.recognition.parsing import TESSERACT_CONFIG, WHITELIST
+from aviator_vision.recognition.preprocess import normalize_mask
+from aviator_vision.recognition.tesseract_engine import PersistentTesseract
+
+try:
+    import pytesseract
+except ImportError:
+    pytesseract = None
+
+
+class _TesseractRecognizer(Recognizer):
+    """Base de los motores Tesseract: normalizan la máscara antes de leer"""
+
+    def __init__(self, tesseract_cmd: Optional[str] = None, text_height: int = 20, pad: int = 8, **options):
+        """
+        Args:
+            tesseract_cmd: Ruta al ejecutable de Tesseract
+            text_height: Altura (px) a la que se escala el texto (0 = sin escalar)
+            pad: Margen blanco (px)
+        """
+        super().__init__(**options)
+        self.tesseract_cmd = tesseract_cmd
+        self.text_height = text_height
+        self.pad = pad
+
+    def prepare(self, mask: np.ndarray) -> np.ndarray:
+        return normalize_mask(mask, self.text_height, self.pad)
+
+
+@register_backend
+class PytesseractRecognizer(_TesseractRecognizer):
+    """tesseract.exe vía pytesseract (lanza un proceso por lectura)"""
+
+    name = "pytesseract"
+
+    def load(self) -> bool:
+        if pytesseract is None:
+            return False
+        if self.tesseract_cmd and os.path.exists(self.tesseract_cmd):
+            pytesseract.pytesseract.tesseract_cmd = self.tesseract_cmd
+        cmd = pytesseract.pytesseract.tesseract_cmd
+        return bool(cmd and (os.path.exists(cmd) or shutil.which(cmd)))
+
+    def recognize_text(self, mask: np.ndarray) -> Tuple[str, Optional[float]]:
+        text, confidence, _ = self.recognize_words(mask)
+        return text, confidence
+
+    def recognize_words(self, mask: np.ndarray) -> Tuple[str, Optional[float], Tuple[RecognizedWord, ...]]:
+        # Texto, confianza y caja por palabra en una sola llamada
+        data = pytesseract.image_to_data(self.prepare(mask), config=TESSERACT_CONFIG,
+                                         output_type=pytesseract.Output.DICT)
+        words = []
+        for i, word in enumerate(data.get('text', [])):
+            word = str(word).strip()
+            try:
+                conf = float(data['conf'][i])
+            except (IndexError, TypeError, ValueError):
+                continue
+            if word and conf >= 0:
+                box = (int(data['left'][i]), int(data['top'][i]), int(data['width'][i]), int(data['height'][i]))
+                words.append(RecognizedWord(word, conf / 100.0, box))
+        confidence = sum(w.confidence for w in words) / len(words) if words else None
+        return "".join(w.text for w in words), confidence, tuple(words)
+
+
+@register_backend
+class PersistentRecognizer(_TesseractRecognizer):
+    """libtesseract cargada una vez en el proceso (tesserocr o ctypes)"""
+
+    name = "persistent"
+
+    def __init__(self, **options):
+        super().__init__(**options)
+        self.engine = PersistentTesseract(self.tesseract_cmd, whitelist=WHITELIST)
+
+    def load(self) -> bool:
+        # Solo se calienta la primera vez (el watchdog del servidor lo llama cada tick)
+        return self.engine.loaded or self.engine.warmup()
+
+    def recognize_text(self, mask: np.ndarray) -> Tuple[str, Optional[float]]:
+        text, confidence = self.engine.recognize(self.prepare(mask))
+        return text, confidence / 100.0 if confidence >= 0 else None
+
+    def close(self):
+        self.engine.close()
+
+
+@register_backend
+class TemplateRecognizer(Recognizer):
+    """Plantillas de glifos aprendidas (sub-milisegundo, necesita un atlas listo)"""
+
+    name = "template"
+
+    # Solo se aprende de lecturas completas (ej: "2.45x")
+    LEARNABLE_RE = re.compile(r'\d+\.\d{2}x?')
+
+    def __init__(self, atlas_path: Optional[str] = None, **options):
+        """
+        Args:
+            atlas_path: Atlas .npz aprendido (ver learn)
+        """
+        super().__init__(**options)
+        self.matcher = GlyphMatcher(atlas_path)
+
+    @property
+    def ready(self) -> bool:
+        return self.matcher.ready
+
+    def recognize_text(self, mask: np.ndarray) -> Tuple[str, Optional[float]]:
+        read = self.matcher.recognize(mask)
+        if read is None:
+            return "", None
+        return read.text, read.confidence
+
+    def learn(self, mask: np.ndarray, result: RecognitionResult) -> bool:
+        """Añadir al atlas una lectura confiable de otro motor"""
+        label = result.text.replace(',', '.')
+        if not self.LEARNABLE_RE.fullmatch(label):
+            return False
+        return self.matcher.learn(mask, label)
+
+    def close(self):
+        self.matcher.save()
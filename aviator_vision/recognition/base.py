@@ -0,0 +1,85 @@
+"""
+Interfaz común de los motores de reconocimiento y registro por nombre.
+"""
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from aviator_vision.recognition.parsing import clean_text, parse_multiplier
+
+
+class RecognizedWord(NamedTuple):
+    """Palabra reconocida con su caja"""
+    text: str
+    confidence: float                # 0-1
+    box: Tuple[int, int, int, int]  # (x, y, ancho, alto) en la imagen que leyó el motor
+
+
+class RecognitionResult(NamedTuple):
+    """Lectura de un motor"""
+    multiplier: Optional[float]   # None si el texto no es un multiplicador válido
+    text: str                     # Texto limpio (clean_text)
+    confidence: Optional[float]   # 0-1 (None si el motor no la da)
+    backend: str
+    words: Tuple[RecognizedWord, ...] = ()  # Palabras con caja (solo motores que las dan)
+
+
+class Recognizer:
+    """
+    Motor de reconocimiento. La entrada es siempre una máscara booleana del
+    texto (True = texto), idealmente ya recortada a su caja.
+    """
+
+    name = "base"
+
+    def __init__(self, max_value: Optional[float] = None, **options):
+        """
+        Args:
+            max_value: Multiplicador máximo aceptado por el parser
+            options: Opciones propias del motor (se ignoran las desconocidas,
+                     así todos los motores se crean con la misma sección de config)
+        """
+        self.max_value = max_value
+
+    def load(self) -> bool:
+        """Cargar el motor. False si no está disponible en esta máquina"""
+        return True
+
+    def recognize_text(self, mask: np.ndarray) -> Tuple[str, Optional[float]]:
+        """Texto crudo y confianza (0-1 o None)"""
+        raise NotImplementedError
+
+    def recognize_words(self, mask: np.ndarray) -> Tuple[str, Optional[float], Tuple[RecognizedWord, ...]]:
+        """Texto crudo, confianza y palabras con caja (por defecto sin palabras)"""
+        text, confidence = self.recognize_text(mask)
+        return text, confidence, ()
+
+    def read(self, mask: np.ndarray) -> RecognitionResult:
+        """Reconocer y parsear una máscara"""
+        text, confidence, words = self.recognize_words(mask)
+        return RecognitionResult(parse_multiplier(text, self.max_value), clean_text(text), confidence, self.name,
+                                 words)
+
+    def close(self):
+        pass
+
+
+# Registro nombre -> clase
+BACKENDS: Dict[str, Callable[..., Recognizer]] = {}
+
+
+def register_backend(cls):
+    """Decorador: registrar un motor con su atributo `name`"""
+    BACKENDS[cls.name] = cls
+    return cls
+
+
+def create_backend(name: str, **options) -> Recognizer:
+    """Instanciar un motor registrado (KeyError si no existe)"""
+    if name not in BACKENDS:
+        raise KeyError(f"Motor OCR desconocido: {name} (disponibles: {', '.join(sorted(BACKENDS))})")
+    return BACKENDS[name](**options)
+
+
+def available_backends() -> List[str]:
+    return sorted(BACKENDS)
@@ -0,0 +1,129 @@
+"""
+Autoevaluación de los motores al arrancar.
+Pasa un conjunto pequeño de muestras incluidas (multiplicadores sintéticos en
+rojo, recortados con el mismo camino máscara + ROI del servidor) por cada motor
+candidato y elige el más rápido que alcanza la precisión mínima.
+
+Uso:
+    python -m aviator_vision.recognition.benchmark --backend persistent pytesseract --min-accuracy 0.9
+"""
+import argparse
+import time
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from aviator_vision.capture import CHANNELS_RGB
+from aviator_vision.recognition.base import Recognizer, available_backends, create_backend
+from aviator_vision.recognition.preprocess import red_mask
+
+
+# Muestras incluidas: dígitos 0-9, valores cortos y largos
+BUILTIN_LABELS = [
+    "1.00x", "1.37x", "2.45x", "3.08x", "4.19x", "5.90x", "6.62x", "7.77x",
+    "10.26x", "13.07x", "24.61x", "88.40x", "126.50x", "349.12x", "1000.00x"
+]
+
+# Motores candidatos por defecto (las plantillas necesitan un atlas aprendido del juego)
+DEFAULT_CANDIDATES = ["persistent", "pytesseract"]
+
+
+class BenchmarkResult(NamedTuple):
+    """Resultado de un motor en la autoevaluación"""
+    backend: str
+    available: bool
+    accuracy: float        # Lecturas exactas / muestras
+    avg_ms: float          # Latencia media por lectura
+    error: Optional[str]
+
+
+def builtin_samples(size: Tuple[int, int] = (276, 67), seed: int = 7) -> List[Tuple[np.ndarray, float]]:
+    """Máscaras recortadas de las muestras incluidas y su valor"""
+    from aviator_vision.roi import RoiCropper
+    from aviator_vision.synthetic import find_font, render
+
+    rng = np.random.default_rng(seed)
+    font = find_font()
+    cropper = RoiCropper()
+    samples = []
+    for label in BUILTIN_LABELS:
+        sample = render(label, size, "crashed", rng, font, noise=4.0, distractors=False)
+        mask = red_mask(sample.frame, channels=CHANNELS_RGB)
+        crop = cropper.crop(mask)
+        samples.append((crop if crop is not None else mask, float(label[:-1])))
+    return samples
+
+
+def benchmark(recognizer: Recognizer, samples: Sequence[Tuple[np.ndarray, float]]) -> BenchmarkResult:
+    """Medir precisión y latencia de un motor ya cargado"""
+    recognizer.read(samples[0][0])  # Primera lectura fuera de la medición (caches)
+    hits = 0
+    start = time.perf_counter()
+    for mask, value in samples:
+        result = recognizer.read(mask)
+        hits += result.multiplier is not None and abs(result.multiplier - value) < 0.005
+    elapsed = time.perf_counter() - start
+    return BenchmarkResult(recognizer.name, True, hits / len(samples), elapsed * 1000 / len(samples), None)
+
+
+def select_backend(candidates: Sequence[str] = DEFAULT_CANDIDATES, min_accuracy: float = 0.9,
+                   samples: Optional[Sequence[Tuple[np.ndarray, float]]] = None,
+                   **options) -> Tuple[Optional[Recognizer], List[BenchmarkResult]]:
+    """
+    Elegir el motor más rápido que alcanza `min_accuracy`.
+
+    Args:
+        candidates: Nombres de motores registrados a probar
+        min_accuracy: Precisión mínima sobre las muestras (0-1)
+        samples: Muestras (máscara, valor); por defecto builtin_samples()
+        options: Opciones para create_backend (tesseract_cmd, text_height, ...)
+
+    Returns:
+        (motor elegido ya cargado o None, resultados de todos los candidatos).
+        Si ninguno alcanza la precisión se elige el más preciso.
+    """
+    samples = list(samples) if samples is not None else builtin_samples()
+    loaded, results = {}, []
+    for name in candidates:
+        try:
+            recognizer = create_backend(name, **options)
+            if not recognizer.load():
+                results.append(BenchmarkResult(name, False, 0.0, 0.0, "no disponible"))
+                continue
+            results.append(benchmark(recognizer, samples))
+            loaded[name] = recognizer
+        except Exception as e:
+            results.append(BenchmarkResult(name, False, 0.0, 0.0, str(e)))
+
+    usable = [r for r in results if r.available]
+    if not usable:
+        return None, results
+    passing = [r for r in usable if r.accuracy >= min_accuracy]
+    best = min(passing, key=lambda r: r.avg_ms) if passing else max(usable, key=lambda r: (r.accuracy, -r.avg_ms))
+
+    for name, recognizer in loaded.items():
+        if name != best.backend:
+            recognizer.close()
+    return loaded[best.backend], results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Autoevaluación de motores OCR con las muestras incluidas")
+    parser.add_argument('--backend', nargs='+', choices=available_backends(), default=DEFAULT_CANDIDATES)
+    parser.add_argument('--min-accuracy', type=float, default=0.9)
+    parser.add_argument('--tesseract', help="Ruta a tesseract.exe")
+    parser.add_argument('--atlas', help="Atlas de glifos (motor 'template')")
+    args = parser.parse_args()
+
+    recognizer, results = select_backend(args.backend, args.min_accuracy,
+                                         tesseract_cmd=args.tesseract, atlas_path=args.atlas)
+    for r in results:
+        if r.available:
+            print(f"{r.backend:<12} precisión {r.accuracy:6.1%}   {r.avg_ms:8.2f} ms/lectura")
+        else:
+            print(f"{r.backend:<12} no disponible ({r.error})")
+    print(f"✅ Elegido: {recognizer.name}" if recognizer else "❌ Ningún motor disponible")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,239 @@
+"""
+Reconocedor de dígitos por plantillas de glifos.
+El multiplicador siempre se dibuja con la misma fuente y color dentro de la
+región calibrada, así que basta con segmentar la máscara binaria en glifos y
+compararlos (correlación vectorizada con NumPy) contra un atlas aprendido de
+plantillas `0-9 . x`. Tesseract queda como respaldo cuando la confianza es baja.
+"""
+import os
+import threading
+from typing import List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+
+GLYPH_CHARS = "0123456789.x"
+GLYPH_H = 24
+GLYPH_W = 16
+
+# Caracteres que deben estar aprendidos antes de confiar en el matcher
+REQUIRED_CHARS = "0123456789."
+
+
+class GlyphRead(NamedTuple):
+    """Resultado de una lectura por plantillas"""
+    text: str
+    confidence: float            # Mínima confianza entre glifos (0-1)
+    glyph_confidences: List[float]
+
+
+class GlyphMatcher:
+    """Matcher de glifos con atlas aprendido a partir de lecturas de Tesseract"""
+
+    def __init__(self, atlas_path: Optional[str] = None, min_samples: int = 3,
+                 max_samples: int = 200, min_pixels: int = 3):
+        """
+        Args:
+            atlas_path: Archivo .npz donde persistir el atlas (opcional)
+            min_samples: Muestras mínimas por carácter para considerarlo aprendido
+            max_samples: A partir de aquí el promedio pasa a ser móvil
+            min_pixels: Componentes con menos píxeles se consideran ruido
+        """
+        self.atlas_path = atlas_path
+        self.min_samples = min_samples
+        self.max_samples = max_samples
+        self.min_pixels = min_pixels
+
+        self.sums = np.zeros((len(GLYPH_CHARS), GLYPH_H * GLYPH_W), dtype=np.float32)
+        self.counts = np.zeros(len(GLYPH_CHARS), dtype=np.int32)
+        # (plantillas (k, D) normalizadas o None, sus k caracteres, listo): se reemplaza
+        # entero en una asignación, así un lector sin lock nunca mezcla dos versiones
+        self._atlas: Tuple[Optional[np.ndarray], str, bool] = (None, "", False)
+        self.learned_since_save = 0
+        self.lock = threading.Lock()
+
+        if atlas_path:
+            self.load()
+
+    # ------------------------------------------------------------------
+    # Segmentación
+    # ------------------------------------------------------------------
+
+    def segment(self, mask: np.ndarray) -> Tuple[List[Tuple[int, int]], Optional[Tuple[int, int]]]:
+        """
+        Segmentar la máscara en glifos (columnas conectadas separadas por huecos).
+
+        Args:
+            mask: Máscara booleana (alto, ancho)
+
+        Returns:
+            (lista de rangos de columnas [x0, x1), banda de texto (y0, y1) o None)
+        """
+        cols = mask.any(axis=0)
+        edges = np.diff(np.concatenate(([0], cols.view(np.int8), [0])))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        if len(starts) == 0:
+            return [], None
+
+        # Píxeles por run vía suma acumulada de columnas
+        cumulative = np.concatenate(([0], np.cumsum(mask.sum(axis=0))))
+        col_counts = cumulative[ends] - cumulative[starts]
+        runs = [(int(s), int(e)) for s, e, n in zip(starts, ends, col_counts) if n >= self.min_pixels]
+        if not runs:
+            return [], None
+
+        active_cols = np.zeros(mask.shape[1], dtype=bool)
+        for s, e in runs:
+            active_cols[s:e] = True
+        rows = np.flatnonzero(mask[:, active_cols].any(axis=1))
+        return runs, (int(rows[0]), int(rows[-1]) + 1)
+
+    def _glyph_vectors(self, mask: np.ndarray) -> Optional[np.ndarray]:
+        """Normalizar cada glifo a GLYPH_H x GLYPH_W conservando su proporción"""
+        runs, band = self.segment(mask)
+        if not runs:
+            return None
+
+        y0, y1 = band
+        band_h = y1 - y0
+        scale = GLYPH_H / band_h
+        row_idx = np.minimum((np.arange(GLYPH_H) / scale).astype(np.int32), band_h - 1) + y0
+
+        vectors = np.zeros((len(runs), GLYPH_H, GLYPH_W), dtype=np.float32)
+        for i, (x0, x1) in enumerate(runs):
+            w = x1 - x0
+            target_w = int(min(GLYPH_W, max(1, round(w * scale))))
+            col_idx = np.minimum((np.arange(target_w) * w / target_w).astype(np.int32), w - 1) + x0
+            offset = (GLYPH_W - target_w) // 2
+            vectors[i, :, offset:offset + target_w] = mask[np.ix_(row_idx, col_idx)]
+
+        return vectors.reshape(len(runs), -1)
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        """Centrar y normalizar filas (correlación de Pearson vía producto punto)"""
+        centered = vectors - vectors.mean(axis=1, keepdims=True)
+        norms = np.linalg.norm(centered, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return centered / norms
+
+    # ------------------------------------------------------------------
+    # Reconocimiento
+    # ------------------------------------------------------------------
+
+    @property
+    def ready(self) -> bool:
+        """True si todos los caracteres requeridos tienen plantilla"""
+        return self._atlas[2]
+
+    def recognize(self, mask: np.ndarray) -> Optional[GlyphRead]:
+        """
+        Leer el multiplicador de una máscara binaria.
+
+        Args:
+            mask: Máscara booleana de la región (True = píxel del texto)
+
+        Returns:
+            GlyphRead o None si el atlas no está listo o no hay glifos
+        """
+        templates, chars, ready = self._atlas  # Una sola lectura por llamada
+        if templates is None or not ready:
+            return None
+
+        vectors = self._glyph_vectors(mask)
+        if vectors is None:
+            return None
+
+        scores = self._normalize(vectors) @ templates.T
+        best = scores.argmax(axis=1)
+        confidences = np.clip(scores[np.arange(len(best)), best], 0.0, 1.0)
+
+        text = "".join(chars[i] for i in best)
+        return GlyphRead(text, float(confidences.min()), [float(c) for c in confidences])
+
+    # ------------------------------------------------------------------
+    # Aprendizaje del atlas
+    # ------------------------------------------------------------------
+
+    def learn(self, mask: np.ndarray, label: str) -> bool:
+        """
+        Añadir muestras al atlas a partir de una lectura confiable.
+
+        Args:
+            mask: Máscara booleana usada en la lectura
+            label: Texto correcto (solo caracteres de GLYPH_CHARS, ej: "2.45x")
+
+        Returns:
+            True si la segmentación coincidió con el texto y se aprendió
+        """
+        label = label.lower()
+        if not label or any(c not in GLYPH_CHARS for c in label):
+            return False
+
+        vectors = self._glyph_vectors(mask)
+        if vectors is None or len(vectors) != len(label):
+            return False
+
+        with self.lock:
+            for vec, char in zip(vectors, label):
+                idx = GLYPH_CHARS.index(char)
+                if self.counts[idx] >= self.max_samples:
+                    # Promedio móvil: el atlas se adapta a cambios de escala/tema
+                    self.sums[idx] *= (self.max_samples - 1) / self.counts[idx]
+                    self.counts[idx] = self.max_samples - 1
+                self.sums[idx] += vec
+                self.counts[idx] += 1
+            self._rebuild_templates()
+            self.learned_since_save += 1
+
+        if self.atlas_path and self.learned_since_save >= 20:
+            self.save()
+        return True
+
+    def _rebuild_templates(self):
+        learned = np.flatnonzero(self.counts > 0)
+        if len(learned) == 0:
+            self._atlas = (None, "", False)
+            return
+        means = self.sums[learned] / self.counts[learned, None]
+        ready = all(self.counts[GLYPH_CHARS.index(c)] >= self.min_samples for c in REQUIRED_CHARS)
+        self._atlas = (self._normalize(means), "".join(GLYPH_CHARS[i] for i in learned), ready)
+
+    def load(self) -> bool:
+        """Cargar atlas desde disco"""
+        try:
+            if self.atlas_path and os.path.exists(self.atlas_path):
+                data = np.load(self.atlas_path)
+                if data['sums'].shape == self.sums.shape:
+                    with self.lock:
+                        self.sums = data['sums'].astype(np.float32)
+                        self.counts = data['counts'].astype(np.int32)
+                        self._rebuild_templates()
+                    return True
+        except Exception as e:
+            print(f"⚠️ Error cargando atlas de glifos: {e}")
+        return False
+
+    def save(self) -> bool:
+        """Guardar atlas a disco"""
+        if not self.atlas_path:
+            return False
+        try:
+            with self.lock:
+                sums, counts = self.sums.copy(), self.counts.copy()
+                self.learned_since_save = 0
+            tmp_path = self.atlas_path + ".tmp.npz"
+            np.savez_compressed(tmp_path, sums=sums, counts=counts)
+            os.replace(tmp_path, self.atlas_path)
+            return True
+        except Exception as e:
+            print(f"❌ Error guardando atlas de glifos: {e}")
+            return False
+
+    def get_stats(self) -> dict:
+        """Muestras aprendidas por carácter"""
+        return {
+            "ready": self.ready,
+            "samples": {c: int(n) for c, n in zip(GLYPH_CHARS, self.counts)}
+        }
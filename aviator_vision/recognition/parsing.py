@@ -0,0 +1,50 @@
+"""
+Parser único del texto OCR a multiplicador (compartido por todos los motores).
+"""
+import re
+from typing import Optional
+
+
+# Caracteres que pueden aparecer en el multiplicador
+WHITELIST = "0123456789.,xX"
+
+# Línea única con la lista blanca (pytesseract / tesseract.exe)
+TESSERACT_CONFIG = f"--oem 3 --psm 7 -c tessedit_char_whitelist={WHITELIST}"
+
+MULTIPLIER_RE = re.compile(r'(\d+(?:[.,]\d+)?)[xX]?')
+
+# El crash nunca baja de 1.00x: un valor menor es una lectura incompleta (ej: ".45x")
+MIN_MULTIPLIER = 1.0
+
+
+def clean_text(text: str) -> str:
+    """Quitar espacios y corregir confusiones típicas de Tesseract (l/i -> 1, o -> 0)"""
+    return text.strip().lower().replace(' ', '').replace('l', '1').replace('i', '1').replace('o', '0')
+
+
+def parse_multiplier(text: str, max_value: Optional[float] = None) -> Optional[float]:
+    """
+    Parsear texto OCR a valor de multiplicador.
+
+    Args:
+        text: Texto reconocido (ej: "2,45x", " l.00x ")
+        max_value: Valor máximo aceptado (None = sin límite)
+
+    Returns:
+        Multiplicador (float) o None si no hay un valor válido
+    """
+    match = MULTIPLIER_RE.search(clean_text(text))
+    if not match:
+        return None
+    try:
+        value = float(match.group(1).replace(',', '.'))
+    except ValueError:
+        return None
+    if value < MIN_MULTIPLIER or (max_value is not None and value > max_value):
+        return None
+    return value
+
+
+def format_multiplier(value: float) -> str:
+    """Formato canónico 'N.NNx'"""
+    return f"{value:.2f}x"
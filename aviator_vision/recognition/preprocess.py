@@ -0,0 +1,78 @@
+"""
+Preprocesamiento compartido por los motores de reconocimiento.
+La entrada común de todos los motores es una máscara booleana del texto
+(True = píxel del texto); los motores Tesseract la convierten aquí a una
+imagen de altura fija con texto negro sobre blanco.
+"""
+import numpy as np
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+
+# Rojo del resultado del crash: R > RED_MIN, G y B < RED_MAX_OTHERS. Único criterio
+# para el OCR, el detector de fase, el planificador y los benchmarks.
+RED_MIN = 200
+RED_MAX_OTHERS = 120
+
+
+def red_mask(frame: np.ndarray, *, channels, min_red: int = RED_MIN,
+             max_others: int = RED_MAX_OTHERS) -> np.ndarray:
+    """
+    Máscara del texto rojo del resultado del crash.
+
+    Args:
+        frame: Frame (alto, ancho, 3|4) uint8
+        channels: Índices (R, G, B) del frame (CHANNELS_RGB o CHANNELS_BGRA
+                  de aviator_vision.capture); obligatorio, sin orden por defecto
+    """
+    r_idx, g_idx, b_idx = channels
+    return (frame[:, :, r_idx] > min_red) & (frame[:, :, g_idx] < max_others) & (frame[:, :, b_idx] < max_others)
+
+
+def count_red_pixels(frame: np.ndarray, *, channels) -> int:
+    """Cantidad de píxeles de red_mask()"""
+    return int(np.count_nonzero(red_mask(frame, channels=channels)))
+
+
+def binarize(image: np.ndarray, level: int = 128) -> np.ndarray:
+    """
+    Máscara del texto de una imagen ya umbralizada (salida de PreprocessPipeline).
+    El texto es la minoría de píxeles, sea claro sobre oscuro u oscuro sobre claro.
+    """
+    mask = image < level
+    if np.count_nonzero(mask) * 2 > mask.size:
+        mask = ~mask
+    return mask
+
+
+def normalize_mask(mask: np.ndarray, text_height: int = 20, pad: int = 8) -> np.ndarray:
+    """
+    Preparar una máscara para Tesseract: altura fija con interpolación
+    (bordes suavizados), texto negro sobre fondo blanco y margen.
+
+    Args:
+        mask: Máscara booleana ajustada al texto (ver RoiCropper.crop)
+        text_height: Altura (px) del texto (0 = sin escalar)
+        pad: Margen blanco (px)
+
+    Returns:
+        Imagen uint8 (text_height + 2*pad, ancho proporcional + 2*pad)
+    """
+    img = np.where(mask, 0, 255).astype(np.uint8)
+    height, width = img.shape
+    if text_height and height != text_height:
+        factor = text_height / height
+        new_w = max(1, int(round(width * factor)))
+        if cv2 is not None:
+            interpolation = cv2.INTER_AREA if factor < 1 else cv2.INTER_LINEAR
+            img = cv2.resize(img, (new_w, text_height), interpolation=interpolation)
+        else:
+            rows = np.minimum((np.arange(text_height) / factor).astype(np.int32), height - 1)
+            cols = np.minimum((np.arange(new_w) / factor).astype(np.int32), width - 1)
+            img = img[rows[:, None], cols]
+    if pad:
+        img = np.pad(img, pad, mode='constant', constant_values=255)
+    return img
@@ -0,0 +1,227 @@
+"""
+Motor Tesseract persistente.
+Mantiene una única instancia de libtesseract cargada durante toda la vida del
+proceso, en lugar de lanzar un proceso `tesseract.exe` (y recargar el
+traineddata) en cada tick como hace pytesseract.
+"""
+import ctypes
+import ctypes.util
+import glob
+import os
+import threading
+from typing import Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+
+# Modos de Tesseract usados por el tracker
+PSM_SINGLE_LINE = 7
+OEM_DEFAULT = 3
+
+
+class _TessCAPI:
+    """Binding mínimo (ctypes) a la API C de libtesseract."""
+
+    def __init__(self, lib_path: str):
+        lib = ctypes.CDLL(lib_path)
+
+        lib.TessBaseAPICreate.restype = ctypes.c_void_p
+        lib.TessBaseAPIInit2.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_char_p, ctypes.c_int]
+        lib.TessBaseAPIInit2.restype = ctypes.c_int
+        lib.TessBaseAPISetPageSegMode.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        lib.TessBaseAPISetVariable.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_char_p]
+        lib.TessBaseAPISetVariable.restype = ctypes.c_int
+        lib.TessBaseAPISetSourceResolution.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        lib.TessBaseAPISetImage.argtypes = [
+            ctypes.c_void_p, ctypes.c_void_p,
+            ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int
+        ]
+        lib.TessBaseAPIGetUTF8Text.argtypes = [ctypes.c_void_p]
+        lib.TessBaseAPIGetUTF8Text.restype = ctypes.c_void_p
+        lib.TessBaseAPIMeanTextConf.argtypes = [ctypes.c_void_p]
+        lib.TessBaseAPIMeanTextConf.restype = ctypes.c_int
+        lib.TessDeleteText.argtypes = [ctypes.c_void_p]
+        lib.TessBaseAPIClear.argtypes = [ctypes.c_void_p]
+        lib.TessBaseAPIEnd.argtypes = [ctypes.c_void_p]
+        lib.TessBaseAPIDelete.argtypes = [ctypes.c_void_p]
+
+        self.lib = lib
+        self.handle = None
+
+    def init(self, tessdata: Optional[str], lang: str, psm: int, variables: dict) -> bool:
+        self.handle = self.lib.TessBaseAPICreate()
+        datapath = tessdata.encode('utf-8') if tessdata else None
+        if self.lib.TessBaseAPIInit2(self.handle, datapath, lang.encode('utf-8'), OEM_DEFAULT) != 0:
+            self.close()
+            return False
+        self.lib.TessBaseAPISetPageSegMode(self.handle, psm)
+        for name, value in variables.items():
+            self.lib.TessBaseAPISetVariable(self.handle, name.encode('utf-8'), str(value).encode('utf-8'))
+        return True
+
+    def recognize(self, gray: np.ndarray) -> Tuple[str, float]:
+        gray = np.ascontiguousarray(gray, dtype=np.uint8)
+        height, width = gray.shape
+        self.lib.TessBaseAPISetImage(self.handle, gray.ctypes.data, width, height, 1, gray.strides[0])
+        # Evita el warning "Invalid resolution 0 dpi" en cada frame
+        self.lib.TessBaseAPISetSourceResolution(self.handle, 70)
+
+        text_ptr = self.lib.TessBaseAPIGetUTF8Text(self.handle)
+        text = ctypes.string_at(text_ptr).decode('utf-8', errors='ignore') if text_ptr else ""
+        if text_ptr:
+            self.lib.TessDeleteText(text_ptr)
+        confidence = float(self.lib.TessBaseAPIMeanTextConf(self.handle))
+        self.lib.TessBaseAPIClear(self.handle)
+        return text, confidence
+
+    def close(self):
+        if self.handle:
+            self.lib.TessBaseAPIEnd(self.handle)
+            self.lib.TessBaseAPIDelete(self.handle)
+            self.handle = None
+
+
+class PersistentTesseract:
+    """
+    Instancia única de Tesseract cargada en proceso.
+
+    Usa `tesserocr` si está instalado; si no, se enlaza por ctypes a la
+    libtesseract que acompaña a la instalación de Tesseract (por ejemplo
+    `libtesseract-5.dll` junto a `tesseract.exe` en Windows).
+    """
+
+    def __init__(self, tesseract_cmd: Optional[str] = None, lang: str = "eng",
+                 psm: int = PSM_SINGLE_LINE, whitelist: str = "0123456789.,xX"):
+        """
+        Args:
+            tesseract_cmd: Ruta al ejecutable de Tesseract (para ubicar la librería y tessdata)
+            lang: Idioma del traineddata
+            psm: Page segmentation mode
+            whitelist: Caracteres permitidos
+        """
+        self.tesseract_cmd = tesseract_cmd
+        self.lang = lang
+        self.psm = psm
+        self.variables = {"tessedit_char_whitelist": whitelist}
+        self.backend = None   # 'tesserocr' | 'capi' | None
+        self._api = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._api is not None
+
+    def _tessdata_dir(self) -> Optional[str]:
+        """Ubicar la carpeta tessdata (TESSDATA_PREFIX o junto al ejecutable)"""
+        prefix = os.environ.get('TESSDATA_PREFIX')
+        if prefix and os.path.isdir(prefix):
+            return prefix
+        if self.tesseract_cmd:
+            candidate = os.path.join(os.path.dirname(self.tesseract_cmd), 'tessdata')
+            if os.path.isdir(candidate):
+                return candidate
+        return None
+
+    def _find_library(self) -> Optional[str]:
+        """Buscar libtesseract junto al ejecutable o en las rutas del sistema"""
+        if self.tesseract_cmd:
+            base_dir = os.path.dirname(self.tesseract_cmd)
+            for pattern in ('libtesseract*.dll', 'tesseract*.dll', 'libtesseract*.so*', 'libtesseract*.dylib'):
+                matches = sorted(glob.glob(os.path.join(base_dir, pattern)))
+                if matches:
+                    return matches[-1]
+        return ctypes.util.find_library('tesseract') or ctypes.util.find_library('libtesseract-5')
+
+    def load(self) -> bool:
+        """
+        Cargar el motor (una sola vez).
+
+        Returns:
+            True si hay un motor persistente disponible
+        """
+        with self._lock:
+            if self._api is not None:
+                return True
+
+            tessdata = self._tessdata_dir()
+
+            if tesserocr is not None:
+                try:
+                    api = tesserocr.PyTessBaseAPI(
+                        path=tessdata or tesserocr.get_languages()[0],
+                        lang=self.lang,
+                        psm=self.psm
+                    )
+                    for name, value in self.variables.items():
+                        api.SetVariable(name, value)
+                    self._api = api
+                    self.backend = 'tesserocr'
+                    return True
+                except Exception as e:
+                    print(f"⚠️ tesserocr no pudo inicializarse: {e}")
+
+            lib_path = self._find_library()
+            if lib_path:
+                try:
+                    api = _TessCAPI(lib_path)
+                    if api.init(tessdata, self.lang, self.psm, self.variables):
+                        self._api = api
+                        self.backend = 'capi'
+                        return True
+                    print(f"⚠️ libtesseract no pudo cargar '{self.lang}' (tessdata: {tessdata})")
+                except Exception as e:
+                    print(f"⚠️ Error cargando libtesseract ({lib_path}): {e}")
+
+            return False
+
+    def warmup(self) -> bool:
+        """Ejecutar un reconocimiento en vacío para cargar modelos y caches"""
+        if not self.load():
+            return False
+        self.recognize(np.zeros((32, 96), dtype=np.uint8))
+        return True
+
+    def recognize(self, img) -> Tuple[str, float]:
+        """
+        Reconocer una línea de texto.
+
+        Args:
+            img: Imagen PIL o array numpy en escala de grises (uint8)
+
+        Returns:
+            Tupla (texto, confianza media 0-100)
+        """
+        if not self.load():
+            raise RuntimeError("Motor Tesseract persistente no disponible")
+
+        with self._lock:
+            if self.backend == 'tesserocr':
+                if isinstance(img, np.ndarray):
+                    img = Image.fromarray(img)
+                self._api.SetImage(img)
+                text = self._api.GetUTF8Text()
+                confidence = float(self._api.MeanTextConf())
+                self._api.Clear()
+                return text, confidence
+
+            if isinstance(img, Image.Image):
+                img = np.asarray(img.convert('L'))
+            return self._api.recognize(img)
+
+    def close(self):
+        """Liberar la instancia de Tesseract"""
+        with self._lock:
+            if self._api is None:
+                return
+            if self.backend == 'tesserocr':
+                self._api.End()
+            else:
+                self._api.close()
+            self._api = None
+            self.backend = None
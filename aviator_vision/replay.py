@@ -0,0 +1,125 @@
+"""
+Replay de un corpus grabado a través de distintos motores OCR y perfiles de
+preprocesamiento. Mide FPS, latencia p50/p99 por frame (preprocesado + OCR) y
+el porcentaje de lecturas que coinciden con el valor grabado.
+
+Uso:
+    python -m aviator_vision.replay recordings/2026-01-03 --backend persistent pytesseract --profile roi fast
+"""
+import argparse
+import json
+import time
+from typing import Callable, List
+
+import numpy as np
+
+from aviator_vision.capture import CHANNELS_RGB
+from aviator_vision.corpus import FrameCorpus
+from aviator_vision.preprocessing import PROFILES, PreprocessPipeline
+from aviator_vision.recognition import available_backends, binarize, create_backend, format_multiplier, red_mask
+from aviator_vision.roi import RoiCropper
+
+
+# Perfil extra: máscara roja + recorte ROI (camino del servidor)
+ROI_PROFILE = "roi"
+
+
+def _preparer(profile: str) -> Callable[[np.ndarray], np.ndarray]:
+    """Función frame RGB -> máscara del texto según el perfil"""
+    if profile == ROI_PROFILE:
+        cropper = RoiCropper()
+
+        def prepare(frame: np.ndarray) -> np.ndarray:
+            mask = red_mask(frame, channels=CHANNELS_RGB)
+            crop = cropper.crop(mask)
+            return crop if crop is not None else mask
+        return prepare
+    pipeline = PreprocessPipeline(PROFILES[profile])
+    return lambda frame: binarize(pipeline.run(frame))
+
+
+# ----------------------------------------------------------------------
+# Replay
+# ----------------------------------------------------------------------
+
+def replay(corpus: FrameCorpus, backend: str, profile: str, limit: int = 0, **options) -> dict:
+    """
+    Pasar el corpus por un motor y perfil.
+
+    Args:
+        options: Opciones del motor (tesseract_cmd, atlas_path, ...)
+
+    Returns:
+        Dict con fps, p50_ms, p99_ms, agreement (sobre frames con valor grabado) y read_rate
+    """
+    # Con los perfiles de región completa el texto no se reescala (solo el ROI está recortado)
+    if profile != ROI_PROFILE:
+        options = dict(options, text_height=0, pad=0)
+    recognizer = create_backend(backend, **options)
+    if not recognizer.load():
+        raise RuntimeError("motor no disponible")
+    prepare = _preparer(profile)
+
+    latencies: List[float] = []
+    labeled = agreed = reads = 0
+    start = time.perf_counter()
+    for i, recorded in enumerate(corpus):
+        if limit and i >= limit:
+            break
+        t0 = time.perf_counter()
+        read = recognizer.read(prepare(recorded.frame))
+        value = format_multiplier(read.multiplier) if read.multiplier is not None else ""
+        latencies.append(time.perf_counter() - t0)
+        reads += bool(value)
+        if recorded.value:
+            labeled += 1
+            agreed += value == recorded.value
+    total = time.perf_counter() - start
+    recognizer.close()
+
+    frames = len(latencies)
+    return {
+        "backend": backend,
+        "profile": profile,
+        "frames": frames,
+        "fps": frames / total if total > 0 else 0.0,
+        "p50_ms": float(np.percentile(latencies, 50) * 1000) if frames else 0.0,
+        "p99_ms": float(np.percentile(latencies, 99) * 1000) if frames else 0.0,
+        "agreement": agreed / labeled if labeled else None,
+        "read_rate": reads / frames if frames else 0.0
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay de un corpus de frames por motores OCR")
+    parser.add_argument('corpus', help="Carpeta del corpus (chunks .npz)")
+    parser.add_argument('--backend', nargs='+', choices=available_backends(), default=["persistent"])
+    parser.add_argument('--profile', nargs='+', choices=sorted(PROFILES) + [ROI_PROFILE], default=[ROI_PROFILE])
+    parser.add_argument('--limit', type=int, default=0, help="Máximo de frames (0 = todos)")
+    parser.add_argument('--atlas', help="Atlas de glifos para el motor 'template'")
+    parser.add_argument('--json', help="Guardar resultados en este archivo")
+    args = parser.parse_args()
+
+    corpus = FrameCorpus(args.corpus)
+    print(f"Corpus {args.corpus}: {len(corpus)} frames en {len(corpus.chunks)} chunks")
+
+    results = []
+    for backend in args.backend:
+        for profile in args.profile:
+            try:
+                result = replay(corpus, backend, profile, args.limit, atlas_path=args.atlas)
+            except Exception as e:
+                print(f"{backend:<12} {profile:<9} no disponible ({e})")
+                continue
+            agreement = f"{result['agreement']:.1%}" if result['agreement'] is not None else "  n/a"
+            print(f"{backend:<12} {profile:<9} {result['fps']:>8.1f} fps   p50 {result['p50_ms']:>7.2f} ms   "
+                  f"p99 {result['p99_ms']:>7.2f} ms   acuerdo {agreement}   lecturas {result['read_rate']:.1%}")
+            results.append(result)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+"""
+Recorte automático de la región de interés (ROI) sobre la máscara del texto.
+Calcula la caja del bloque de texto dentro de la región calibrada, la recorta
+y la escala a una altura fija para Tesseract. La última caja se guarda para
+buscar primero en una ventana pequeña alrededor de ella.
+"""
+from typing import Optional, Tuple
+
+import numpy as np
+
+from aviator_vision.recognition.preprocess import normalize_mask
+
+
+# (y0, y1, x0, x1) en coordenadas del frame, extremos abiertos
+BBox = Tuple[int, int, int, int]
+
+
+def _runs(active: np.ndarray):
+    """Rangos [inicio, fin) de valores True consecutivos"""
+    edges = np.diff(np.concatenate(([0], active.view(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+class RoiCropper:
+    """Localiza y recorta el bloque de texto de una máscara binaria"""
+
+    def __init__(self, pad: int = 8, text_height: int = 20, min_pixels: int = 20,
+                 search_margin: int = 12):
+        """
+        Args:
+            pad: Margen blanco (px) alrededor de la imagen normalizada
+            text_height: Altura (px) a la que se escala el texto (0 = sin escalar).
+                         Con ~20 px Tesseract lee mejor que con el texto a tamaño real
+                         y que con alturas mayores
+            min_pixels: Píxeles mínimos del bloque para considerarlo texto
+            search_margin: Margen (px) de la ventana de búsqueda alrededor de la última caja
+        """
+        self.pad = pad
+        self.text_height = text_height
+        self.min_pixels = min_pixels
+        self.search_margin = search_margin
+        self.last_bbox: Optional[BBox] = None
+        self.window_hits = 0
+        self.full_scans = 0
+        self.misses = 0
+
+    def reset(self):
+        self.last_bbox = None
+
+    # ------------------------------------------------------------------
+    # Localización
+    # ------------------------------------------------------------------
+
+    def _text_bbox(self, mask: np.ndarray) -> Optional[BBox]:
+        """
+        Caja del bloque de texto principal.
+
+        Se queda con la banda de filas con más píxeles y, dentro de ella, con el
+        grupo de columnas más denso (uniendo huecos menores que la altura de la
+        banda, como los espacios entre dígitos). Así el ruido rojo suelto de una
+        calibración holgada no agranda la caja.
+        """
+        row_counts = np.count_nonzero(mask, axis=1)
+        starts, ends = _runs(row_counts > 0)
+        if len(starts) == 0:
+            return None
+        cumulative = np.concatenate(([0], np.cumsum(row_counts)))
+        best = int(np.argmax(cumulative[ends] - cumulative[starts]))
+        y0, y1 = int(starts[best]), int(ends[best])
+
+        col_counts = np.count_nonzero(mask[y0:y1], axis=0)
+        starts, ends = _runs(col_counts > 0)
+        max_gap = y1 - y0
+        groups = []
+        group_start, group_end = starts[0], ends[0]
+        for s, e in zip(starts[1:], ends[1:]):
+            if s - group_end <= max_gap:
+                group_end = e
+            else:
+                groups.append((group_start, group_end))
+                group_start, group_end = s, e
+        groups.append((group_start, group_end))
+
+        cumulative = np.concatenate(([0], np.cumsum(col_counts)))
+        x0, x1 = max(groups, key=lambda g: cumulative[g[1]] - cumulative[g[0]])
+        if cumulative[x1] - cumulative[x0] < self.min_pixels:
+            return None
+
+        # Ajustar filas a las columnas elegidas
+        rows = np.flatnonzero(mask[y0:y1, x0:x1].any(axis=1))
+        return y0 + int(rows[0]), y0 + int(rows[-1]) + 1, int(x0), int(x1)
+
+    def locate(self, mask: np.ndarray) -> Optional[BBox]:
+        """
+        Buscar el texto, primero en la ventana de la última caja.
+
+        Args:
+            mask: Máscara booleana de la región completa
+
+        Returns:
+            Caja (y0, y1, x0, x1) o None si no hay texto
+        """
+        height, width = mask.shape
+        if self.last_bbox is not None:
+            y0, y1, x0, x1 = self.last_bbox
+            band = y1 - y0
+            m = max(self.search_margin, band)
+            wy0, wy1 = max(0, y0 - m), min(height, y1 + m)
+            wx0, wx1 = max(0, x0 - m), min(width, x1 + m)
+            bbox = self._text_bbox(mask[wy0:wy1, wx0:wx1])
+            if bbox is not None:
+                by0, by1, bx0, bx1 = bbox[0] + wy0, bbox[1] + wy0, bbox[2] + wx0, bbox[3] + wx0
+                # Si el texto llega al borde de la ventana puede continuar fuera
+                # (a lo ancho, tras un hueco entre caracteres): búsqueda completa
+                gap = by1 - by0
+                touches = (by0 == wy0 > 0) or (by1 == wy1 < height) or \
+                          (bx0 - wx0 <= gap and wx0 > 0) or (wx1 - bx1 <= gap and wx1 < width)
+                if not touches:
+                    self.window_hits += 1
+                    self.last_bbox = (by0, by1, bx0, bx1)
+                    return self.last_bbox
+
+        self.full_scans += 1
+        bbox = self._text_bbox(mask)
+        if bbox is None:
+            self.misses += 1
+        else:
+            self.last_bbox = bbox
+        return bbox
+
+    # ------------------------------------------------------------------
+    # Recorte
+    # ------------------------------------------------------------------
+
+    def crop(self, mask: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Recortar la máscara a la caja del texto (vista, sin copia).
+
+        Args:
+            mask: Máscara booleana de la región completa
+
+        Returns:
+            Máscara booleana ajustada al texto o None si no hay texto
+        """
+        bbox = self.locate(mask)
+        if bbox is None:
+            return None
+        y0, y1, x0, x1 = bbox
+        return mask[y0:y1, x0:x1]
+
+    def normalize(self, crop: np.ndarray) -> np.ndarray:
+        """
+        Preparar un recorte para Tesseract: altura fija con interpolación
+        (bordes suavizados), texto negro sobre fondo blanco y margen.
+
+        Args:
+            crop: Máscara booleana ajustada al texto (resultado de crop())
+
+        Returns:
+            Imagen uint8 (text_height + 2*pad, ancho proporcional + 2*pad)
+        """
+        return normalize_mask(crop, self.text_height, self.pad)
+
+    def get_stats(self) -> dict:
+        """Caja actual y uso de la ventana de búsqueda"""
+        return {
+            "bbox": list(self.last_bbox) if self.last_bbox else None,
+            "window_hits": self.window_hits,
+            "full_scans": self.full_scans,
+            "misses": self.misses
+        }
@@ -0,0 +1,185 @@
+"""
+Detector de fase de la ronda a partir del color de la región.
+Clasifica cada frame por la cantidad de píxeles rojos (resultado del crash,
+mismo criterio que recognition.preprocess.red_mask) y blancos (multiplicador
+en vuelo, histograma de color) y mantiene una máquina de estados
+waiting -> flying -> crashed -> cooldown -> waiting, emitiendo un evento con
+marca de tiempo en cada cambio. Solo la entrada en 'crashed' necesita OCR.
+"""
+import threading
+import time
+from collections import deque
+from typing import Callable, List, NamedTuple, Optional
+
+import numpy as np
+
+from aviator_vision.recognition.preprocess import count_red_pixels
+
+
+PHASE_WAITING = "waiting"    # Sin multiplicador en pantalla (entre rondas)
+PHASE_FLYING = "flying"      # Multiplicador blanco subiendo
+PHASE_CRASHED = "crashed"    # Acaba de aparecer el resultado rojo
+PHASE_COOLDOWN = "cooldown"  # Resultado rojo ya leído, aún en pantalla
+
+PHASES = [PHASE_WAITING, PHASE_FLYING, PHASE_CRASHED, PHASE_COOLDOWN]
+
+# Histograma de 4 niveles por canal (64 bins): índice = r*16 + g*4 + b
+_LEVELS = 4
+_BIN_R, _BIN_G, _BIN_B = np.meshgrid(np.arange(_LEVELS), np.arange(_LEVELS), np.arange(_LEVELS), indexing='ij')
+_WHITE_BINS = ((_BIN_R == 3) & (_BIN_G == 3) & (_BIN_B == 3)).ravel()  # R, G y B >= 192
+
+
+class PhaseEvent(NamedTuple):
+    """Cambio de fase"""
+    phase: str
+    previous: str
+    timestamp: float         # Epoch (s)
+    previous_duration: float  # Segundos que duró la fase anterior
+
+
+def color_histogram(frame: np.ndarray, *, channels) -> np.ndarray:
+    """
+    Histograma de color 4x4x4 del frame.
+
+    Args:
+        frame: Frame (alto, ancho, 3|4) uint8
+        channels: Índices (R, G, B) del frame (CHANNELS_RGB o CHANNELS_BGRA)
+
+    Returns:
+        Array (64,) con el conteo de píxeles por bin
+    """
+    r_idx, g_idx, b_idx = channels
+    codes = (frame[:, :, r_idx] >> 6).astype(np.uint8) << 4
+    codes |= (frame[:, :, g_idx] >> 6) << 2
+    codes |= frame[:, :, b_idx] >> 6
+    return np.bincount(codes.ravel(), minlength=_LEVELS ** 3)
+
+
+class RoundPhaseDetector:
+    """Máquina de estados de la ronda alimentada por un clasificador por frame"""
+
+    def __init__(self, min_red_pixels: int = 50, min_white_pixels: int = 50,
+                 crash_hold_s: float = 1.0, history: int = 200):
+        """
+        Args:
+            min_red_pixels: Píxeles rojos para considerar el resultado en pantalla
+            min_white_pixels: Píxeles blancos para considerar que el avión vuela
+            crash_hold_s: Tiempo en 'crashed' antes de pasar a 'cooldown'
+            history: Eventos recientes que se guardan
+        """
+        self.min_red_pixels = min_red_pixels
+        self.min_white_pixels = min_white_pixels
+        self.crash_hold_s = crash_hold_s
+        self.events = deque(maxlen=history)
+        self.listeners: List[Callable[[PhaseEvent], None]] = []
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Volver a 'waiting' y limpiar estadísticas"""
+        self.phase = PHASE_WAITING
+        self.phase_since = time.time()
+        self.last_red_pixels = 0
+        self.last_white_pixels = 0
+        self.last_label = "none"
+        self.rounds = 0
+        self.last_flight_s = None
+        self.durations = {phase: [0.0, 0] for phase in PHASES}  # [total s, veces]
+        self.events.clear()
+
+    def on_change(self, listener: Callable[[PhaseEvent], None]):
+        """Registrar un callback para cada cambio de fase"""
+        self.listeners.append(listener)
+
+    def classify(self, frame: np.ndarray, *, channels) -> str:
+        """
+        Clasificar un frame por sus píxeles rojos y blancos (sin estado).
+
+        Returns:
+            'red' (resultado), 'white' (vuelo) o 'none'
+        """
+        self.last_red_pixels = count_red_pixels(frame, channels=channels)
+        self.last_white_pixels = int(color_histogram(frame, channels=channels)[_WHITE_BINS].sum())
+        if self.last_red_pixels >= self.min_red_pixels:
+            return "red"
+        if self.last_white_pixels >= self.min_white_pixels:
+            return "white"
+        return "none"
+
+    def update(self, frame: Optional[np.ndarray], *, channels=None,
+               now: Optional[float] = None) -> Optional[PhaseEvent]:
+        """
+        Procesar un frame.
+
+        Args:
+            frame: Frame de la región, o None si el detector de cambios lo
+                   descartó (se reutiliza la última clasificación)
+            channels: Índices (R, G, B) del frame; obligatorio si hay frame
+            now: Epoch (s) del frame (por defecto ahora)
+
+        Returns:
+            PhaseEvent si la fase cambió, si no None
+        """
+        if frame is not None and channels is None:
+            raise ValueError("update() con frame requiere channels")
+        now = time.time() if now is None else now
+        label = self.classify(frame, channels=channels) if frame is not None else self.last_label
+        self.last_label = label
+        phase = self.phase
+
+        if label == "red":
+            if phase in (PHASE_WAITING, PHASE_FLYING):
+                phase = PHASE_CRASHED
+            elif phase == PHASE_CRASHED and now - self.phase_since >= self.crash_hold_s:
+                phase = PHASE_COOLDOWN
+        elif label == "white":
+            phase = PHASE_FLYING
+        elif phase != PHASE_WAITING:
+            phase = PHASE_WAITING
+
+        if phase == self.phase:
+            return None
+        return self._transition(phase, now)
+
+    def _transition(self, phase: str, now: float) -> PhaseEvent:
+        with self._lock:
+            duration = now - self.phase_since
+            stats = self.durations[self.phase]
+            stats[0] += duration
+            stats[1] += 1
+            if phase == PHASE_CRASHED:
+                self.rounds += 1
+                self.last_flight_s = duration if self.phase == PHASE_FLYING else None
+            event = PhaseEvent(phase, self.phase, now, duration)
+            self.phase = phase
+            self.phase_since = now
+            self.events.append(event)
+
+        for listener in self.listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                print(f"⚠️ Error en listener de fase: {e}")
+        return event
+
+    def get_events(self, limit: int = 50) -> List[dict]:
+        """Eventos recientes (el más nuevo al final)"""
+        with self._lock:
+            events = list(self.events)[-limit:]
+        return [event._asdict() for event in events]
+
+    def get_stats(self) -> dict:
+        """Fase actual, rondas detectadas y duración media por fase"""
+        with self._lock:
+            return {
+                "phase": self.phase,
+                "phase_age_s": round(time.time() - self.phase_since, 1),
+                "rounds": self.rounds,
+                "last_flight_s": round(self.last_flight_s, 2) if self.last_flight_s is not None else None,
+                "red_pixels": self.last_red_pixels,
+                "white_pixels": self.last_white_pixels,
+                "avg_duration_s": {
+                    phase: round(total / count, 2) if count else None
+                    for phase, (total, count) in self.durations.items()
+                }
+            }
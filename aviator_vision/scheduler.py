@@ -0,0 +1,158 @@
+"""
+Planificador adaptativo de capturas.
+Infiere la fase de la ronda a partir de estadísticas baratas del frame (si
+cambió y cuántos píxeles rojos tiene) y decide cada cuánto capturar: denso
+justo cuando aparece el resultado rojo del crash, espaciado en vuelos largos y
+casi nada mientras la región está quieta.
+"""
+import time
+from collections import deque
+from typing import Dict, Optional
+
+
+# Fases inferidas
+PHASE_IDLE = "idle"                # Región sin cambios (sin partida / página congelada)
+PHASE_FLYING = "flying"            # Frames cambiando sin texto rojo
+PHASE_LONG_FLIGHT = "long_flight"  # Vuelo que ya dura más de long_flight_s
+PHASE_CRASHED = "crashed"          # Texto rojo recién aparecido (resultado de la ronda)
+PHASE_COOLDOWN = "cooldown"        # Texto rojo ya leído, esperando la siguiente ronda
+
+PHASES = [PHASE_IDLE, PHASE_FLYING, PHASE_LONG_FLIGHT, PHASE_CRASHED, PHASE_COOLDOWN]
+
+# Frecuencias por fase (Hz)
+DEFAULT_RATES_HZ: Dict[str, float] = {
+    PHASE_IDLE: 0.2,
+    PHASE_FLYING: 1.0,
+    PHASE_LONG_FLIGHT: 0.5,
+    PHASE_CRASHED: 4.0,
+    PHASE_COOLDOWN: 0.5
+}
+
+# Mínimo de píxeles rojos para considerar que hay un resultado en pantalla
+MIN_RED_PIXELS = 50
+
+
+class AdaptiveScheduler:
+    """Decide el intervalo entre capturas según la fase inferida de la ronda"""
+
+    def __init__(self, rates_hz: Optional[Dict[str, float]] = None, min_red_pixels: int = MIN_RED_PIXELS,
+                 idle_after_s: float = 10.0, long_flight_s: float = 10.0,
+                 crash_window_s: float = 2.0, window_s: float = 60.0):
+        """
+        Args:
+            rates_hz: Frecuencia por fase (las que falten usan DEFAULT_RATES_HZ)
+            min_red_pixels: Píxeles rojos a partir de los cuales hay resultado en pantalla
+            idle_after_s: Segundos sin cambios para pasar a 'idle'
+            long_flight_s: Segundos de vuelo para pasar a 'long_flight'
+            crash_window_s: Duración del muestreo denso tras aparecer el rojo
+            window_s: Ventana para calcular la frecuencia efectiva
+        """
+        self.rates_hz = dict(DEFAULT_RATES_HZ)
+        for phase, rate in (rates_hz or {}).items():
+            if phase not in self.rates_hz:
+                raise ValueError(f"Fase desconocida en rates_hz: {phase}")
+            self.rates_hz[phase] = float(rate)
+        self.min_red_pixels = min_red_pixels
+        self.idle_after_s = idle_after_s
+        self.long_flight_s = long_flight_s
+        self.crash_window_s = crash_window_s
+        self.window_s = window_s
+        self.reset()
+
+    @classmethod
+    def from_config(cls, config: Optional[dict]) -> "AdaptiveScheduler":
+        """Crear desde la sección `capture.scheduler` de config.json"""
+        config = config or {}
+        return cls(
+            rates_hz=config.get("rates_hz"),
+            min_red_pixels=int(config.get("min_red_pixels", MIN_RED_PIXELS)),
+            idle_after_s=float(config.get("idle_after_s", 10.0)),
+            long_flight_s=float(config.get("long_flight_s", 10.0)),
+            crash_window_s=float(config.get("crash_window_s", 2.0))
+        )
+
+    def reset(self):
+        """Volver al estado inicial (al iniciar la captura)"""
+        now = time.monotonic()
+        self.phase = PHASE_FLYING
+        self.phase_since = now
+        self.last_change = now
+        self.flight_started = now
+        self.crash_started = None
+        self.has_red = False
+        self.samples = deque()
+        self.phase_samples = {phase: 0 for phase in PHASES}
+        self.phase_time_s = {phase: 0.0 for phase in PHASES}
+
+    def observe(self, changed: bool, red_pixels: Optional[int] = None, now: Optional[float] = None) -> str:
+        """
+        Registrar una captura y actualizar la fase.
+
+        Args:
+            changed: False si el detector de cambios descartó el frame
+            red_pixels: Píxeles rojos del frame (None si no se calcularon)
+            now: Marca de tiempo monotónica (para pruebas)
+
+        Returns:
+            Fase actual
+        """
+        now = time.monotonic() if now is None else now
+        self.samples.append(now)
+        while self.samples and now - self.samples[0] > self.window_s:
+            self.samples.popleft()
+
+        if changed:
+            self.last_change = now
+            if red_pixels is not None:
+                self.has_red = red_pixels >= self.min_red_pixels
+
+        if self.has_red:
+            # Un frame rojo que cambia es un resultado nuevo: reabrir la ventana densa
+            if self.crash_started is None or changed:
+                self.crash_started = now
+            self.flight_started = None
+            phase = PHASE_CRASHED if now - self.crash_started < self.crash_window_s else PHASE_COOLDOWN
+        else:
+            self.crash_started = None
+            if now - self.last_change >= self.idle_after_s:
+                self.flight_started = None
+                phase = PHASE_IDLE
+            else:
+                if self.flight_started is None:
+                    self.flight_started = now
+                long_flight = now - self.flight_started >= self.long_flight_s
+                phase = PHASE_LONG_FLIGHT if long_flight else PHASE_FLYING
+
+        self._set_phase(phase, now)
+        self.phase_samples[phase] += 1
+        return phase
+
+    def _set_phase(self, phase: str, now: float):
+        if phase != self.phase:
+            self.phase_time_s[self.phase] += now - self.phase_since
+            self.phase = phase
+            self.phase_since = now
+
+    def next_interval(self) -> float:
+        """Segundos hasta la próxima captura según la fase actual"""
+        return 1.0 / max(self.rates_hz[self.phase], 0.01)
+
+    @property
+    def effective_hz(self) -> float:
+        """Capturas por segundo en la ventana reciente"""
+        if len(self.samples) < 2:
+            return 0.0
+        span = self.samples[-1] - self.samples[0]
+        return (len(self.samples) - 1) / span if span > 0 else 0.0
+
+    def get_stats(self) -> dict:
+        """Fase actual, frecuencia objetivo y efectiva, y muestras por fase"""
+        phase_time = dict(self.phase_time_s)
+        phase_time[self.phase] += time.monotonic() - self.phase_since
+        return {
+            "phase": self.phase,
+            "target_hz": self.rates_hz[self.phase],
+            "effective_hz": round(self.effective_hz, 3),
+            "phase_samples": dict(self.phase_samples),
+            "phase_time_s": {phase: round(t, 1) for phase, t in phase_time.items()}
+        }
@@ -0,0 +1,261 @@
+"""
+Generador de frames sintéticos etiquetados.
+Renderiza multiplicadores (1.00x - 1000.00x) con una fuente parecida a la del
+juego, variando escala, color (rojo del crash, blanco en vuelo), ruido de fondo,
+distractores rojos y desplazamientos subpíxel. Escribe en bloque en formato
+corpus (chunks .npz, compatible con `aviator_vision.replay`) o como PNG + CSV.
+
+Uso:
+    python -m aviator_vision.synthetic synthetic_corpus --count 100000 --workers 8
+    python -m aviator_vision.synthetic synthetic_png --count 500 --format png --states crashed
+"""
+import argparse
+import csv
+import os
+import time
+from functools import lru_cache
+from multiprocessing import Pool
+from typing import Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from aviator_vision.corpus import write_chunk
+
+
+# Colores base del texto por estado (RGB)
+STATE_COLORS = {
+    "crashed": (228, 28, 40),    # Rojo del resultado (pasa la máscara roja del servidor)
+    "flying": (245, 245, 245)    # Blanco mientras el avión vuela
+}
+
+# Fuentes candidatas (negrita sans, como la del juego), en orden de preferencia
+FONT_CANDIDATES = [
+    r"C:\Windows\Fonts\arialbd.ttf",
+    r"C:\Windows\Fonts\segoeuib.ttf",
+    "/usr/share/fonts/truetype/liberation/LiberationSans-Bold.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+    "/Library/Fonts/Arial Bold.ttf",
+    "arialbd.ttf",
+    "DejaVuSans-Bold.ttf"
+]
+
+SUPERSAMPLE = 4  # Resolución interna para los desplazamientos subpíxel
+
+
+class SyntheticSample(NamedTuple):
+    """Frame sintético y su etiqueta"""
+    frame: np.ndarray     # RGB uint8 (alto, ancho, 3)
+    label: str            # Ej: "12.34x"
+    state: str            # Clave de STATE_COLORS
+    font_px: int          # Altura de fuente usada (px del frame)
+    offset: Tuple[float, float]  # Desplazamiento (x, y) respecto al centro, en px
+
+
+def find_font(path: Optional[str] = None) -> Optional[str]:
+    """Primera fuente disponible (o la indicada)"""
+    for candidate in ([path] if path else []) + FONT_CANDIDATES:
+        try:
+            ImageFont.truetype(candidate, 12)
+            return candidate
+        except (OSError, TypeError):
+            continue
+    return None
+
+
+@lru_cache(maxsize=256)
+def _font(path: Optional[str], size: int):
+    if path is None:
+        return ImageFont.load_default(size=size)
+    return ImageFont.truetype(path, size)
+
+
+def random_multiplier(rng: np.random.Generator, max_value: float = 1000.0) -> float:
+    """Multiplicador con la distribución típica de crash (0.97/(1-u), 3% de ventaja de la casa), entre 1.00 y max_value"""
+    u = rng.random()
+    value = np.floor(97.0 / (1.0 - u)) / 100.0
+    return float(min(max(value, 1.0), max_value))
+
+
+def render(label: str, size: Tuple[int, int] = (276, 67), state: str = "crashed",
+           rng: Optional[np.random.Generator] = None, font_path: Optional[str] = None,
+           scale: Optional[float] = None, offset: Optional[Tuple[float, float]] = None,
+           noise: Optional[float] = None, distractors: bool = True) -> SyntheticSample:
+    """
+    Renderizar un multiplicador.
+
+    Args:
+        label: Texto a dibujar (ej: "2.45x")
+        size: (ancho, alto) del frame, como la región calibrada
+        state: Estado (color del texto)
+        rng: Generador aleatorio (variaciones)
+        font_path: Fuente TrueType (por defecto la primera de FONT_CANDIDATES)
+        scale: Altura de fuente relativa al alto del frame (por defecto aleatoria 0.45-0.85)
+        offset: Desplazamiento (x, y) en px desde el centro (por defecto aleatorio, subpíxel)
+        noise: Sigma del ruido gaussiano de fondo (por defecto aleatorio 0-12)
+        distractors: Añadir manchas rojas sueltas (simulan el avión u otros elementos)
+
+    Returns:
+        SyntheticSample
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    width, height = size
+    s = SUPERSAMPLE
+
+    scale = rng.uniform(0.45, 0.85) if scale is None else scale
+    font_px = max(8, int(round(height * scale)))
+    font = _font(font_path, font_px * s)
+    left, top, right, bottom = font.getbbox(label)
+    # Reducir la fuente si el texto no entra
+    while right - left > (width - 8) * s and font_px > 8:
+        font_px -= 2
+        font = _font(font_path, font_px * s)
+        left, top, right, bottom = font.getbbox(label)
+
+    if offset is None:
+        free_x = max(0.0, (width - (right - left) / s) / 2 - 4)
+        free_y = max(0.0, (height - (bottom - top) / s) / 2 - 2)
+        offset = (rng.uniform(-free_x, free_x), rng.uniform(-free_y, free_y))
+
+    # Texto en alta resolución (solo su caja) -> máscara alfa con bordes suavizados.
+    # La parte fraccionaria de la posición queda dentro del lienzo supermuestreado
+    text_w, text_h = right - left, bottom - top
+    px = (width - text_w / s) / 2 + offset[0]
+    py = (height - text_h / s) / 2 + offset[1]
+    ix, iy = int(np.floor(px)), int(np.floor(py))
+    canvas_w, canvas_h = -(-text_w // s) + 2, -(-text_h // s) + 2
+    canvas = Image.new('L', (canvas_w * s, canvas_h * s), 0)
+    sub_x, sub_y = int(round((px - ix) * s)), int(round((py - iy) * s))
+    ImageDraw.Draw(canvas).text((sub_x - left, sub_y - top), label, fill=255, font=font)
+    text_alpha = np.asarray(canvas.resize((canvas_w, canvas_h), Image.BOX), dtype=np.float32) / 255.0
+
+    alpha = np.zeros((height, width, 1), dtype=np.float32)
+    x0, y0 = max(ix, 0), max(iy, 0)
+    x1, y1 = min(ix + canvas_w, width), min(iy + canvas_h, height)
+    if x1 > x0 and y1 > y0:
+        alpha[y0:y1, x0:x1, 0] = text_alpha[y0 - iy:y1 - iy, x0 - ix:x1 - ix]
+
+    # Fondo oscuro con degradado y ruido
+    base = rng.uniform(8, 40, size=3).astype(np.float32)
+    gradient = np.linspace(0, rng.uniform(-10, 25), height, dtype=np.float32)[:, None, None]
+    background = np.broadcast_to(base, (height, width, 3)) + gradient
+    sigma = rng.uniform(0, 12) if noise is None else noise
+    if sigma > 0:
+        background = background + rng.standard_normal(size=(height, width, 3), dtype=np.float32) * np.float32(sigma)
+
+    if distractors and rng.random() < 0.3:
+        # Mancha roja pequeña lejos del centro
+        bw, bh = int(rng.integers(3, 8)), int(rng.integers(3, 8))
+        # En frames chicos no hay borde libre para la mancha: se omite
+        if width // 6 > bw and height > bh:
+            bx = int(rng.choice([rng.integers(0, width // 6), rng.integers(width - width // 6, width - bw)]))
+            by = int(rng.integers(0, height - bh))
+            background[by:by + bh, bx:bx + bw] = STATE_COLORS["crashed"]
+
+    color = np.clip(np.array(STATE_COLORS[state], dtype=np.float32) + rng.uniform(-12, 12, size=3), 0, 255)
+    frame = background + (color.astype(np.float32) - background) * alpha
+    return SyntheticSample(np.clip(frame, 0, 255).astype(np.uint8), label, state, font_px, tuple(offset))
+
+
+def generate(count: int, seed: int = 0, size: Tuple[int, int] = (276, 67),
+             states: Sequence[str] = ("crashed", "flying"), font_path: Optional[str] = None,
+             max_value: float = 1000.0) -> Iterator[SyntheticSample]:
+    """Generar `count` muestras reproducibles (mismo seed = mismas muestras)"""
+    rng = np.random.default_rng(seed)
+    font_path = find_font(font_path)
+    for _ in range(count):
+        label = f"{random_multiplier(rng, max_value):.2f}x"
+        yield render(label, size, str(rng.choice(states)), rng, font_path)
+
+
+# ----------------------------------------------------------------------
+# Escritura en bloque (paralela por chunks)
+# ----------------------------------------------------------------------
+
+def _write_part(task) -> List[list]:
+    """Generar y escribir un chunk. Devuelve las filas del CSV (formato png)"""
+    out, index, count, seed, size, states, font_path, fmt = task
+    samples = list(generate(count, seed=seed * 1_000_003 + index, size=size, states=states, font_path=font_path))
+    first = (index - 1) * count
+
+    if fmt == "corpus":
+        write_chunk(
+            out, index,
+            np.stack([sample.frame for sample in samples]),
+            np.arange(first, first + len(samples), dtype=np.float64),
+            [sample.label for sample in samples]
+        )
+        return []
+
+    rows = []
+    for i, sample in enumerate(samples):
+        filename = f"{first + i:07d}.png"
+        Image.fromarray(sample.frame).save(os.path.join(out, filename))
+        rows.append([filename, sample.label, sample.state, sample.font_px,
+                     round(sample.offset[0], 2), round(sample.offset[1], 2)])
+    return rows
+
+
+def write_dataset(out: str, count: int, fmt: str = "corpus", chunk_size: int = 256, seed: int = 0,
+                  size: Tuple[int, int] = (276, 67), states: Sequence[str] = ("crashed", "flying"),
+                  font_path: Optional[str] = None, workers: int = 1) -> int:
+    """
+    Escribir `count` muestras en `out`.
+
+    Args:
+        fmt: 'corpus' (chunks .npz para replay) o 'png' (imágenes + labels.csv)
+        chunk_size: Muestras por chunk / tarea
+        workers: Procesos en paralelo
+
+    Returns:
+        Muestras escritas
+    """
+    os.makedirs(out, exist_ok=True)
+    font_path = find_font(font_path)
+    tasks = []
+    remaining, index = count, 1
+    while remaining > 0:
+        n = min(chunk_size, remaining)
+        tasks.append((out, index, n, seed, tuple(size), tuple(states), font_path, fmt))
+        remaining -= n
+        index += 1
+
+    if workers > 1:
+        with Pool(workers) as pool:
+            parts = pool.map(_write_part, tasks)
+    else:
+        parts = [_write_part(task) for task in tasks]
+
+    if fmt == "png":
+        with open(os.path.join(out, "labels.csv"), 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(["file", "label", "state", "font_px", "offset_x", "offset_y"])
+            for rows in parts:
+                writer.writerows(rows)
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generador de frames sintéticos etiquetados")
+    parser.add_argument('out', help="Carpeta de salida")
+    parser.add_argument('--count', type=int, default=10000)
+    parser.add_argument('--format', choices=["corpus", "png"], default="corpus")
+    parser.add_argument('--size', type=int, nargs=2, metavar=('W', 'H'), default=(276, 67))
+    parser.add_argument('--states', nargs='+', choices=sorted(STATE_COLORS), default=["crashed", "flying"])
+    parser.add_argument('--chunk-size', type=int, default=256)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--font', help="Fuente TrueType (por defecto Arial Bold / DejaVu Sans Bold)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    font = find_font(args.font)
+    print(f"Fuente: {font or 'por defecto de PIL'}")
+    start = time.perf_counter()
+    written = write_dataset(args.out, args.count, args.format, args.chunk_size, args.seed,
+                            tuple(args.size), args.states, args.font, args.workers)
+    elapsed = time.perf_counter() - start
+    print(f"✅ {written} muestras en {args.out} ({elapsed:.1f}s, {written / elapsed:.0f} muestras/s)")
+
+
+if __name__ == '__main__':
+    main()
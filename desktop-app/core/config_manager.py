@@ -34,7 +34,56 @@ class ConfigManager:
             "ocr": {
                 "interval_ms": 1000,
                 "confidence_threshold": 0.7,
-                "tesseract_path": r"C:\Program Files\Tesseract-OCR\tesseract.exe"
+                "tesseract_path": r"C:\Program Files\Tesseract-OCR\tesseract.exe",
+                # Motor de aviator_vision.recognition ('persistent', 'pytesseract', 'template')
+                # o 'auto': el más rápido que alcanza benchmark.min_accuracy con las muestras incluidas
+                "engine": "auto",
+                "benchmark": {
+                    "candidates": ["persistent", "pytesseract"],
+                    "min_accuracy": 0.9
+                },
+                "change_detection": {
+                    "enabled": True,
+                    "threshold": 12.0
+                },
+                # Etapas de preprocesamiento: perfil incluido ('fast', 'legacy',
+                # 'red_mask') o lista propia en "stages", ej:
+                # [{"op": "grayscale"}, {"op": "threshold", "method": "otsu"}]
+                "preprocessing": {
+                    "profile": "fast",
+                    "stages": []
+                },
+                # Con "debug": true los últimos frames quedan en un anillo en memoria
+                # y se vuelcan a out_dir solo ante una lectura de baja confianza
+                "debug": False,
+                "debug_frames": {
+                    "capacity": 64,
+                    "out_dir": "debug_ocr",
+                    "max_dumps": 20,
+                    "min_dump_interval_s": 10.0
+                }
+            },
+            "capture": {
+                # Grabación de frames para replay offline (python -m aviator_vision.replay)
+                "recording": {
+                    "enabled": False,
+                    "path": "recordings",
+                    "chunk_size": 64
+                },
+                "scheduler": {
+                    "enabled": True,  # False = captura fija cada ocr.interval_ms
+                    # Frecuencia por fase de la ronda (Hz)
+                    "rates_hz": {
+                        "idle": 0.2,
+                        "flying": 1.0,
+                        "long_flight": 0.5,
+                        "crashed": 4.0,
+                        "cooldown": 0.5
+                    },
+                    "idle_after_s": 10.0,
+                    "long_flight_s": 10.0,
+                    "crash_window_s": 2.0
+                }
             },
             "overlay": {
                 "color": "#00FF00",
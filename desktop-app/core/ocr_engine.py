@@ -1,169 +1,181 @@
 """
 Motor OCR para extracción de multiplicadores.
-Procesa imágenes y extrae valores numéricos usando Tesseract.
+Preprocesa la región con las etapas configuradas y la lee con el motor de
+`aviator_vision.recognition` elegido (el mismo registro, parser y normalización
+que usa el servidor).
 """
-import pytesseract
-import cv2
 import numpy as np
 from PIL import Image
-import re
-from typing import Optional, Tuple
+from typing import List, NamedTuple, Optional
 import os
 
+from aviator_vision.debug_frames import DebugFrameRing
+from aviator_vision.preprocessing import PreprocessPipeline
+from aviator_vision.recognition import RecognitionResult, RecognizedWord, binarize, create_backend
+from aviator_vision.recognition.benchmark import DEFAULT_CANDIDATES, select_backend
+from aviator_vision.roi import RoiCropper
+
+
+# Palabra reconocida (text, confidence 0-1, box); solo el motor pytesseract da cajas
+OCRWord = RecognizedWord
+
+
+class OCRResult(NamedTuple):
+    """Resultado de una única lectura"""
+    multiplier: float
+    confidence: float  # 0-1 (0 si el motor no da confianza)
+    text: str
+    words: List[OCRWord]
+    backend: str
+
+# Rango razonable del multiplicador en pantalla
+MAX_MULTIPLIER = 1000.0
+
+
 class OCREngine:
-    def __init__(self, tesseract_path: Optional[str] = None):
+    def __init__(self, tesseract_path: Optional[str] = None, preprocessing: Optional[dict] = None,
+                 engine: str = "auto", benchmark: Optional[dict] = None):
         """
         Inicializar motor OCR.
         
         Args:
             tesseract_path: Ruta al ejecutable de Tesseract (opcional)
+            preprocessing: Sección `ocr.preprocessing` de config.json
+                (perfil o lista de etapas; por defecto el perfil 'fast')
+            engine: Motor registrado ('persistent', 'pytesseract', 'template')
+                o 'auto' para elegirlo con la autoevaluación al arrancar
+            benchmark: Sección `ocr.benchmark` (candidates, min_accuracy)
         """
-        if tesseract_path and os.path.exists(tesseract_path):
-            pytesseract.pytesseract.tesseract_cmd = tesseract_path
+        if tesseract_path and not os.path.exists(tesseract_path):
+            tesseract_path = None
         
+        self.pipeline = PreprocessPipeline.from_config(preprocessing)
+        self.roi = RoiCropper()
         self.debug_mode = False
-        self.debug_counter = 0
+        self.debug_frames: Optional[DebugFrameRing] = None
+        
+        options = {"tesseract_cmd": tesseract_path, "max_value": MAX_MULTIPLIER}
+        self.benchmark_results = []
+        self.recognizer = None
+        if engine == "auto":
+            benchmark = benchmark or {}
+            self.recognizer, self.benchmark_results = select_backend(
+                benchmark.get("candidates", DEFAULT_CANDIDATES),
+                float(benchmark.get("min_accuracy", 0.9)),
+                **options
+            )
+        else:
+            recognizer = create_backend(engine, **options)
+            if recognizer.load():
+                self.recognizer = recognizer
+        if self.recognizer is None:
+            print(f"⚠️ Motor OCR '{engine}' no disponible, usando pytesseract")
+            self.recognizer = create_backend("pytesseract", **options)
+        print(f"⚡ Motor OCR: {self.recognizer.name}")
     
-    def enable_debug(self, enabled: bool = True):
-        """Activar modo debug para guardar imágenes procesadas"""
+    def enable_debug(self, enabled: bool = True, options: Optional[dict] = None):
+        """
+        Activar modo debug: cada lectura guarda su frame crudo y procesado en un
+        anillo en memoria; solo se escriben a disco al pedirlo (dump_debug).
+        
+        Args:
+            options: Sección `ocr.debug_frames` (capacity, out_dir, max_dumps,
+                min_dump_interval_s)
+        """
         self.debug_mode = enabled
-        if enabled:
-            os.makedirs("debug_ocr", exist_ok=True)
+        if enabled and self.debug_frames is None:
+            options = options or {}
+            self.debug_frames = DebugFrameRing(
+                capacity=options.get("capacity", 64),
+                out_dir=options.get("out_dir", "debug_ocr"),
+                max_dumps=options.get("max_dumps", 20),
+                min_dump_interval_s=options.get("min_dump_interval_s", 10.0)
+            )
+        elif not enabled and self.debug_frames is not None:
+            self.debug_frames.close()
+            self.debug_frames = None
+    
+    def dump_debug(self, reason: str = "manual", force: bool = True) -> Optional[str]:
+        """
+        Volcar los últimos frames de debug a disco (en segundo plano).
+        
+        Returns:
+            Carpeta del volcado o None (debug desactivado, anillo vacío o
+            volcado automático demasiado seguido)
+        """
+        if self.debug_frames is None:
+            return None
+        return self.debug_frames.dump(reason, force=force)
+    
+    def _debug_frame(self, raw: np.ndarray, processed: np.ndarray, result: Optional[RecognitionResult]):
+        if self.debug_frames is not None:
+            self.debug_frames.add(
+                raw=raw,
+                processed=processed,
+                value=result.text if result else None,
+                confidence=result.confidence if result else None,
+                note=result.backend if result else self.recognizer.name
+            )
     
     def preprocess_image(self, img: Image.Image) -> np.ndarray:
         """
-        Preprocesar imagen para mejorar OCR.
+        Preprocesar imagen para mejorar OCR con las etapas configuradas.
         
         Args:
-            img: Imagen PIL
+            img: Imagen PIL (RGB)
             
         Returns:
             Imagen procesada como array numpy
         """
-        # Convertir PIL a OpenCV
-        img_cv = cv2.cvtColor(np.array(img), cv2.COLOR_RGB2BGR)
-        
-        # Convertir a escala de grises
-        gray = cv2.cvtColor(img_cv, cv2.COLOR_BGR2GRAY)
-        
-        # Aumentar contraste
-        gray = cv2.convertScaleAbs(gray, alpha=1.5, beta=0)
-        
-        # Binarización adaptativa
-        binary = cv2.adaptiveThreshold(
-            gray, 255,
-            cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-            cv2.THRESH_BINARY,
-            11, 2
-        )
-        
-        # Invertir si el fondo es oscuro
-        if np.mean(binary) < 127:
-            binary = cv2.bitwise_not(binary)
-        
-        # Denoise
-        denoised = cv2.fastNlMeansDenoising(binary, None, 10, 7, 21)
-        
-        # Dilatar ligeramente para unir caracteres
-        kernel = np.ones((2, 2), np.uint8)
-        processed = cv2.dilate(denoised, kernel, iterations=1)
-        
-        # Guardar para debug
-        if self.debug_mode:
-            debug_path = f"debug_ocr/processed_{self.debug_counter}.png"
-            cv2.imwrite(debug_path, processed)
-            self.debug_counter += 1
-        
-        return processed
+        return self.pipeline.run(np.asarray(img.convert('RGB')))
     
-    def extract_multiplier(self, img: Image.Image) -> Optional[Tuple[float, float]]:
+    def extract_multiplier(self, img: Image.Image) -> Optional[OCRResult]:
         """
-        Extraer multiplicador de la imagen.
+        Extraer multiplicador de la imagen con una sola lectura.
         
         Args:
             img: Imagen PIL de la región del multiplicador
             
         Returns:
-            Tupla (multiplicador, confianza) o None si no se detecta
+            OCRResult (multiplicador, confianza, texto, palabras con cajas y motor)
+            o None si no se detecta
         """
         try:
-            # Preprocesar
+            # Preprocesar y quedarse con la caja del texto
             processed = self.preprocess_image(img)
+            mask = binarize(processed)
+            crop = self.roi.crop(mask)
+            if crop is None:
+                self._debug_frame(np.asarray(img), processed, None)
+                return None
             
-            # Configuración de Tesseract para números
-            custom_config = r'--oem 3 --psm 7 -c tessedit_char_whitelist=0123456789.x'
-            
-            # Extraer texto
-            text = pytesseract.image_to_string(
-                processed,
-                config=custom_config
-            ).strip()
-            
-            # Obtener confianza
-            try:
-                data = pytesseract.image_to_data(
-                    processed,
-                    config=custom_config,
-                    output_type=pytesseract.Output.DICT
-                )
-                confidences = [int(conf) for conf in data['conf'] if conf != '-1']
-                avg_confidence = sum(confidences) / len(confidences) if confidences else 0
-            except:
-                avg_confidence = 0
-            
-            # Parsear multiplicador
-            multiplier = self._parse_multiplier(text)
-            
-            if multiplier:
-                confidence = avg_confidence / 100.0
-                print(f"📊 OCR: {text} → {multiplier}x (confianza: {confidence:.2f})")
-                return (multiplier, confidence)
+            read = self.recognizer.read(crop)
+            self._debug_frame(np.asarray(img), processed, read)
+            if read.multiplier is None:
+                return None
             
-            return None
+            result = OCRResult(read.multiplier, read.confidence or 0.0, read.text, list(read.words), read.backend)
+            if read.confidence is None:
+                # Motor sin confianza: cuenta como 0 (no pasa ocr.confidence_threshold)
+                print(f"⚠️ OCR: {result.text} → {result.multiplier}x sin confianza ({result.backend})")
+            else:
+                print(f"📊 OCR: {result.text} → {result.multiplier}x (confianza: {result.confidence:.2f}, {result.backend})")
+            return result
             
         except Exception as e:
             print(f"❌ Error en OCR: {e}")
             return None
     
-    def _parse_multiplier(self, text: str) -> Optional[float]:
-        """
-        Parsear texto a valor de multiplicador.
-        
-        Args:
-            text: Texto extraído por OCR
-            
-        Returns:
-            Valor float del multiplicador o None
-        """
-        # Limpiar texto
-        text = text.replace(' ', '').replace(',', '.')
-        
-        # Buscar patrón de multiplicador (ej: "2.45x", "2.45", "245")
-        patterns = [
-            r'(\d+\.\d+)x?',  # 2.45x o 2.45
-            r'(\d+)x',         # 2x
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text)
-            if match:
-                try:
-                    value = float(match.group(1))
-                    # Validar rango razonable (1.00 - 1000.00)
-                    if 1.0 <= value <= 1000.0:
-                        return value
-                except ValueError:
-                    continue
-        
-        return None
+    def get_preprocess_stats(self) -> dict:
+        """Histograma de tiempos por etapa de preprocesamiento"""
+        return self.pipeline.get_stats()
     
     def test_ocr(self, img: Image.Image) -> str:
         """
-        Probar OCR en imagen sin procesamiento especial.
+        Probar OCR sobre la región completa (sin recorte al texto).
         Útil para debugging.
         """
         try:
-            text = pytesseract.image_to_string(img)
-            return text.strip()
+            return self.recognizer.read(binarize(self.preprocess_image(img))).text
         except Exception as e:
             return f"Error: {e}"
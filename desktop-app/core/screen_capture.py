@@ -1,16 +1,19 @@
 """
 Motor de captura de pantalla usando MSS.
 Captura regiones específicas de la pantalla de forma eficiente.
+Usa el capturador compartido con el servidor (aviator_vision.capture).
 """
-import mss
-import mss.tools
+import numpy as np
 from PIL import Image
-from typing import Tuple, Optional
-import io
+from typing import Optional
+
+from aviator_vision.capture import ScreenGrabber, CHANNELS_BGRA
+from aviator_vision.corpus import FrameRecorder
 
 class ScreenCapture:
     def __init__(self):
-        self.sct = mss.mss()
+        self.grabber = ScreenGrabber()
+        self.recorder = None  # Grabación de frames para replay (None = desactivada)
     
     def capture_region(self, x: int, y: int, width: int, height: int) -> Optional[Image.Image]:
         """
@@ -26,16 +29,8 @@ class ScreenCapture:
             PIL Image o None si hay error
         """
         try:
-            # Definir región de captura
-            monitor = {
-                "top": y,
-                "left": x,
-                "width": width,
-                "height": height
-            }
-            
             # Capturar
-            screenshot = self.sct.grab(monitor)
+            screenshot = self.grabber.grab_raw(x, y, width, height)
             
             # Convertir a PIL Image
             img = Image.frombytes(
@@ -50,9 +45,53 @@ class ScreenCapture:
             print(f"❌ Error capturando región: {e}")
             return None
     
+    def capture_region_array(self, x: int, y: int, width: int, height: int) -> Optional[np.ndarray]:
+        """
+        Captura una región como vista BGRA sin copias (sin pasar por PIL).
+        
+        Returns:
+            Array uint8 (alto, ancho, 4) o None si hay error
+        """
+        try:
+            return self.grabber.grab(x, y, width, height)
+        except Exception as e:
+            print(f"❌ Error capturando región: {e}")
+            return None
+    
+    def to_image(self, frame: np.ndarray) -> Image.Image:
+        """Convertir un frame BGRA a PIL Image RGB"""
+        return ScreenGrabber.to_image(frame)
+    
+    def start_recording(self, path: str, chunk_size: int = 64):
+        """Empezar a grabar frames en un corpus (carpeta de chunks .npz)"""
+        if self.recorder is None:
+            self.recorder = FrameRecorder(path, chunk_size)
+    
+    def record(self, frame: np.ndarray, value: Optional[str] = None):
+        """
+        Grabar un frame BGRA capturado junto con el valor reconocido.
+        
+        Args:
+            frame: Frame de capture_region_array
+            value: Lectura del OCR (ej: "2.45x") o None si no hubo
+        """
+        if self.recorder is not None:
+            try:
+                self.recorder.add(frame, value, channels=CHANNELS_BGRA)
+            except Exception as e:
+                print(f"❌ Error grabando frame: {e}")
+    
+    def stop_recording(self) -> Optional[dict]:
+        """Cerrar la grabación y devolver sus estadísticas"""
+        recorder, self.recorder = self.recorder, None
+        if recorder is None:
+            return None
+        recorder.close()
+        return recorder.get_stats()
+    
     def get_monitor_info(self) -> list:
         """Obtener información de todos los monitores"""
-        return self.sct.monitors
+        return self.grabber.monitors
     
     def capture_full_screen(self, monitor_number: int = 1) -> Optional[Image.Image]:
         """
@@ -62,13 +101,7 @@ class ScreenCapture:
             monitor_number: Número de monitor (1 = primario)
         """
         try:
-            screenshot = self.sct.grab(self.sct.monitors[monitor_number])
-            img = Image.frombytes(
-                'RGB',
-                (screenshot.width, screenshot.height),
-                screenshot.rgb
-            )
-            return img
+            return self.to_image(self.grabber.grab_monitor(monitor_number))
         except Exception as e:
             print(f"❌ Error capturando pantalla completa: {e}")
             return None
@@ -82,6 +115,8 @@ class ScreenCapture:
             print(f"❌ Error guardando captura: {e}")
     
     def __del__(self):
-        """Cerrar MSS al destruir el objeto"""
-        if hasattr(self, 'sct'):
-            self.sct.close()
+        """Cerrar MSS (y la grabación) al destruir el objeto"""
+        if getattr(self, 'recorder', None) is not None:
+            self.recorder.close()
+        if hasattr(self, 'grabber'):
+            self.grabber.close()
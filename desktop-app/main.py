@@ -2,9 +2,14 @@
 Aplicación principal de Aviator Tracker Desktop.
 Diseño idéntico a la extensión del navegador.
 """
+import os
 import sys
 from PyQt5.QtWidgets import QApplication
 from PyQt5.QtCore import QTimer
+
+# Paquete compartido con el servidor (raíz del repositorio)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
 from ui.control_panel import ControlPanel
 from ui.overlay_window import OverlayWindow
 from ui.calibration_dialog import CalibrationDialog
@@ -12,6 +17,10 @@ from core.config_manager import ConfigManager
 from core.screen_capture import ScreenCapture
 from core.ocr_engine import OCREngine
 from core.auto_clicker import AutoClicker
+from aviator_vision.capture import CHANNELS_BGRA
+from aviator_vision.frame_change import FrameChangeDetector
+from aviator_vision.recognition.preprocess import count_red_pixels
+from aviator_vision.scheduler import AdaptiveScheduler
 
 class AviatorTrackerApp:
     """Aplicación principal"""
@@ -21,10 +30,26 @@ class AviatorTrackerApp:
         self.config_manager = ConfigManager()
         self.screen_capture = ScreenCapture()
         self.ocr_engine = OCREngine(
-            self.config_manager.get('ocr.tesseract_path')
+            self.config_manager.get('ocr.tesseract_path'),
+            self.config_manager.get('ocr.preprocessing'),
+            engine=self.config_manager.get('ocr.engine', 'auto'),
+            benchmark=self.config_manager.get('ocr.benchmark')
         )
         self.auto_clicker = AutoClicker()
         
+        # Detector de cambios: evita OCR sobre frames idénticos
+        self.change_detector = None
+        if self.config_manager.get('ocr.change_detection.enabled', True):
+            self.change_detector = FrameChangeDetector(
+                threshold=self.config_manager.get('ocr.change_detection.threshold', 12.0)
+            )
+        self.last_ocr_result = None
+        
+        # Planificador: ajusta el intervalo del timer según la fase de la ronda
+        self.scheduler = None
+        if self.config_manager.get('capture.scheduler.enabled', True):
+            self.scheduler = AdaptiveScheduler.from_config(self.config_manager.get('capture.scheduler'))
+        
         # UI
         self.control_panel = ControlPanel()
         self.overlay = OverlayWindow(self.config_manager.config)
@@ -82,7 +107,7 @@ class AviatorTrackerApp:
         
         # Configurar OCR
         if self.config_manager.get('ocr.debug', False):
-            self.ocr_engine.enable_debug(True)
+            self.ocr_engine.enable_debug(True, self.config_manager.get('ocr.debug_frames', {}))
     
     def show_calibration_ocr(self):
         """Mostrar diálogo de calibración OCR"""
@@ -144,6 +169,21 @@ class AviatorTrackerApp:
         # Obtener intervalo de configuración
         interval = self.config_manager.get('ocr.interval_ms', 1000)
         
+        if self.change_detector:
+            self.change_detector.reset()
+        if self.scheduler:
+            self.scheduler.reset()
+        
+        # Grabación de frames para replay offline (python -m aviator_vision.replay)
+        if self.config_manager.get('capture.recording.enabled', False):
+            from datetime import datetime
+            path = os.path.join(
+                self.config_manager.get('capture.recording.path', 'recordings'),
+                datetime.now().strftime('%Y%m%d_%H%M%S')
+            )
+            self.screen_capture.start_recording(path, self.config_manager.get('capture.recording.chunk_size', 64))
+            self.control_panel.log(f"⏺️ Grabando frames en {path}")
+        
         # Iniciar timer
         self.capture_timer.start(interval)
         self.overlay.set_capturing(True)
@@ -164,6 +204,29 @@ class AviatorTrackerApp:
         self.control_panel.python_indicator.setStyleSheet("color: #ef4444; font-size: 12px;")
         
         self.control_panel.log("⏹️ Captura detenida")
+        
+        if self.change_detector:
+            stats = self.change_detector.get_stats()
+            self.control_panel.log(
+                f"♻️ Frames sin cambios (OCR evitado): {stats['hits']}/{stats['hits'] + stats['misses']}"
+            )
+        
+        if self.scheduler:
+            stats = self.scheduler.get_stats()
+            self.control_panel.log(
+                f"⏲️ Captura adaptativa: {stats['effective_hz']:.2f} Hz efectivos (última fase: {stats['phase']})"
+            )
+        
+        recording = self.screen_capture.stop_recording()
+        if recording:
+            self.control_panel.log(
+                f"⏹️ Grabación: {recording['frames_written']} frames ({recording['bytes_written'] / 1024:.0f} KB)"
+            )
+        
+        preprocess = self.ocr_engine.get_preprocess_stats()
+        if preprocess['runs']:
+            timings = ", ".join(f"{name} {st['avg_ms']:.2f}ms" for name, st in preprocess['stages'].items())
+            self.control_panel.log(f"⏱️ Preprocesado ({preprocess['runs']} frames): {timings}")
     
     def on_capture_tick(self):
         """Ejecutar captura de OCR (llamado por timer)"""
@@ -171,23 +234,39 @@ class AviatorTrackerApp:
         if not region:
             return
         
-        # Capturar pantalla
-        img = self.screen_capture.capture_region(
+        # Capturar pantalla (vista BGRA, sin PIL)
+        frame = self.screen_capture.capture_region_array(
             region['x'],
             region['y'],
             region['width'],
             region['height']
         )
         
-        if not img:
+        if frame is None:
             self.control_panel.log("⚠️ Error capturando pantalla")
             return
         
-        # Procesar OCR
-        result = self.ocr_engine.extract_multiplier(img)
+        unchanged = self.change_detector is not None and self.change_detector.is_unchanged(frame)
+        
+        # Ajustar la próxima captura a la fase de la ronda (denso al aparecer el rojo del crash)
+        if self.scheduler:
+            self.scheduler.observe(
+                changed=not unchanged,
+                red_pixels=None if unchanged else count_red_pixels(frame, channels=CHANNELS_BGRA)
+            )
+            self.capture_timer.setInterval(int(self.scheduler.next_interval() * 1000))
+        
+        # Procesar OCR (o reutilizar el último resultado si el frame no cambió)
+        if unchanged:
+            result = self.last_ocr_result
+        else:
+            img = self.screen_capture.to_image(frame)
+            result = self.ocr_engine.extract_multiplier(img)
+            self.last_ocr_result = result
+            self.screen_capture.record(frame, f"{result.multiplier:.2f}x" if result else None)
         
         if result:
-            multiplier, confidence = result
+            multiplier, confidence = result.multiplier, result.confidence
             
             # Verificar umbral de confianza
             min_confidence = self.config_manager.get('ocr.confidence_threshold', 0.7)
@@ -212,6 +291,9 @@ class AviatorTrackerApp:
                 self.control_panel.log(
                     f"⚠️ Baja confianza: {multiplier}x ({confidence:.0%})"
                 )
+                dump_path = self.ocr_engine.dump_debug("baja_confianza", force=False)
+                if dump_path:
+                    self.control_panel.log(f"🐞 Frames de debug → {dump_path}")
     
     def run_test(self, test_type: str):
         """Ejecutar test de click"""